@@ -0,0 +1,27 @@
+"""Console entry point for sonnet-cli.
+
+Importing the typer app loads typer, click and rich. `sonnet --version` is
+answered before any of that is imported; every other command is handed to
+sonnet_cli.main.
+"""
+
+import sys
+
+from sonnet_cli import __version__
+
+VERSION_FLAGS = ("--version", "-v")
+
+
+def run() -> None:
+    """Run the sonnet CLI."""
+    if len(sys.argv) == 2 and sys.argv[1] in VERSION_FLAGS:
+        print(f"sonnet-cli version {__version__}")
+        return
+
+    from sonnet_cli.main import app
+
+    app()
+
+
+if __name__ == "__main__":
+    run()
@@ -2,7 +2,8 @@
 
 import socket
 import subprocess
-from typing import List, Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
 from sonnet_cli.services import SERVICE_REGISTRY
 
@@ -30,11 +31,15 @@ def get_local_images() -> set:
     Returns:
         Set of image names/tags available locally.
     """
-    result = subprocess.run(
-        ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
-        capture_output=True,
-        text=True,
-    )
+    try:
+        result = subprocess.run(
+            ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        # Runs alongside check_docker_running, which reports the missing CLI
+        return set()
     if result.returncode != 0:
         return set()
 
@@ -116,25 +121,77 @@ def detect_port_conflicts(services: List[str]) -> Dict[str, List[int]]:
         Dictionary mapping service name to list of conflicting ports.
         Empty dict if no conflicts.
     """
-    conflicts = {}
-
+    probes = []
     for service in services:
         config = SERVICE_REGISTRY.get(service)
         if not config or not config.get("ports"):
             continue
+        probes.extend((service, int(host_port)) for host_port in config["ports"].keys())
 
-        service_conflicts = []
-        for host_port in config["ports"].keys():
-            port = int(host_port)
-            if not check_port_available(port):
-                service_conflicts.append(port)
+    if not probes:
+        return {}
 
-        if service_conflicts:
-            conflicts[service] = service_conflicts
+    # Probe every port at once; each bind can wait up to its socket timeout
+    with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+        available = list(pool.map(lambda probe: check_port_available(probe[1]), probes))
 
+    conflicts: Dict[str, List[int]] = {}
+    for (service, port), is_available in zip(probes, available):
+        if not is_available:
+            conflicts.setdefault(service, []).append(port)
     return conflicts
 
 
+def run_preflight(services: List[str], check_ports: bool = True) -> Dict[str, Any]:
+    """Run every pre-flight check once, concurrently.
+
+    The Docker daemon check, the local image lookup and the port probes run
+    in parallel, so the total time is that of the slowest check rather than
+    their sum. Pass the result to the code that needs it instead of running
+    the checks again.
+
+    Args:
+        services: List of service names to check.
+        check_ports: Whether to probe the services' host ports.
+
+    Returns:
+        Dictionary with docker_running, available_images, missing_images
+        and port_conflicts.
+    """
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        docker = pool.submit(check_docker_running)
+        images = pool.submit(check_images_exist, services)
+        ports = pool.submit(detect_port_conflicts, services) if check_ports else None
+
+        available, missing = images.result()
+        return {
+            "docker_running": docker.result(),
+            "available_images": available,
+            "missing_images": missing,
+            "port_conflicts": ports.result() if ports else {},
+        }
+
+
+def select_preflight(preflight: Dict[str, Any], services: List[str]) -> Dict[str, Any]:
+    """Narrow pre-flight results to a subset of the services they were run for.
+
+    Args:
+        preflight: Result of run_preflight.
+        services: Service names to keep.
+
+    Returns:
+        Pre-flight results for the given services only.
+    """
+    return {
+        "docker_running": preflight["docker_running"],
+        "available_images": [s for s in preflight["available_images"] if s in services],
+        "missing_images": [s for s in preflight["missing_images"] if s in services],
+        "port_conflicts": {
+            s: ports for s, ports in preflight["port_conflicts"].items() if s in services
+        },
+    }
+
+
 def get_image_build_instructions(missing_services: List[str]) -> str:
     """Generate instructions for building missing images.
 
@@ -3,7 +3,7 @@
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
-from sonnet_cli.checks import check_docker_running, check_images_exist, detect_port_conflicts
+from sonnet_cli.checks import run_preflight
 from sonnet_cli.exceptions import DockerNotRunningError, ProjectExistsError
 from sonnet_cli.services import DEFAULT_SERVICES, SERVICE_REGISTRY
 from sonnet_cli.templates import (
@@ -22,6 +22,7 @@ def create_project(
     target_dir: Path,
     services: Optional[List[str]] = None,
     interactive: bool = False,
+    preflight: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Create a new sonnet project.
 
@@ -30,6 +31,8 @@ def create_project(
         target_dir: Parent directory where project will be created.
         services: List of services to include. If None, uses DEFAULT_SERVICES.
         interactive: Whether to prompt user for service selection.
+        preflight: Result of checks.run_preflight for these services, if the
+            caller already ran it. Otherwise the checks are run here.
 
     Returns:
         Dictionary with creation results including any warnings.
@@ -46,10 +49,6 @@ def create_project(
         "files_created": [],
     }
 
-    # Check Docker is running
-    if not check_docker_running():
-        raise DockerNotRunningError()
-
     # Use default services if none specified
     if services is None:
         services = DEFAULT_SERVICES.copy()
@@ -61,13 +60,14 @@ def create_project(
     if project_path.exists():
         raise ProjectExistsError(str(project_path))
 
-    # Check for missing images
-    available, missing = check_images_exist(services)
-    result["missing_images"] = missing
+    # Check Docker, images and ports (concurrently, unless the caller already did)
+    if preflight is None:
+        preflight = run_preflight(services)
+    if not preflight["docker_running"]:
+        raise DockerNotRunningError()
 
-    # Check for port conflicts
-    conflicts = detect_port_conflicts(services)
-    result["port_conflicts"] = conflicts
+    result["missing_images"] = preflight["missing_images"]
+    result["port_conflicts"] = preflight["port_conflicts"]
 
     # Create project directory structure
     project_path.mkdir(parents=True)
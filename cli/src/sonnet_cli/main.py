@@ -1,30 +1,25 @@
-"""Main CLI entry point for sonnet-cli."""
+"""Main CLI entry point for sonnet-cli.
+
+Command implementations (init_cmd, stack, checks) and the rich widgets they
+need are imported inside each command, so a command only pays for what it
+uses. `sonnet --version` does not import this module at all; see
+sonnet_cli.__main__.
+"""
 
 from pathlib import Path
 from typing import Optional, List
 
 import typer
 from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
 
 from sonnet_cli import __version__
-from sonnet_cli.checks import (
-    check_docker_running,
-    check_images_exist,
-    detect_port_conflicts,
-    get_image_build_instructions,
-    format_port_conflict_message,
-)
 from sonnet_cli.exceptions import (
     SonnetError,
     DockerNotRunningError,
     ProjectExistsError,
     NotASonnetProjectError,
 )
-from sonnet_cli.init_cmd import create_project
 from sonnet_cli.services import DEFAULT_SERVICES, ALL_SERVICES, SERVICE_REGISTRY
-from sonnet_cli.stack import up as stack_up, down as stack_down, status as stack_status
 
 app = typer.Typer(
     name="sonnet",
@@ -81,19 +76,31 @@ def init(
     ),
 ):
     """Create a new sonnet project with Docker Compose configuration."""
+    from rich.panel import Panel
+
+    from sonnet_cli.checks import (
+        run_preflight,
+        select_preflight,
+        get_image_build_instructions,
+        format_port_conflict_message,
+    )
+    from sonnet_cli.init_cmd import create_project
+
     try:
-        # Check Docker first
-        if not check_docker_running():
+        # Run all pre-flight checks once, concurrently. Interactive runs check
+        # every service up front so Docker errors show before any prompt.
+        services = None if interactive else DEFAULT_SERVICES.copy()
+        preflight = run_preflight(services or ALL_SERVICES)
+        if not preflight["docker_running"]:
             raise DockerNotRunningError()
 
         # Determine services
         if interactive:
             services = _select_services_interactive()
-        else:
-            services = DEFAULT_SERVICES.copy()
+            preflight = select_preflight(preflight, services)
 
         # Check for missing images
-        available, missing = check_images_exist(services)
+        missing = preflight["missing_images"]
         if missing:
             console.print(
                 Panel(
@@ -104,7 +111,7 @@ def init(
             )
 
         # Check for port conflicts
-        conflicts = detect_port_conflicts(services)
+        conflicts = preflight["port_conflicts"]
         if conflicts:
             console.print(
                 Panel(
@@ -120,6 +127,7 @@ def init(
             target_dir=target_dir,
             services=services,
             interactive=interactive,
+            preflight=preflight,
         )
 
         # Success message
@@ -163,6 +171,11 @@ def up(
     ),
 ):
     """Start all services in the project."""
+    from rich.panel import Panel
+
+    from sonnet_cli.checks import get_image_build_instructions
+    from sonnet_cli.stack import up as stack_up
+
     try:
         console.print("Starting services...")
         result = stack_up(project_dir)
@@ -207,6 +220,8 @@ def down(
     ),
 ):
     """Stop all services in the project."""
+    from sonnet_cli.stack import down as stack_down
+
     try:
         console.print("Stopping services...")
         result = stack_down(project_dir)
@@ -234,6 +249,10 @@ def status(
     ),
 ):
     """Show status of all services in the project."""
+    from rich.table import Table
+
+    from sonnet_cli.stack import status as stack_status
+
     try:
         result = stack_status(project_dir)
 
@@ -5,8 +5,7 @@ import subprocess
 from pathlib import Path
 from typing import Dict, Any, List
 
-from sonnet_cli.checks import check_images_exist
-from sonnet_cli.exceptions import NotASonnetProjectError, DockerComposeError
+from sonnet_cli.exceptions import DockerComposeError, DockerNotRunningError, NotASonnetProjectError
 from sonnet_cli.services import SERVICE_REGISTRY
 
 
@@ -55,8 +54,12 @@ def up(project_dir: Path) -> Dict[str, Any]:
 
     Raises:
         NotASonnetProjectError: If not a valid sonnet project.
+        DockerNotRunningError: If Docker daemon is not running.
         DockerComposeError: If docker compose command fails.
     """
+    # Imported here so `sonnet status` and `down` don't load the check machinery
+    from sonnet_cli.checks import run_preflight
+
     _validate_project_dir(project_dir)
 
     result: Dict[str, Any] = {
@@ -65,10 +68,13 @@ def up(project_dir: Path) -> Dict[str, Any]:
         "services_started": [],
     }
 
-    # Get services from compose file and check images
+    # Get services from compose file; check Docker and images concurrently.
+    # Ports aren't probed: a running stack holds its own ports.
     services = _parse_services_from_compose(project_dir)
-    available, missing = check_images_exist(services)
-    result["missing_images"] = missing
+    preflight = run_preflight(services, check_ports=False)
+    if not preflight["docker_running"]:
+        raise DockerNotRunningError()
+    result["missing_images"] = preflight["missing_images"]
 
     # Run docker compose up
     cmd = ["docker", "compose", "up", "-d"]
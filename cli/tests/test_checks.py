@@ -60,6 +60,13 @@ class TestGetLocalImages:
             assert "pipelinebase:latest" in images
             assert "pgduckdb/pgduckdb:17-v0.1.0" in images
 
+    def test_get_local_images_returns_empty_set_when_docker_not_installed(self):
+        """Returns empty set when the docker command is not found."""
+        from sonnet_cli.checks import get_local_images
+
+        with patch("subprocess.run", side_effect=FileNotFoundError()):
+            assert get_local_images() == set()
+
     def test_get_local_images_returns_empty_set_on_failure(self):
         """Returns empty set when docker images command fails."""
         from sonnet_cli.checks import get_local_images
@@ -180,6 +187,86 @@ class TestDetectPortConflicts:
             assert conflicts == {}
 
 
+    def test_detect_port_conflicts_probes_ports_concurrently(self):
+        """All ports are probed at once, so slow probes don't add up."""
+        import time
+        from sonnet_cli.checks import detect_port_conflicts
+
+        def slow_port_check(port, host="127.0.0.1"):
+            time.sleep(0.2)
+            return port != 8080
+
+        start = time.perf_counter()
+        with patch("sonnet_cli.checks.check_port_available", side_effect=slow_port_check):
+            conflicts = detect_port_conflicts(["pgduckdb", "pgadmin", "cloudbeaver"])
+        assert conflicts == {"pgadmin": [8080]}
+        assert time.perf_counter() - start < 0.5
+
+
+class TestRunPreflight:
+    """Tests for run_preflight and select_preflight functions."""
+
+    def test_run_preflight_runs_each_check_once_concurrently(self):
+        """Docker, image and port checks run once each, in parallel."""
+        import time
+        from sonnet_cli.checks import run_preflight
+
+        def slow(value):
+            def check(*args):
+                time.sleep(0.2)
+                return value
+            return check
+
+        start = time.perf_counter()
+        with patch("sonnet_cli.checks.check_docker_running", side_effect=slow(True)) as docker:
+            with patch(
+                "sonnet_cli.checks.check_images_exist",
+                side_effect=slow((["pgduckdb"], ["jupyterbase"])),
+            ) as images:
+                with patch(
+                    "sonnet_cli.checks.detect_port_conflicts",
+                    side_effect=slow({"pgduckdb": [5432]}),
+                ) as ports:
+                    preflight = run_preflight(["pgduckdb", "jupyterbase"])
+
+        assert time.perf_counter() - start < 0.5
+        assert docker.call_count == images.call_count == ports.call_count == 1
+        assert preflight == {
+            "docker_running": True,
+            "available_images": ["pgduckdb"],
+            "missing_images": ["jupyterbase"],
+            "port_conflicts": {"pgduckdb": [5432]},
+        }
+
+    def test_run_preflight_can_skip_ports(self):
+        """Port probes are skipped when check_ports is False."""
+        from sonnet_cli.checks import run_preflight
+
+        with patch("sonnet_cli.checks.check_docker_running", return_value=False):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=([], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts") as ports:
+                    preflight = run_preflight(["pgduckdb"], check_ports=False)
+
+        ports.assert_not_called()
+        assert preflight["docker_running"] is False
+        assert preflight["port_conflicts"] == {}
+
+    def test_select_preflight_keeps_only_selected_services(self):
+        """Results for services that weren't selected are dropped."""
+        from sonnet_cli.checks import select_preflight
+
+        preflight = {
+            "docker_running": True,
+            "available_images": ["pgduckdb", "pgadmin"],
+            "missing_images": ["jupyterbase"],
+            "port_conflicts": {"pgadmin": [8080], "pgduckdb": [5432]},
+        }
+        selected = select_preflight(preflight, ["pgduckdb"])
+        assert selected["available_images"] == ["pgduckdb"]
+        assert selected["missing_images"] == []
+        assert selected["port_conflicts"] == {"pgduckdb": [5432]}
+
+
 class TestGetImageBuildInstructions:
     """Tests for get_image_build_instructions function."""
 
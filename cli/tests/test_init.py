@@ -18,9 +18,9 @@ class TestInitCommand:
 
         project_path = tmp_path / "myproject"
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -52,9 +52,9 @@ class TestInitCommand:
         """Init creates docker-compose.yml file."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -72,9 +72,9 @@ class TestInitCommand:
         """Init creates .env file."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -91,9 +91,9 @@ class TestInitCommand:
         """Init creates README.md file."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -110,9 +110,9 @@ class TestInitCommand:
         """Init creates pgadmin config files when pgadmin is selected."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -130,9 +130,9 @@ class TestInitCommand:
         from sonnet_cli.init_cmd import create_project
         from sonnet_cli.services import DEFAULT_SERVICES
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(DEFAULT_SERVICES, [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(DEFAULT_SERVICES, [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -150,12 +150,12 @@ class TestInitCommand:
         """Init returns warning info when local images are missing."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
             with patch(
-                "sonnet_cli.init_cmd.check_images_exist",
+                "sonnet_cli.checks.check_images_exist",
                 return_value=(["pgduckdb"], ["jupyterbase"]),
             ):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     result = create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -170,10 +170,10 @@ class TestInitCommand:
         """Init returns warning info when ports are in use."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
                 with patch(
-                    "sonnet_cli.init_cmd.detect_port_conflicts",
+                    "sonnet_cli.checks.detect_port_conflicts",
                     return_value={"pgduckdb": [5432]},
                 ):
                     result = create_project(
@@ -190,9 +190,9 @@ class TestInitCommand:
         """Init creates sql directory with init.sql."""
         from sonnet_cli.init_cmd import create_project
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=True):
-            with patch("sonnet_cli.init_cmd.check_images_exist", return_value=(["pgduckdb"], [])):
-                with patch("sonnet_cli.init_cmd.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     create_project(
                         name="myproject",
                         target_dir=tmp_path,
@@ -204,6 +204,31 @@ class TestInitCommand:
         assert sql_file.exists()
 
 
+class TestInitPreflight:
+    """Tests for reusing pre-flight results in create_project."""
+
+    def test_init_reuses_preflight_results(self, tmp_path):
+        """Checks are not run again when the caller passes their results."""
+        from sonnet_cli.init_cmd import create_project
+
+        preflight = {
+            "docker_running": True,
+            "available_images": ["pgduckdb"],
+            "missing_images": [],
+            "port_conflicts": {"pgduckdb": [5432]},
+        }
+        with patch("sonnet_cli.init_cmd.run_preflight") as mock_preflight:
+            result = create_project(
+                name="myproject",
+                target_dir=tmp_path,
+                services=["pgduckdb"],
+                preflight=preflight,
+            )
+
+        mock_preflight.assert_not_called()
+        assert result["port_conflicts"] == {"pgduckdb": [5432]}
+
+
 class TestCheckDockerBeforeInit:
     """Tests for Docker availability checks before init."""
 
@@ -212,7 +237,7 @@ class TestCheckDockerBeforeInit:
         from sonnet_cli.init_cmd import create_project
         from sonnet_cli.exceptions import DockerNotRunningError
 
-        with patch("sonnet_cli.init_cmd.check_docker_running", return_value=False):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=False):
             with pytest.raises(DockerNotRunningError):
                 create_project(
                     name="myproject",
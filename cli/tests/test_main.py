@@ -1,5 +1,8 @@
 """Tests for sonnet_cli.main module (CLI entry point)."""
 
+import subprocess
+import sys
+
 import pytest
 from typer.testing import CliRunner
 from unittest.mock import patch, MagicMock
@@ -57,9 +60,9 @@ class TestInitCommandCLI:
         """Init command creates a project when invoked."""
         from sonnet_cli.main import app
 
-        with patch("sonnet_cli.main.check_docker_running", return_value=True):
-            with patch("sonnet_cli.main.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
-                with patch("sonnet_cli.main.detect_port_conflicts", return_value={}):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=True):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb", "pgadmin"], [])):
+                with patch("sonnet_cli.checks.detect_port_conflicts", return_value={}):
                     result = runner.invoke(
                         app,
                         ["init", "testproject", "--target-dir", str(tmp_path)],
@@ -72,7 +75,7 @@ class TestInitCommandCLI:
         """Init command shows error when Docker is not running."""
         from sonnet_cli.main import app
 
-        with patch("sonnet_cli.main.check_docker_running", return_value=False):
+        with patch("sonnet_cli.checks.check_docker_running", return_value=False):
             result = runner.invoke(
                 app,
                 ["init", "testproject", "--target-dir", str(tmp_path)],
@@ -138,3 +141,68 @@ class TestStatusCommandCLI:
             result = runner.invoke(app, ["status", "--project-dir", str(tmp_path)])
 
         assert result.exit_code == 0
+
+
+# Cumulative import time of sonnet_cli.main, in microseconds (about 55ms locally)
+IMPORT_BUDGET_US = 100_000
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter so imports start from scratch."""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+class TestStartupCost:
+    """Tests for keeping CLI startup cheap."""
+
+    def test_main_does_not_import_command_implementations(self):
+        """Templates, jinja2 and rich widgets load only when a command needs them."""
+        result = _run_python(
+            "import sys, sonnet_cli.main; print(' '.join(sys.modules))"
+        )
+        loaded = set(result.stdout.split())
+        for module in (
+            "jinja2",
+            "sonnet_cli.templates",
+            "sonnet_cli.init_cmd",
+            "sonnet_cli.stack",
+            "sonnet_cli.checks",
+            "rich.table",
+            "rich.panel",
+        ):
+            assert module not in loaded
+
+    def test_main_import_time_within_budget(self):
+        """Importing the CLI stays within the startup budget."""
+
+        def import_time() -> int:
+            result = _run_python("import sonnet_cli.main", "-X", "importtime")
+            line = next(
+                line for line in result.stderr.splitlines() if line.endswith("| sonnet_cli.main")
+            )
+            return int(line.split("|")[1])
+
+        # Best of three, so a cold bytecode cache doesn't count against it
+        assert min(import_time() for _ in range(3)) < IMPORT_BUDGET_US
+
+    def test_version_fast_path_skips_typer_and_rich(self):
+        """sonnet --version prints the version without loading the CLI framework."""
+        result = _run_python(
+            "import sys; sys.argv = ['sonnet', '--version'];"
+            "from sonnet_cli.__main__ import run; run();"
+            "print(any(m.split('.')[0] in ('typer', 'click', 'rich') for m in sys.modules))"
+        )
+        from sonnet_cli import __version__
+
+        assert result.stdout.splitlines() == [f"sonnet-cli version {__version__}", "False"]
+
+    def test_entry_point_dispatches_other_commands_to_app(self):
+        """Anything other than --version runs the typer app."""
+        from sonnet_cli.__main__ import run
+
+        with patch.object(sys, "argv", ["sonnet", "status"]):
+            with patch("sonnet_cli.main.app") as mock_app:
+                run()
+        mock_app.assert_called_once_with()
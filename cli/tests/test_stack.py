@@ -57,7 +57,7 @@ class TestUpCommand:
         with patch("subprocess.run") as mock_run:
             mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
             with patch(
-                "sonnet_cli.stack.check_images_exist",
+                "sonnet_cli.checks.check_images_exist",
                 return_value=(["pgduckdb"], ["jupyterbase"]),
             ) as mock_check:
                 result = up(project_dir=tmp_path)
@@ -76,7 +76,7 @@ class TestUpCommand:
 
         with patch("subprocess.run") as mock_run:
             mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-            with patch("sonnet_cli.stack.check_images_exist", return_value=(["pgduckdb"], [])):
+            with patch("sonnet_cli.checks.check_images_exist", return_value=(["pgduckdb"], [])):
                 result = up(project_dir=tmp_path)
 
         assert result.get("success") is True
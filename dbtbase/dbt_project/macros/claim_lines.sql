@@ -0,0 +1,25 @@
+{% macro claim_line_fields() -%}
+    {#-
+      The 13 repeating line-item column groups in raw_claims, as
+      (source column prefix, staging column name, cast type or none).
+      stg_claims exposes each as <name>_1..<name>_13 and stg_claim_lines
+      unpivots them into one row per line.
+    -#}
+    {{ return([
+        ('PRF_PHYSN_NPI', 'provider_npi', none),
+        ('TAX_NUM', 'tax_number', none),
+        ('HCPCS_CD', 'procedure_code', none),
+        ('LINE_NCH_PMT_AMT', 'payment_amount', 'decimal(10,2)'),
+        ('LINE_BENE_PTB_DDCTBL_AMT', 'deductible_amount', 'decimal(10,2)'),
+        ('LINE_BENE_PRMRY_PYR_PD_AMT', 'primary_payer_paid_amount', 'decimal(10,2)'),
+        ('LINE_COINSRNC_AMT', 'coinsurance_amount', 'decimal(10,2)'),
+        ('LINE_ALOWD_CHRG_AMT', 'allowed_amount', 'decimal(10,2)'),
+        ('LINE_PRCSG_IND_CD', 'processing_indicator', none),
+        ('LINE_ICD9_DGNS_CD', 'line_diagnosis_code', none),
+    ]) }}
+{%- endmacro %}
+
+
+{% macro claim_line_count() -%}
+    {{ return(13) }}
+{%- endmacro %}
@@ -0,0 +1,107 @@
+{% macro claims_source() -%}
+    {#-
+      Where stg_claims reads raw claims: 'postgres' (postgres_query over the
+      attached database) or 'parquet' (the MinIO export at claims_parquet_path,
+      read through httpfs). Set claims_source to force one; otherwise targets
+      listed in parquet_source_targets use 'parquet'.
+    -#}
+    {%- set source = var('claims_source', none)
+        or ('parquet' if target.name in var('parquet_source_targets', []) else 'postgres') -%}
+    {%- if source not in ['postgres', 'parquet'] -%}
+        {{ exceptions.raise_compiler_error(
+            "claims_source must be 'postgres' or 'parquet', got '" ~ source ~ "'") }}
+    {%- endif -%}
+    {{ return(source) }}
+{%- endmacro %}
+
+
+{% macro parquet_source_xmin() -%}
+    {#-
+      Parquet exports carry no row versions. This value is above any
+      postgres_snapshot_xmin() (those wrap at 2^32), so every Parquet row
+      counts as changed. Marts built from Parquet also record it as their
+      watermark, so switching back to PostgreSQL rebuilds every key (see
+      claims_watermark).
+    -#}
+    {{ return(4294967296) }}
+{%- endmacro %}
+
+
+{% macro parquet_partition_columns(path) -%}
+    {#-
+      Hive partition columns (key=value directories) found under a Parquet
+      glob, so models only filter on partitions the layout actually has.
+    -#}
+    {%- if not execute -%}
+        {{ return([]) }}
+    {%- endif -%}
+    {%- set query -%}
+        select distinct regexp_extract(part, '^([A-Za-z_][A-Za-z0-9_]*)=', 1)
+        from (select unnest(string_split(file, '/')) as part from glob('{{ path }}'))
+    {%- endset -%}
+    {{ return(run_query(query).columns[0].values() | reject('equalto', '') | list) }}
+{%- endmacro %}
+
+
+{% macro claims_source_watermark() -%}
+    {#-
+      The watermark incremental marts record for this run: the PostgreSQL
+      snapshot bound, or parquet_source_xmin() when claims come from Parquet,
+      which needs no PostgreSQL connection.
+    -#}
+    {%- if claims_source() == 'parquet' -%}
+        {{ return(parquet_source_xmin()) }}
+    {%- endif -%}
+    {{ return(postgres_snapshot_xmin()) }}
+{%- endmacro %}
+
+
+{% macro claims_watermark() -%}
+    {#-
+      Call from an incremental model: the source_watermark of its previous
+      run, or none when every key has to be rebuilt, as on a full refresh.
+      That is the case on full builds, in parquet mode (rows carry no xmin),
+      and when PostgreSQL's 32-bit transaction ids have wrapped around since
+      the last run; rows written after a wrap have xmins below the watermark
+      and would otherwise be missed.
+    -#}
+    {%- if not execute or not is_incremental() or claims_source() != 'postgres' -%}
+        {{ return(none) }}
+    {%- endif -%}
+    {%- set stored = run_query('select max(source_watermark) from ' ~ this).columns[0].values()[0] -%}
+    {%- if stored is none -%}
+        {{ return(none) }}
+    {%- endif -%}
+    {%- set current = postgres_snapshot_xmin() | int -%}
+    {%- if current < stored | int -%}
+        {{ log("PostgreSQL snapshot xmin " ~ current ~ " is below the watermark of " ~ this ~ " ("
+            ~ stored ~ "): transaction ids wrapped around or it was built from Parquet; rebuilding every key.",
+            info=true) }}
+        {{ return(none) }}
+    {%- endif -%}
+    {{ return(stored | int) }}
+{%- endmacro %}
+
+
+{% macro changed_claims(columns, watermark) -%}
+    {#-
+      postgres_query() relation of the distinct `columns` (PostgreSQL
+      expressions) of claims in the date window written after `watermark`.
+      Both predicates run inside PostgreSQL, so only the changed keys cross
+      the wire.
+    -#}
+    postgres_query(
+        '{{ var("pg_alias") }}',
+        'select distinct {{ columns }}
+         from public.{{ var("claims_source_table", "raw_claims") }}
+         where CLM_FROM_DT between ''{{ date_var_key("start_date") }}'' and ''{{ date_var_key("end_date") }}''
+           and xmin::text::bigint > {{ watermark }}'
+    )
+{%- endmacro %}
+
+
+{% macro changed_claim_months(watermark) -%}
+    {#- service_month of every month with a claim written after `watermark` -#}
+    select distinct try_strptime(claim_month || '01', '%Y%m%d')::date as service_month
+    from {{ changed_claims('left(CLM_FROM_DT, 6) as claim_month', watermark) }}
+{%- endmacro %}
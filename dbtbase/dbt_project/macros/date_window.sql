@@ -0,0 +1,8 @@
+{% macro date_var_key(var_name) -%}
+    {#- Return a YYYY-MM-DD date var as YYYYMMDD, the format of the raw claims date columns -#}
+    {%- set value = var(var_name) | string -%}
+    {%- if not modules.re.match('^[0-9]{4}-[0-9]{2}-[0-9]{2}$', value) -%}
+        {{ exceptions.raise_compiler_error(var_name ~ " must be a YYYY-MM-DD date, got '" ~ value ~ "'") }}
+    {%- endif -%}
+    {{ return(value | replace('-', '')) }}
+{%- endmacro %}
@@ -0,0 +1,96 @@
+{% macro distinct_count_mode() -%}
+    {#-
+      'exact' or 'approx'. Set distinct_count_mode to force a mode; otherwise
+      targets listed in approx_distinct_targets use 'approx'.
+    -#}
+    {%- set mode = var('distinct_count_mode', none)
+        or ('approx' if target.name in var('approx_distinct_targets', []) else 'exact') -%}
+    {%- if mode not in ['exact', 'approx'] -%}
+        {{ exceptions.raise_compiler_error(
+            "distinct_count_mode must be 'exact' or 'approx', got '" ~ mode ~ "'") }}
+    {%- endif -%}
+    {{ return(mode) }}
+{%- endmacro %}
+
+
+{% macro count_distinct(expression) -%}
+    {%- if distinct_count_mode() == 'approx' -%}
+        approx_count_distinct({{ expression }})
+    {%- else -%}
+        count(distinct {{ expression }})
+    {%- endif -%}
+{%- endmacro %}
+
+
+{#-
+  Mergeable HyperLogLog sketches.
+
+  DuckDB has no sketch type, so a sketch is stored as a sparse list of
+  {r: register, v: rank} structs (one entry per non-empty register, at most
+  2^hll_precision entries). Sketches of disjoint or overlapping groups merge by
+  taking the max rank per register, so distinct counts can be rolled up
+  across patients or months without rescanning claims.
+-#}
+
+{% macro hll_registers() -%}
+    {{ return(2 ** var('hll_precision', 10)) }}
+{%- endmacro %}
+
+
+{% macro hll_register(expression) -%}
+    (hash({{ expression }}) & {{ hll_registers() - 1 }})::usmallint
+{%- endmacro %}
+
+
+{% macro hll_rank(expression) -%}
+    {#- 1 + trailing zeros of the hash bits above the register bits; the sentinel bit caps it -#}
+    {%- set precision = var('hll_precision', 10) -%}
+    {%- set bits = "((hash(" ~ expression ~ ") >> " ~ precision ~ ") | (1::ubigint << " ~ (64 - precision) ~ "))" -%}
+    (bit_count(~{{ bits }} & ({{ bits }} - 1)) + 1)::utinyint
+{%- endmacro %}
+
+
+{% macro hll_sketch_query(relation, group_by, expression, sketch_name) -%}
+    {#- One row per group_by key with the sketch of the non-null values of expression -#}
+    select
+        {{ group_by | join(', ') }},
+        list({'r': hll_register, 'v': hll_rank} order by hll_register) as {{ sketch_name }}
+    from (
+        select
+            {{ group_by | join(', ') }},
+            {{ hll_register(expression) }} as hll_register,
+            max({{ hll_rank(expression) }}) as hll_rank
+        from {{ relation }}
+        where {{ expression }} is not null
+        group by all
+    )
+    group by all
+{%- endmacro %}
+
+
+{% macro hll_estimate(sketch) -%}
+    {#- Cardinality estimate of a sketch, with the linear counting correction for small sets -#}
+    {%- set m = hll_registers() -%}
+    list_transform([coalesce({{ sketch }}, [])], s -> list_transform(
+        [{{ (0.7213 / (1 + 1.079 / m)) * m * m }}
+            / (coalesce(list_sum(list_transform(s, e -> pow(2, -e.v::integer))), 0) + {{ m }} - len(s))],
+        raw -> case
+            when raw <= {{ 2.5 * m }} and len(s) < {{ m }} then {{ m }} * ln({{ m }} / ({{ m }} - len(s)))
+            else raw
+        end
+    )[1])[1]::bigint
+{%- endmacro %}
+
+
+{% macro hll_merge(sketches) -%}
+    {#- Merge a list of sketch entries (e.g. flatten(list(sketch))) keeping the max rank per register -#}
+    list_transform([list_sort({{ sketches }})], s ->
+        list_filter(s, (e, i) -> i = len(s) or s[i + 1].r != e.r)
+    )[1]
+{%- endmacro %}
+
+
+{% macro hll_merge_estimate(sketch_column) -%}
+    {#- Aggregate: distinct count across every row of a group, from their stored sketches -#}
+    {{ hll_estimate(hll_merge('flatten(list(' ~ sketch_column ~ '))')) }}
+{%- endmacro %}
@@ -0,0 +1,50 @@
+{% macro attach_postgres() -%}
+    {#-
+      Attach the source PostgreSQL database read-only so models can use
+      postgres_query(). Skipped when claims come from Parquet, so those runs
+      don't need a live PostgreSQL.
+    -#}
+    {%- if claims_source() == 'postgres' -%}
+    ATTACH IF NOT EXISTS '{{ var("pg_connection_string") }}' AS {{ var("pg_alias") }} (TYPE POSTGRES, READ_ONLY)
+    {%- endif -%}
+{%- endmacro %}
+
+
+{% macro postgres_snapshot_xmin() -%}
+    {#-
+      Return the id just below the oldest PostgreSQL transaction still in flight.
+      Every claim written by a transaction at or below this id is already visible,
+      so it is a safe high-water mark for incremental models keyed on source_xmin.
+    -#}
+    {%- if execute -%}
+        {%- set query -%}
+            select high from postgres_query(
+                '{{ var("pg_alias") }}',
+                'select ((pg_snapshot_xmin(pg_current_snapshot())::text::bigint - 1) % 4294967296) as high'
+            )
+        {%- endset -%}
+        {{ return(run_query(query).columns[0].values()[0]) }}
+    {%- else -%}
+        {{ return(0) }}
+    {%- endif -%}
+{%- endmacro %}
+
+
+{% macro postgres_table_manifest(table_name) -%}
+    {#-
+      Return a fingerprint of a PostgreSQL table's contents: its row count and
+      the newest xmin. Computed server-side, so only one row crosses the wire.
+      Loads, updates and deletes all change it.
+    -#}
+    {%- if execute -%}
+        {%- set query -%}
+            select manifest from postgres_query(
+                '{{ var("pg_alias") }}',
+                'select count(*)::text || '':'' || coalesce(max(xmin::text::bigint), 0)::text as manifest from public.{{ table_name }}'
+            )
+        {%- endset -%}
+        {{ return(run_query(query).columns[0].values()[0]) }}
+    {%- else -%}
+        {{ return('') }}
+    {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,119 @@
+{% macro query_plans_table() -%}
+    {{ return(target.schema ~ '.dbt_query_plans') }}
+{%- endmacro %}
+
+
+{% macro capture_query_plan() -%}
+    {#-
+      pre-hook: with --vars '{capture_query_plans: true}', run EXPLAIN ANALYZE
+      on the model's SQL and store DuckDB's JSON profile in dbt_query_plans,
+      keyed by invocation_id like dbt_run_history. It runs before the model
+      is built, so incremental models are profiled with the same filters.
+      The query runs twice, so leave this off for normal runs.
+    -#}
+    {%- if not execute or not var('capture_query_plans', false) -%}
+        {{ return('') }}
+    {%- endif -%}
+
+    {% do run_query('create schema if not exists ' ~ target.schema) %}
+    {% do run_query('create table if not exists ' ~ query_plans_table() ~ ' (
+        invocation_id varchar,
+        run_started_at timestamp,
+        unique_id varchar,
+        model_name varchar,
+        captured_at timestamp,
+        operator_seconds double,
+        plan json
+    )') %}
+
+    {%- set plan = run_query('explain (analyze, format json) ' ~ sql).rows[0][1] -%}
+    {% do run_query('insert into ' ~ query_plans_table() ~ ' values ('
+        ~ "'" ~ invocation_id ~ "', "
+        ~ "'" ~ run_started_at.strftime('%Y-%m-%d %H:%M:%S.%f') ~ "', "
+        ~ "'" ~ model.unique_id ~ "', "
+        ~ "'" ~ model.name ~ "', "
+        ~ "current_timestamp, "
+        ~ flatten_query_plan(fromjson(plan)) | sum(attribute='seconds') ~ ", "
+        ~ "'" ~ plan | replace("'", "''") ~ "')") %}
+    {{ return('') }}
+{%- endmacro %}
+
+
+{% macro flatten_query_plan(node, depth=0, operators=none) -%}
+    {#- Depth-first list of {depth, name, rows, seconds} for a DuckDB JSON profile -#}
+    {%- set operators = [] if operators is none else operators -%}
+    {%- if depth > 0 -%}
+        {%- do operators.append({
+            'depth': depth - 1,
+            'name': node.operator_type,
+            'rows': node.operator_cardinality,
+            'seconds': node.operator_timing,
+        }) -%}
+    {%- endif -%}
+    {%- for child in node.children -%}
+        {%- do flatten_query_plan(child, depth + 1, operators) -%}
+    {%- endfor -%}
+    {{ return(operators) }}
+{%- endmacro %}
+
+
+{% macro diff_query_plans(model_name, base_invocation=none, new_invocation=none, slowdown=1.5, min_seconds=0.01, fail_on_regression=false) %}
+    {#-
+      Compare two captured plans of a model (by default its latest two), e.g.
+        dbt run-operation diff_query_plans --args '{model_name: fct_claims_summary}'
+      Flags a changed plan shape and operators more than `slowdown` times
+      slower; operators faster than min_seconds are ignored.
+    -#}
+    {%- if not execute -%}
+        {{ return('') }}
+    {%- endif -%}
+
+    {%- set query -%}
+        select invocation_id, plan::varchar
+        from {{ query_plans_table() }}
+        where model_name = '{{ model_name }}'
+        {%- if base_invocation and new_invocation %}
+            and invocation_id in ('{{ base_invocation }}', '{{ new_invocation }}')
+        {%- endif %}
+        order by captured_at desc
+        limit 2
+    {%- endset -%}
+    {%- set captures = run_query(query).rows -%}
+    {%- if captures | length < 2 -%}
+        {{ exceptions.raise_compiler_error(
+            "Need two captured plans of " ~ model_name ~ "; run dbt with --vars '{capture_query_plans: true}'") }}
+    {%- endif -%}
+
+    {%- set new_ops = flatten_query_plan(fromjson(captures[0][1])) -%}
+    {%- set base_ops = flatten_query_plan(fromjson(captures[1][1])) -%}
+    {%- set base_shape = base_ops | map(attribute='name') | list -%}
+    {%- set new_shape = new_ops | map(attribute='name') | list -%}
+    {%- set state = namespace(regressed=false) -%}
+
+    {{ log(model_name ~ ": " ~ captures[1][0] ~ " -> " ~ captures[0][0], info=true) }}
+    {%- if base_shape != new_shape -%}
+        {%- set state.regressed = true -%}
+        {{ log("Plan shape changed. Before:", info=true) }}
+        {%- for op in base_ops -%}
+            {{ log("- " ~ "  " * op.depth ~ op.name ~ ": rows " ~ op.rows ~ ", " ~ "%.3f" | format(op.seconds) ~ "s", info=true) }}
+        {%- endfor -%}
+        {{ log("After:", info=true) }}
+        {%- for op in new_ops -%}
+            {{ log("+ " ~ "  " * op.depth ~ op.name ~ ": rows " ~ op.rows ~ ", " ~ "%.3f" | format(op.seconds) ~ "s", info=true) }}
+        {%- endfor -%}
+    {%- else -%}
+        {%- for base, new in zip(base_ops, new_ops) -%}
+            {%- set slower = new.seconds >= min_seconds and new.seconds > base.seconds * slowdown -%}
+            {%- if slower -%}
+                {%- set state.regressed = true -%}
+            {%- endif -%}
+            {{ log(("! " if slower else "  ") ~ "  " * new.depth ~ new.name
+                ~ ": rows " ~ base.rows ~ " -> " ~ new.rows ~ ", "
+                ~ "%.3f" | format(base.seconds) ~ "s -> " ~ "%.3f" | format(new.seconds) ~ "s", info=true) }}
+        {%- endfor -%}
+    {%- endif -%}
+
+    {%- if fail_on_regression and state.regressed -%}
+        {{ exceptions.raise_compiler_error("Query plan of " ~ model_name ~ " regressed") }}
+    {%- endif -%}
+{% endmacro %}
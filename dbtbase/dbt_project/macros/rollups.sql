@@ -0,0 +1,165 @@
+{% macro claims_line_rollup(dimension_expression, dimension_name) -%}
+    {#-
+      Body of a month x <dimension> rollup over stg_claim_lines.
+
+      Incremental runs rebuild every month that has a line written since the
+      previous run's source_watermark (models use unique_key='service_month'
+      with delete+insert), so each month is always aggregated in full.
+      claim_sketch is an HLL sketch of the cell's claims, so rollup_query can
+      estimate claim_count at coarser grains.
+    -#}
+    {%- set source_watermark = claims_source_watermark() %}
+    {%- set previous_watermark = claims_watermark() %}
+
+with lines as (
+    select
+        date_trunc('month', claim_from_date)::date as service_month,
+        {{ dimension_expression }} as {{ dimension_name }},
+        claim_id,
+        payment_amount,
+        allowed_amount
+    from {{ ref('stg_claim_lines') }}
+    where claim_from_date is not null
+),
+
+{% if previous_watermark is not none %}
+touched_months as (
+    {{ changed_claim_months(previous_watermark) }}
+),
+
+lines_to_update as materialized (
+    select * from lines
+    where service_month in (select service_month from touched_months)
+),
+{% else %}
+lines_to_update as materialized (
+    select * from lines
+),
+{% endif %}
+
+cells as (
+    select
+        service_month,
+        {{ dimension_name }},
+        count(*) as line_count,
+        {{ count_distinct('claim_id') }} as claim_count,
+        coalesce(sum(payment_amount), 0) as total_payment_amount,
+        coalesce(sum(allowed_amount), 0) as total_allowed_amount
+    from lines_to_update
+    group by service_month, {{ dimension_name }}
+),
+
+claim_sketches as (
+    {{ hll_sketch_query('lines_to_update', ['service_month', dimension_name], 'claim_id', 'claim_sketch') }}
+)
+
+select
+    cells.*,
+    claim_sketches.claim_sketch,
+    {{ source_watermark }}::bigint as source_watermark,
+    current_timestamp as dbt_created_at
+from cells
+left join claim_sketches
+    on cells.service_month = claim_sketches.service_month
+    and cells.{{ dimension_name }} is not distinct from claim_sketches.{{ dimension_name }}
+{%- endmacro %}
+
+
+{% macro rollup_cubes() -%}
+    {#- Rollup models from coarsest to finest; rollup_query() uses the first that fits -#}
+    {{ return([
+        {'model': 'fct_claims_monthly', 'dimensions': ['service_month'],
+         'sketches': {'claim_count': 'claim_sketch', 'patient_count': 'patient_sketch'}},
+        {'model': 'fct_claims_monthly_procedure', 'dimensions': ['service_month', 'procedure_code'],
+         'sketches': {'claim_count': 'claim_sketch'}},
+        {'model': 'fct_claims_monthly_diagnosis', 'dimensions': ['service_month', 'diagnosis_code'],
+         'sketches': {'claim_count': 'claim_sketch'}},
+        {'model': 'fct_claims_monthly_provider', 'dimensions': ['service_month', 'provider_npi'],
+         'sketches': {'claim_count': 'claim_sketch'}},
+    ]) }}
+{%- endmacro %}
+
+
+{% macro rollup_query(dimensions, measures=none, where=none, order_by=none, limit=none) -%}
+    {#-
+      Build SQL answering a dashboard question from the coarsest rollup that has
+      every requested dimension. service_quarter and service_year are derived
+      from service_month.
+
+      Additive measures (line_count, total_payment_amount, total_allowed_amount)
+      can be rolled up from any finer cube. claim_count and patient_count are
+      distinct counts: at the cube's own grain they are read as stored,
+      otherwise they are estimated by merging the cube's HLL sketches.
+    -#}
+    {%- set derived = {
+        'service_quarter': "date_trunc('quarter', service_month)::date",
+        'service_year': "date_trunc('year', service_month)::date",
+    } -%}
+    {%- set additive = ['line_count', 'total_payment_amount', 'total_allowed_amount'] -%}
+    {%- set measures = measures or ['line_count', 'total_payment_amount'] -%}
+    {%- set base_dimensions = [] -%}
+    {%- for dimension in dimensions -%}
+        {%- do base_dimensions.append('service_month' if dimension in derived else dimension) -%}
+    {%- endfor -%}
+
+    {%- set cube = namespace(model=none, dimensions=[], sketches={}) -%}
+    {%- for candidate in rollup_cubes() -%}
+        {%- if cube.model is none -%}
+            {%- set missing = [] -%}
+            {%- for dimension in base_dimensions if dimension not in candidate.dimensions -%}
+                {%- do missing.append(dimension) -%}
+            {%- endfor -%}
+            {%- if missing | length == 0 -%}
+                {%- set cube.model = candidate.model -%}
+                {%- set cube.dimensions = candidate.dimensions -%}
+                {%- set cube.sketches = candidate.sketches -%}
+            {%- endif -%}
+        {%- endif -%}
+    {%- endfor -%}
+    {%- if cube.model is none -%}
+        {{ exceptions.raise_compiler_error("No rollup cube has all of the dimensions " ~ dimensions) }}
+    {%- endif -%}
+
+    {%- set exact_grain = (dimensions | sort) == (cube.dimensions | sort) -%}
+    {%- for measure in measures if measure not in additive and not exact_grain
+            and measure not in cube.sketches -%}
+        {{ exceptions.raise_compiler_error(
+            measure ~ " is a distinct count and " ~ cube.model ~ " has no sketch to roll it up"
+            ~ "; group by " ~ cube.dimensions ~ " or use an additive measure") }}
+    {%- endfor -%}
+
+    select
+        {%- for dimension in dimensions %}
+        {{ derived.get(dimension, dimension) }} as {{ dimension }},
+        {%- endfor %}
+        {%- for measure in measures %}
+        {%- if measure in additive or exact_grain %}
+        sum({{ measure }}) as {{ measure }}{{ "," if not loop.last }}
+        {%- else %}
+        {{ hll_merge_estimate(cube.sketches[measure]) }} as {{ measure }}{{ "," if not loop.last }}
+        {%- endif %}
+        {%- endfor %}
+    from {{ ref(cube.model) }}
+    {%- if where %}
+    where {{ where }}
+    {%- endif %}
+    group by all
+    {%- if order_by %}
+    order by {{ order_by }}
+    {%- endif %}
+    {%- if limit %}
+    limit {{ limit }}
+    {%- endif %}
+{%- endmacro %}
+
+
+{% macro query_rollup(dimensions, measures=none, where=none, order_by=none, limit=20) %}
+    {#-
+      Print the answer to a rollup question, e.g.
+        dbt run-operation query_rollup --args '{dimensions: [service_year, procedure_code], order_by: "total_payment_amount desc", limit: 10}'
+    -#}
+    {%- set sql = rollup_query(dimensions, measures, where, order_by, limit) -%}
+    {{ log(sql, info=true) }}
+    {%- set result = run_query(sql) -%}
+    {%- do result.print_table(max_rows=limit, max_column_width=40) -%}
+{% endmacro %}
@@ -0,0 +1,168 @@
+{% macro run_history_table() -%}
+    {{ return(target.schema ~ '.dbt_run_history') }}
+{%- endmacro %}
+
+
+{% macro record_run_results(results) -%}
+    {#-
+      on-run-end hook: append one row per model in this invocation to
+      dbt_run_history. results is the same data dbt writes to
+      target/run_results.json (which only exists after the hooks have run).
+
+      dbt-duckdb doesn't report rows affected, so for tables the row count
+      DuckDB keeps in its catalog is recorded instead.
+    -#}
+    {%- if not execute -%}
+        {{ return('') }}
+    {%- endif -%}
+
+    {%- set table_rows = {} -%}
+    {%- for row in run_query("select schema_name || '.' || table_name, estimated_size from duckdb_tables()") -%}
+        {%- do table_rows.update({row[0]: row[1]}) -%}
+    {%- endfor -%}
+
+    {%- set rows = [] -%}
+    {%- for result in results if result.node.resource_type in ['model', 'snapshot', 'seed'] -%}
+        {%- set timing = namespace(started_at=none, completed_at=none) -%}
+        {%- for step in result.timing if step.name == 'execute' -%}
+            {%- set timing.started_at = step.started_at -%}
+            {%- set timing.completed_at = step.completed_at -%}
+        {%- endfor -%}
+        {%- set rows_affected = (result.adapter_response or {}).get('rows_affected') -%}
+        {%- if rows_affected is none or rows_affected < 0 -%}
+            {%- set rows_affected = table_rows.get(result.node.schema ~ '.' ~ result.node.alias) -%}
+        {%- endif -%}
+        {%- do rows.append("("
+            ~ "'" ~ invocation_id ~ "', "
+            ~ "'" ~ run_started_at.strftime('%Y-%m-%d %H:%M:%S.%f') ~ "', "
+            ~ "'" ~ target.name ~ "', "
+            ~ target.threads ~ ", "
+            ~ "'" ~ flags.WHICH ~ "', "
+            ~ "'" ~ result.node.unique_id ~ "', "
+            ~ "'" ~ result.node.name ~ "', "
+            ~ "'" ~ result.status ~ "', "
+            ~ result.execution_time ~ ", "
+            ~ (rows_affected if rows_affected is not none else 'null') ~ ", "
+            ~ "'" ~ result.thread_id ~ "', "
+            ~ ("'" ~ timing.started_at.strftime('%Y-%m-%d %H:%M:%S.%f') ~ "'" if timing.started_at else 'null') ~ ", "
+            ~ ("'" ~ timing.completed_at.strftime('%Y-%m-%d %H:%M:%S.%f') ~ "'" if timing.completed_at else 'null')
+            ~ ")") -%}
+    {%- endfor -%}
+
+    {% do run_query('create schema if not exists ' ~ target.schema) %}
+    {% do run_query('create table if not exists ' ~ run_history_table() ~ ' (
+        invocation_id varchar,
+        run_started_at timestamp,
+        target_name varchar,
+        threads integer,
+        command varchar,
+        unique_id varchar,
+        model_name varchar,
+        status varchar,
+        execution_time double,
+        rows_affected bigint,
+        thread_id varchar,
+        started_at timestamp,
+        completed_at timestamp
+    )') %}
+    {%- if rows -%}
+        {% do run_query('insert into ' ~ run_history_table() ~ ' values ' ~ rows | join(', ')) %}
+        {{ log("Recorded " ~ rows | length ~ " model timings in " ~ run_history_table(), info=true) }}
+    {%- endif -%}
+    {{ return('') }}
+{%- endmacro %}
+
+
+{% macro model_timing_report(baseline_runs=10, regression_ratio=1.5, min_seconds=1.0, limit=10, fail_on_regression=false) %}
+    {#-
+      Print the latest run's slowest models and thread utilization, and flag
+      models whose time regressed against the median of their previous
+      baseline_runs successful runs, e.g.
+        dbt run-operation model_timing_report --args '{baseline_runs: 20, regression_ratio: 1.3}'
+      Models faster than min_seconds are never flagged. With
+      fail_on_regression the operation fails when any model regressed.
+    -#}
+    {%- set history = run_history_table() -%}
+    {%- set latest -%}
+        (select invocation_id from {{ history }} order by run_started_at desc limit 1)
+    {%- endset -%}
+
+    {%- set utilization_sql -%}
+        select
+            invocation_id,
+            min(run_started_at) as run_started_at,
+            any_value(target_name) as target_name,
+            count(*) as models,
+            round(epoch(max(completed_at) - min(started_at)), 2) as wall_seconds,
+            round(sum(execution_time), 2) as model_seconds,
+            any_value(threads) as threads,
+            round(sum(execution_time) / nullif(epoch(max(completed_at) - min(started_at)) * any_value(threads), 0), 2)
+                as thread_utilization
+        from {{ history }}
+        where invocation_id = {{ latest }}
+        group by invocation_id
+    {%- endset -%}
+
+    {%- set slowest_sql -%}
+        select model_name, status, round(execution_time, 2) as seconds, rows_affected, thread_id
+        from {{ history }}
+        where invocation_id = {{ latest }}
+        order by execution_time desc
+        limit {{ limit }}
+    {%- endset -%}
+
+    {%- set regressions_sql -%}
+        with runs as (
+            select
+                unique_id,
+                model_name,
+                invocation_id,
+                execution_time,
+                row_number() over (partition by unique_id order by run_started_at desc) as run_rank
+            from {{ history }}
+            where status = 'success'
+        ),
+
+        latest as (
+            select * from runs
+            where run_rank = 1 and invocation_id = {{ latest }}
+        ),
+
+        baseline as (
+            select unique_id, median(execution_time) as baseline_seconds, count(*) as baseline_runs
+            from runs
+            where run_rank between 2 and {{ baseline_runs + 1 }}
+            group by unique_id
+        )
+
+        select
+            latest.model_name,
+            round(latest.execution_time, 2) as seconds,
+            round(baseline.baseline_seconds, 2) as baseline_seconds,
+            baseline.baseline_runs,
+            round(latest.execution_time / nullif(baseline.baseline_seconds, 0), 2) as ratio
+        from latest
+        inner join baseline on latest.unique_id = baseline.unique_id
+        where latest.execution_time >= {{ min_seconds }}
+            and latest.execution_time >= baseline.baseline_seconds * {{ regression_ratio }}
+        order by ratio desc
+    {%- endset -%}
+
+    {%- if execute -%}
+        {%- if not adapter.get_relation(database=target.database, schema=target.schema, identifier='dbt_run_history') -%}
+            {{ exceptions.raise_compiler_error("No run history yet in " ~ history ~ "; run dbt first") }}
+        {%- endif -%}
+
+        {{ log("Latest run:", info=true) }}
+        {%- do run_query(utilization_sql).print_table(max_columns=10, max_column_width=40) -%}
+        {{ log("Slowest models:", info=true) }}
+        {%- do run_query(slowest_sql).print_table(max_rows=limit, max_column_width=40) -%}
+
+        {%- set regressions = run_query(regressions_sql) -%}
+        {{ log("Regressions (>= " ~ regression_ratio ~ "x the median of the previous " ~ baseline_runs ~ " runs):", info=true) }}
+        {%- do regressions.print_table(max_column_width=40) -%}
+        {%- if fail_on_regression and regressions.rows | length > 0 -%}
+            {{ exceptions.raise_compiler_error(regressions.rows | length ~ " model(s) regressed") }}
+        {%- endif -%}
+    {%- endif -%}
+{% endmacro %}
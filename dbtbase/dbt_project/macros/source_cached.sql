@@ -0,0 +1,74 @@
+{#
+  Materialize a model over a PostgreSQL source once per load instead of once per query.
+
+  Config:
+    source_table: PostgreSQL table whose manifest decides when to rebuild
+    cache_format: 'table' (local DuckDB table) or 'parquet' (Parquet file,
+                  e.g. in MinIO, exposed through a view)
+    location:     Parquet path when cache_format is 'parquet'
+    cache_key:    Extra string folded into the manifest, e.g. the date window,
+                  so changing the model's inputs also forces a rebuild
+
+  The source manifest (see postgres_table_manifest), together with a hash of
+  the compiled model SQL, is stored in dbt_source_manifests after each build;
+  later runs are no-ops until either changes, so editing the model rebuilds it.
+#}
+
+{% materialization source_cached, adapter='duckdb' %}
+  {%- set source_table = config.require('source_table') -%}
+  {%- set cache_format = config.get('cache_format', 'table') -%}
+  {%- set manifest_table = this.schema ~ '.dbt_source_manifests' -%}
+
+  {%- if cache_format not in ['table', 'parquet'] -%}
+    {{ exceptions.raise_compiler_error("cache_format must be 'table' or 'parquet', got '" ~ cache_format ~ "'") }}
+  {%- endif -%}
+
+  {%- set relation_type = 'table' if cache_format == 'table' else 'view' -%}
+  {%- set target_relation = this.incorporate(type=relation_type) -%}
+  {%- set existing_relation = load_cached_relation(this) -%}
+
+  {% do run_query('create schema if not exists ' ~ this.schema) %}
+  {% do run_query('create table if not exists ' ~ manifest_table ~ ' (model varchar primary key, manifest varchar, refreshed_at timestamp)') %}
+
+  {%- set manifest = postgres_table_manifest(source_table) ~ '|' ~ config.get('cache_key', '') ~ '|sql:' ~ local_md5(sql)[:12] -%}
+  {%- set stored = run_query("select manifest from " ~ manifest_table ~ " where model = '" ~ this.identifier ~ "'") -%}
+  {%- set stored_manifest = stored.columns[0].values()[0] if stored.rows | length > 0 else none -%}
+
+  {{ run_hooks(pre_hooks) }}
+
+  {%- if existing_relation is not none
+        and existing_relation.type == relation_type
+        and stored_manifest == manifest
+        and not should_full_refresh() -%}
+    {{ log("Source " ~ source_table ~ " unchanged (" ~ manifest ~ "); reusing cached " ~ this, info=true) }}
+    {% call noop_statement('main', 'CACHED') %}
+      -- {{ this }} is up to date with {{ source_table }} at {{ manifest }}
+    {% endcall %}
+  {%- else -%}
+    {%- if existing_relation is not none and existing_relation.type != relation_type -%}
+      {% do adapter.drop_relation(existing_relation) %}
+    {%- endif -%}
+
+    {%- if cache_format == 'table' -%}
+      {% call statement('main') %}
+        create or replace table {{ target_relation }} as (
+          {{ sql }}
+        )
+      {% endcall %}
+    {%- else -%}
+      {%- set location = config.require('location') -%}
+      {% call statement('main') %}
+        copy ({{ sql }}) to '{{ location }}' (format parquet);
+        create or replace view {{ target_relation }} as
+          select * from read_parquet('{{ location }}')
+      {% endcall %}
+    {%- endif -%}
+
+    {% do run_query("insert or replace into " ~ manifest_table ~ " values ('" ~ this.identifier ~ "', '" ~ manifest ~ "', current_timestamp)") %}
+  {%- endif -%}
+
+  {{ run_hooks(post_hooks) }}
+  {% do adapter.commit() %}
+
+  {{ return({'relations': [target_relation]}) }}
+{% endmaterialization %}
@@ -0,0 +1,101 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key='service_month',
+    incremental_strategy='delete+insert',
+    on_schema_change='fail',
+    tags=['marts', 'claims', 'rollup']
+  )
+}}
+
+{#
+  Monthly claims rollup, the coarsest cube behind the rollup_query macro.
+  Incremental runs rebuild only months with claims written since the last run.
+  claim_sketch and patient_sketch let rollup_query estimate distinct claims and
+  patients over quarters and years.
+#}
+
+{%- set source_watermark = claims_source_watermark() %}
+{%- set previous_watermark = claims_watermark() %}
+
+with claims as (
+    select
+        date_trunc('month', claim_from_date)::date as service_month,
+        claim_id,
+        patient_id
+    from {{ ref('stg_claims') }}
+    where claim_from_date is not null
+),
+
+lines as (
+    select
+        date_trunc('month', claim_from_date)::date as service_month,
+        payment_amount,
+        allowed_amount
+    from {{ ref('stg_claim_lines') }}
+    where claim_from_date is not null
+),
+
+{% if previous_watermark is not none %}
+touched_months as (
+    {{ changed_claim_months(previous_watermark) }}
+),
+
+claims_to_update as materialized (
+    select * from claims
+    where service_month in (select service_month from touched_months)
+),
+{% else %}
+claims_to_update as materialized (
+    select * from claims
+),
+{% endif %}
+
+claim_totals as (
+    select
+        service_month,
+        {{ count_distinct('claim_id') }} as claim_count,
+        {{ count_distinct('patient_id') }} as patient_count
+    from claims_to_update
+    group by service_month
+),
+
+claim_sketches as (
+    {{ hll_sketch_query('claims_to_update', ['service_month'], 'claim_id', 'claim_sketch') }}
+),
+
+patient_sketches as (
+    {{ hll_sketch_query('claims_to_update', ['service_month'], 'patient_id', 'patient_sketch') }}
+),
+
+line_totals as (
+    select
+        service_month,
+        count(*) as line_count,
+        coalesce(sum(payment_amount), 0) as total_payment_amount,
+        coalesce(sum(allowed_amount), 0) as total_allowed_amount
+    from lines
+    {% if previous_watermark is not none -%}
+    where service_month in (select service_month from touched_months)
+    {% endif -%}
+    group by service_month
+)
+
+select
+    claim_totals.service_month,
+    claim_totals.claim_count,
+    claim_totals.patient_count,
+    coalesce(line_totals.line_count, 0) as line_count,
+    coalesce(line_totals.total_payment_amount, 0) as total_payment_amount,
+    coalesce(line_totals.total_allowed_amount, 0) as total_allowed_amount,
+    claim_sketches.claim_sketch,
+    patient_sketches.patient_sketch,
+    {{ source_watermark }}::bigint as source_watermark,
+    current_timestamp as dbt_created_at
+from claim_totals
+left join line_totals
+    on claim_totals.service_month = line_totals.service_month
+left join claim_sketches
+    on claim_totals.service_month = claim_sketches.service_month
+left join patient_sketches
+    on claim_totals.service_month = patient_sketches.service_month
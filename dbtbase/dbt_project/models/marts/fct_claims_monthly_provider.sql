@@ -0,0 +1,16 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key='service_month',
+    incremental_strategy='delete+insert',
+    on_schema_change='fail',
+    tags=['marts', 'claims', 'rollup']
+  )
+}}
+
+{#
+  Month x provider rollup of claim lines for dashboard queries.
+  Query it through the rollup_query macro, which picks the coarsest cube.
+#}
+
+{{ claims_line_rollup('provider_npi', 'provider_npi') }}
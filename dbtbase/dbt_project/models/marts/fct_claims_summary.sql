@@ -1,6 +1,9 @@
 {{
   config(
-    materialized='table',
+    materialized=('external' if target.name in var('external_targets') else 'incremental'),
+    unique_key='patient_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='fail',
     tags=['marts', 'claims', 'summary']
   )
 }}
@@ -8,59 +11,130 @@
 {#
   Patient-level claims summary mart.
   Aggregates claims data by patient to provide key metrics.
+
+  Incremental runs recompute only patients with a claim written since the
+  previous run's source_watermark and replace their rows. The changed
+  patients are found inside PostgreSQL (see changed_claims); when there is no
+  usable watermark (see claims_watermark) every patient is recomputed.
+  Deleted claims are not detected; use `dbt run --full-refresh` after deletes.
+
+  In 'approx' distinct_count_mode the distinct counts use approx_count_distinct
+  and the diversity metrics also keep HLL sketches, so they can be rolled up
+  over cohorts with hll_merge_estimate(). Switching modes changes the columns;
+  run with --full-refresh afterwards.
+
+  Targets in external_targets write it as Parquet under external_root
+  instead, rebuilt in full on every run.
 #}
 
+{%- set source_watermark = claims_source_watermark() %}
+{%- set previous_watermark = claims_watermark() %}
+{%- set diversity_sketches = [
+    ('diagnosis_code_1', 'primary_diagnosis_sketch'),
+    ('provider_npi_1', 'primary_provider_sketch'),
+    ('procedure_code_1', 'primary_procedure_sketch'),
+] if distinct_count_mode() == 'approx' else [] %}
+
 with staged_claims as (
     select * from {{ ref('stg_claims') }}
 ),
 
-aggregated as (
+{% if previous_watermark is not none %}
+touched_patients as (
+    select DESYNPUF_ID as patient_id
+    from {{ changed_claims('DESYNPUF_ID', previous_watermark) }}
+),
+
+staged_claims_to_update as materialized (
+    select * from staged_claims
+    where patient_id in (select patient_id from touched_patients)
+),
+{% else %}
+staged_claims_to_update as materialized (
+    select * from staged_claims
+),
+{% endif %}
+
+claim_totals as (
     select
         patient_id,
 
         -- Claim counts
-        count(distinct claim_id) as total_claims,
+        {{ count_distinct('claim_id') }} as total_claims,
 
         -- Date range
         min(claim_from_date) as first_claim_date,
         max(claim_thru_date) as last_claim_date,
 
         -- Diagnosis diversity (count of unique primary diagnoses)
-        count(distinct diagnosis_code_1) as distinct_primary_diagnoses,
+        {{ count_distinct('diagnosis_code_1') }} as distinct_primary_diagnoses,
 
         -- Provider diversity
-        count(distinct provider_npi_1) as distinct_primary_providers,
+        {{ count_distinct('provider_npi_1') }} as distinct_primary_providers,
 
         -- Procedure diversity
-        count(distinct procedure_code_1) as distinct_primary_procedures,
+        {{ count_distinct('procedure_code_1') }} as distinct_primary_procedures
+
+    from staged_claims_to_update
+    group by patient_id
+),
+
+line_totals as (
+    -- Amounts across all 13 line items
+    select
+        patient_id,
+        sum(payment_amount) as total_payment_amount,
+        sum(allowed_amount) as total_allowed_amount
+    from {{ ref('stg_claim_lines') }}
+    {% if previous_watermark is not none -%}
+    where patient_id in (select patient_id from touched_patients)
+    {% endif -%}
+    group by patient_id
+),
 
-        -- Payment totals (sum across first 4 line items)
-        coalesce(sum(payment_amount_1), 0) +
-        coalesce(sum(payment_amount_2), 0) +
-        coalesce(sum(payment_amount_3), 0) +
-        coalesce(sum(payment_amount_4), 0) as total_payment_amount,
+{% for column, sketch in diversity_sketches %}
+{{ sketch }}es as (
+    {{ hll_sketch_query('staged_claims_to_update', ['patient_id'], column, sketch) }}
+),
+{% endfor %}
+
+aggregated as (
+    select
+        claim_totals.patient_id,
+        claim_totals.total_claims,
+        claim_totals.first_claim_date,
+        claim_totals.last_claim_date,
+        claim_totals.distinct_primary_diagnoses,
+        claim_totals.distinct_primary_providers,
+        claim_totals.distinct_primary_procedures,
 
-        -- Allowed charge totals
-        coalesce(sum(allowed_amount_1), 0) +
-        coalesce(sum(allowed_amount_2), 0) +
-        coalesce(sum(allowed_amount_3), 0) +
-        coalesce(sum(allowed_amount_4), 0) as total_allowed_amount,
+        -- Payment and allowed charge totals
+        coalesce(line_totals.total_payment_amount, 0) as total_payment_amount,
+        coalesce(line_totals.total_allowed_amount, 0) as total_allowed_amount,
 
         -- Average payment per claim
         case
-            when count(distinct claim_id) > 0 then
-                (coalesce(sum(payment_amount_1), 0) +
-                 coalesce(sum(payment_amount_2), 0) +
-                 coalesce(sum(payment_amount_3), 0) +
-                 coalesce(sum(payment_amount_4), 0)) / count(distinct claim_id)
+            when claim_totals.total_claims > 0 then
+                coalesce(line_totals.total_payment_amount, 0) / claim_totals.total_claims
             else 0
         end as avg_payment_per_claim,
 
+        -- Mergeable sketches behind the diversity metrics (approx mode only)
+        {%- for column, sketch in diversity_sketches %}
+        {{ sketch }}es.{{ sketch }},
+        {%- endfor %}
+
         -- Metadata
+        {{ source_watermark }}::bigint as source_watermark,
         current_timestamp as dbt_created_at
 
-    from staged_claims
-    group by patient_id
+    from claim_totals
+    left join line_totals
+        on claim_totals.patient_id = line_totals.patient_id
+    {%- for column, sketch in diversity_sketches %}
+    left join {{ sketch }}es
+        on claim_totals.patient_id = {{ sketch }}es.patient_id
+    {%- endfor %}
 )
 
 select * from aggregated
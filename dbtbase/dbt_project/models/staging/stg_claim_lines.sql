@@ -0,0 +1,47 @@
+{{
+  config(
+    materialized=('external' if target.name in var('external_targets') else 'table'),
+    tags=['staging', 'claims', 'lines']
+  )
+}}
+
+{#
+  One row per populated claim line item.
+  Unpivots the 13 line-item column groups of stg_claims in a single pass, so
+  marts can aggregate amounts with plain sum()s over every line.
+#}
+
+{%- set fields = claim_line_fields() %}
+
+with claims as (
+    select * from {{ ref('stg_claims') }}
+),
+
+unpivoted as (
+    select *
+    from claims
+    unpivot include nulls (
+        ({% for field in fields %}{{ field[1] }}{{ ", " if not loop.last }}{% endfor %})
+        for line_number in (
+            {%- for line in range(1, claim_line_count() + 1) %}
+            ({% for field in fields %}{{ field[1] }}_{{ line }}{{ ", " if not loop.last }}{% endfor %}) as '{{ line }}'{{ "," if not loop.last }}
+            {%- endfor %}
+        )
+    )
+)
+
+select
+    patient_id,
+    claim_id,
+    claim_from_date,
+    claim_thru_date,
+    cast(line_number as integer) as line_number,
+    {%- for field in fields %}
+    {{ field[1] }},
+    {%- endfor %}
+    source_xmin
+
+from unpivoted
+where procedure_code is not null
+    or payment_amount is not null
+    or allowed_amount is not null
@@ -1,6 +1,10 @@
 {{
   config(
-    materialized='view',
+    materialized=('view' if var('staging_cache') == 'none' or claims_source() == 'parquet' else 'source_cached'),
+    cache_format=var('staging_cache'),
+    source_table=var('claims_source_table', 'raw_claims'),
+    cache_key=var('start_date') ~ '..' ~ var('end_date'),
+    location=var('staging_parquet_location'),
     tags=['staging', 'claims']
   )
 }}
@@ -9,14 +13,59 @@
   Staging model for raw claims data.
   Queries PostgreSQL directly using DuckDB's postgres_scanner extension.
   Performs basic type casting and cleaning.
+
+  With staging_cache set to 'table' or 'parquet' the result is cached (see the
+  source_cached materialization) and only re-extracted when raw_claims changes.
+
+  source_xmin is the PostgreSQL transaction id that wrote each row; incremental
+  marts use it to find claims added or changed since their last run.
+
+  Only claims with CLM_FROM_DT between the start_date and end_date vars are
+  read, and only the columns in source_columns; both are applied inside
+  PostgreSQL so nothing else leaves it. Incremental marts find changed claims
+  with their own narrow query (see changed_claims).
+
+  With claims_source 'parquet' (see macros/claims_source.sql) the claims come
+  from the Parquet export in MinIO instead and the run needs no PostgreSQL. Only
+  source_columns are read from each file, a claim_year=YYYY hive layout is
+  pruned to the date window, and every column is cast to text to match the
+  PostgreSQL table. Staging is then always a view.
 #}
 
+{%- set start_key = date_var_key('start_date') %}
+{%- set end_key = date_var_key('end_date') %}
+{%- set source_columns = ['DESYNPUF_ID', 'CLM_ID', 'CLM_FROM_DT', 'CLM_THRU_DT'] %}
+{%- for line in range(1, 5) %}
+{%- do source_columns.append('ICD9_DGNS_CD_' ~ line) %}
+{%- endfor %}
+{%- for source_prefix, name, data_type in claim_line_fields() %}
+{%- for line in range(1, claim_line_count() + 1) %}
+{%- do source_columns.append(source_prefix ~ '_' ~ line) %}
+{%- endfor %}
+{%- endfor %}
+
 with source as (
-    select * from postgres_scan(
-        '{{ var("pg_connection_string") }}',
-        'public',
-        'raw_claims'
+    {%- if claims_source() == 'parquet' %}
+    {%- set parquet_path = var('claims_parquet_path') %}
+    {%- set partitions = parquet_partition_columns(parquet_path) %}
+    select
+        {%- for column in source_columns %}
+        {{ column }}::varchar as {{ column }},
+        {%- endfor %}
+        {{ parquet_source_xmin() }}::bigint as source_xmin
+    from read_parquet('{{ parquet_path }}', hive_partitioning = true, union_by_name = true)
+    where CLM_FROM_DT::varchar between '{{ start_key }}' and '{{ end_key }}'
+    {%- if 'claim_year' in partitions %}
+        and claim_year::integer between {{ start_key[:4] }} and {{ end_key[:4] }}
+    {%- endif %}
+    {%- else %}
+    select * from postgres_query(
+        '{{ var("pg_alias") }}',
+        'select {{ source_columns | join(", ") }}, xmin::text::bigint as source_xmin
+         from public.{{ var("claims_source_table", "raw_claims") }}
+         where CLM_FROM_DT between ''{{ start_key }}'' and ''{{ end_key }}'''
     )
+    {%- endif %}
 ),
 
 cleaned as (
@@ -27,9 +76,9 @@ cleaned as (
         -- Claim identifier
         CLM_ID as claim_id,
 
-        -- Date fields (keeping as text for now, cast in downstream models if needed)
-        CLM_FROM_DT as claim_from_date,
-        CLM_THRU_DT as claim_thru_date,
+        -- Date fields (YYYYMMDD text in the source)
+        try_strptime(CLM_FROM_DT, '%Y%m%d')::date as claim_from_date,
+        try_strptime(CLM_THRU_DT, '%Y%m%d')::date as claim_thru_date,
 
         -- Diagnosis codes (first 4)
         ICD9_DGNS_CD_1 as diagnosis_code_1,
@@ -37,31 +86,19 @@ cleaned as (
         ICD9_DGNS_CD_3 as diagnosis_code_3,
         ICD9_DGNS_CD_4 as diagnosis_code_4,
 
-        -- Provider NPIs (first 4)
-        PRF_PHYSN_NPI_1 as provider_npi_1,
-        PRF_PHYSN_NPI_2 as provider_npi_2,
-        PRF_PHYSN_NPI_3 as provider_npi_3,
-        PRF_PHYSN_NPI_4 as provider_npi_4,
-
-        -- HCPCS/Procedure codes (first 4)
-        HCPCS_CD_1 as procedure_code_1,
-        HCPCS_CD_2 as procedure_code_2,
-        HCPCS_CD_3 as procedure_code_3,
-        HCPCS_CD_4 as procedure_code_4,
-
-        -- Payment amounts (first 4 line items)
-        try_cast(LINE_NCH_PMT_AMT_1 as decimal(10,2)) as payment_amount_1,
-        try_cast(LINE_NCH_PMT_AMT_2 as decimal(10,2)) as payment_amount_2,
-        try_cast(LINE_NCH_PMT_AMT_3 as decimal(10,2)) as payment_amount_3,
-        try_cast(LINE_NCH_PMT_AMT_4 as decimal(10,2)) as payment_amount_4,
-
-        -- Allowed charge amounts (first 4 line items)
-        try_cast(LINE_ALOWD_CHRG_AMT_1 as decimal(10,2)) as allowed_amount_1,
-        try_cast(LINE_ALOWD_CHRG_AMT_2 as decimal(10,2)) as allowed_amount_2,
-        try_cast(LINE_ALOWD_CHRG_AMT_3 as decimal(10,2)) as allowed_amount_3,
-        try_cast(LINE_ALOWD_CHRG_AMT_4 as decimal(10,2)) as allowed_amount_4,
+        -- Line items 1-13: provider, procedure, amounts, processing indicator and diagnosis
+        {%- for source_prefix, name, data_type in claim_line_fields() %}
+        {%- for line in range(1, claim_line_count() + 1) %}
+        {% if data_type -%}
+        try_cast({{ source_prefix }}_{{ line }} as {{ data_type }}) as {{ name }}_{{ line }},
+        {%- else -%}
+        {{ source_prefix }}_{{ line }} as {{ name }}_{{ line }},
+        {%- endif %}
+        {%- endfor %}
+        {%- endfor %}
 
         -- Metadata
+        source_xmin,
         current_timestamp as dbt_loaded_at
 
     from source
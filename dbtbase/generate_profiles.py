@@ -0,0 +1,120 @@
+"""
+Generate dbt_project/profiles.yml with DuckDB settings sized for this host.
+
+Runs when the dbtbase container starts, so each machine gets dbt thread
+counts, DuckDB threads, memory_limit and a spill directory that match its
+cores and memory (container cgroup limits included). Hardware detection is
+shared with the pipelines: pipelinebase/performance.py is copied into this
+image at build time. Override with DBT_HOST_CORES / DBT_HOST_MEMORY_GB,
+or any single knob with DBT_THREADS / DUCKDB_THREADS / DUCKDB_MEMORY_LIMIT.
+
+    python generate_profiles.py [output_path]   # default: $DBT_PROFILES_DIR/profiles.yml
+"""
+import os
+import sys
+
+# performance.py is copied next to this file at build time (see the Dockerfile);
+# in a checkout it is imported from the sibling pipelinebase directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pipelinebase"))
+from performance import GIB, MIB, clamp, detect_cores, detect_memory_bytes
+
+DATA_DIR = "/apps/data"
+
+# path, share of memory for DuckDB, dbt threads per core, DuckDB threads per core
+TARGETS = {
+    "dev": {"path": "/apps/dbt.duckdb", "memory_share": 0.5, "dbt_threads_per_core": 0.25,
+            "duckdb_threads_per_core": 0.75},
+    "prod": {"path": "/apps/dbt_prod.duckdb", "memory_share": 0.5, "dbt_threads_per_core": 0.25,
+             "duckdb_threads_per_core": 0.75},
+    # Benchmarks own the machine: all cores, most of the memory, no ordering guarantees
+    "bench": {"path": f"{DATA_DIR}/dbt_bench.duckdb", "memory_share": 0.8,
+              "dbt_threads_per_core": 0.5, "duckdb_threads_per_core": 1.0},
+}
+
+MINIO_SETTINGS = """\
+        s3_endpoint: "{{ env_var('MINIO_ENDPOINT', 'minio:9000') }}"
+        s3_access_key_id: "{{ env_var('MINIO_ACCESS_KEY', 'admin') }}"
+        s3_secret_access_key: "{{ env_var('MINIO_SECRET_KEY', 'password') }}"
+        s3_use_ssl: false
+        s3_url_style: path"""
+
+
+def host_cores():
+    """Cores to size the profiles for: DBT_HOST_CORES or the detected cores."""
+    return int(os.getenv("DBT_HOST_CORES") or detect_cores())
+
+
+def host_memory_bytes():
+    """Memory to size the profiles for: DBT_HOST_MEMORY_GB or the detected memory."""
+    if os.getenv("DBT_HOST_MEMORY_GB"):
+        return int(float(os.getenv("DBT_HOST_MEMORY_GB")) * GIB)
+    return detect_memory_bytes()
+
+
+def derive_target(name, cores, memory_bytes):
+    """Return the dbt and DuckDB settings for one target on a host."""
+    target = TARGETS[name]
+    settings = {
+        "threads": clamp(cores * target["duckdb_threads_per_core"], 1, 256),
+        "memory_limit": f"{int(memory_bytes * target['memory_share']) // MIB}MB",
+        # Spill to the dbt_data volume; DuckDB caps it at 90% of the free space
+        "temp_directory": f"{DATA_DIR}/duckdb_tmp/{name}",
+    }
+    if name == "bench":
+        settings["preserve_insertion_order"] = "false"
+
+    for key, env in (("threads", "DUCKDB_THREADS"), ("memory_limit", "DUCKDB_MEMORY_LIMIT")):
+        if os.getenv(env):
+            settings[key] = os.getenv(env)
+    dbt_threads = os.getenv("DBT_THREADS") or clamp(cores * target["dbt_threads_per_core"], 2, 16)
+    return {"path": target["path"], "dbt_threads": int(dbt_threads), "settings": settings}
+
+
+def render_profiles(cores, memory_bytes):
+    """Render profiles.yml for every target."""
+    lines = [
+        f"# Generated by generate_profiles.py for {cores} cores and {memory_bytes // GIB} GiB;",
+        "# the dbtbase container regenerates it for its host on start.",
+        "sonnet_claims:",
+        "  target: \"{{ env_var('DBT_TARGET', 'dev') }}\"",
+        "",
+        "  outputs:",
+    ]
+    for name in TARGETS:
+        target = derive_target(name, cores, memory_bytes)
+        lines += [
+            f"    {name}:",
+            "      type: duckdb",
+            f"      path: {target['path']}",
+            f"      threads: {target['dbt_threads']}",
+        ]
+        if name == "bench":
+            # Models materialized as 'external' are written here as Parquet
+            lines.append(f"      external_root: {DATA_DIR}/external")
+        lines += [
+            "      extensions:",
+            "        - postgres_scanner",
+            "        - httpfs",
+            "      settings:",
+        ]
+        lines += [f"        {key}: {value}" for key, value in target["settings"].items()]
+        lines += [MINIO_SETTINGS, ""]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    project_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dbt_project")
+    output = argv[0] if argv else os.path.join(
+        os.getenv("DBT_PROFILES_DIR", project_dir), "profiles.yml"
+    )
+    cores, memory = host_cores(), host_memory_bytes()
+
+    profiles = render_profiles(cores, memory)
+    with open(output, "w") as file:
+        file.write(profiles)
+    print(f"Wrote {output} for {cores} cores and {memory // GIB} GiB of memory.")
+
+
+if __name__ == "__main__":
+    main()
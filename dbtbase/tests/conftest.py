@@ -0,0 +1,5 @@
+import os
+import sys
+
+# generate_profiles.py lives at the root of the dbtbase image
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,68 @@
+import pytest
+import yaml
+
+import generate_profiles
+from generate_profiles import GIB, derive_target, host_cores, host_memory_bytes, render_profiles
+
+
+@pytest.fixture(autouse=True)
+def clear_overrides(monkeypatch):
+    for env in ("DBT_THREADS", "DUCKDB_THREADS", "DUCKDB_MEMORY_LIMIT",
+                "DBT_HOST_CORES", "DBT_HOST_MEMORY_GB"):
+        monkeypatch.delenv(env, raising=False)
+
+
+def test_derive_target_scales_with_host():
+    dev = derive_target("dev", cores=16, memory_bytes=64 * GIB)
+    bench = derive_target("bench", cores=16, memory_bytes=64 * GIB)
+
+    assert dev["dbt_threads"] == 4
+    assert dev["settings"]["threads"] == 12
+    assert dev["settings"]["memory_limit"] == "32768MB"
+    assert dev["settings"]["temp_directory"] == "/apps/data/duckdb_tmp/dev"
+    assert "preserve_insertion_order" not in dev["settings"]
+
+    assert bench["dbt_threads"] == 8
+    assert bench["settings"]["threads"] == 16
+    assert bench["settings"]["memory_limit"] == "52428MB"
+    assert bench["settings"]["preserve_insertion_order"] == "false"
+
+
+def test_derive_target_clamps_small_hosts():
+    target = derive_target("dev", cores=1, memory_bytes=2 * GIB)
+
+    assert target["dbt_threads"] == 2
+    assert target["settings"]["threads"] == 1
+
+
+def test_derive_target_env_overrides(monkeypatch):
+    monkeypatch.setenv("DBT_THREADS", "12")
+    monkeypatch.setenv("DUCKDB_THREADS", "3")
+    monkeypatch.setenv("DUCKDB_MEMORY_LIMIT", "48GB")
+
+    target = derive_target("prod", cores=4, memory_bytes=8 * GIB)
+
+    assert target["dbt_threads"] == 12
+    assert target["settings"]["threads"] == "3"
+    assert target["settings"]["memory_limit"] == "48GB"
+
+
+def test_host_overrides_replace_detected_hardware(monkeypatch, mocker):
+    mocker.patch.object(generate_profiles, "detect_cores", return_value=64)
+    mocker.patch.object(generate_profiles, "detect_memory_bytes", return_value=256 * GIB)
+    assert (host_cores(), host_memory_bytes()) == (64, 256 * GIB)
+
+    monkeypatch.setenv("DBT_HOST_CORES", "4")
+    monkeypatch.setenv("DBT_HOST_MEMORY_GB", "8")
+    assert (host_cores(), host_memory_bytes()) == (4, 8 * GIB)
+
+
+def test_render_profiles_is_valid_yaml_for_every_target():
+    profiles = yaml.safe_load(render_profiles(cores=8, memory_bytes=16 * GIB))
+    outputs = profiles["sonnet_claims"]["outputs"]
+
+    assert set(outputs) == {"dev", "prod", "bench"}
+    assert outputs["dev"]["threads"] == 2
+    assert outputs["dev"]["settings"]["memory_limit"] == "8192MB"
+    assert outputs["bench"]["external_root"] == "/apps/data/external"
+    assert outputs["prod"]["extensions"] == ["postgres_scanner", "httpfs"]
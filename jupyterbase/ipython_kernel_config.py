@@ -0,0 +1,7 @@
+import sys
+
+c = get_config()
+
+# Warm up DuckDB (extensions, pgduckdb attach, MinIO views) as each kernel starts
+sys.path.insert(0, "/apps")
+c.InteractiveShellApp.extensions = ["kernel_startup"]
@@ -0,0 +1,19 @@
+"""
+IPython extension that warms up every notebook kernel.
+
+Loaded through ipython_kernel_config.py. It starts the kernel's DuckDB
+connection (see notebook_query.start) while the kernel boots and puts the
+query helpers in the notebook namespace, so the first cell doesn't pay for
+loading extensions, attaching pgduckdb or reading MinIO Parquet metadata.
+"""
+import notebook_query
+
+
+def load_ipython_extension(ipython):
+    notebook_query.start()
+    ipython.push({
+        "connect": notebook_query.connect,
+        "query": notebook_query.query,
+        "stream": notebook_query.stream,
+        "load_claims": notebook_query.load_claims,
+    })
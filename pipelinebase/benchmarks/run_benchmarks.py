@@ -0,0 +1,231 @@
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import duckdb
+
+import config
+from db.duckdb import setup_duckdb_minio_connection
+from db.postgres import connect_to_db, copy_csv_to_db
+from etl_pipelines.duckdb_to_minio import export_csv_to_minio
+from etl_pipelines.minio_to_duckdb import import_minio_to_duckdb
+from ingest_claims.load_claims_to_db import download_file, extract_zip_file, rename_csv_file
+from ingest_claims.schema import create_claims_table
+from ingest_claims.synthetic_claims import write_synthetic_claims
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+BENCH_TABLE = "bench_raw_claims"
+BASELINE_WINDOW = 5
+
+
+def parse_scales(scales):
+    """Parse a comma-separated list of integer scale factors."""
+    return [int(scale) for scale in str(scales).split(",") if scale.strip()]
+
+
+def ensure_base_csv(csv_path):
+    """Download or generate the claims sample if the base CSV is not already present."""
+    if os.path.exists(csv_path):
+        return csv_path
+
+    if config.CLAIMS_SOURCE == "synthetic":
+        logger.info(f"{csv_path} not found; generating synthetic claims.")
+        write_synthetic_claims(
+            csv_path, config.SYNTHETIC_CLAIMS_ROWS, seed=config.SYNTHETIC_CLAIMS_SEED
+        )
+        return csv_path
+
+    logger.info(f"{csv_path} not found; downloading the claims sample.")
+    download_file(config.CLAIMS_URL, config.CLAIMS_ZIP_FILE)
+    extract_zip_file(config.CLAIMS_ZIP_FILE)
+    rename_csv_file(config.CLAIMS_ORIGINAL_CSV, csv_path)
+    return csv_path
+
+
+def build_scaled_csv(base_csv, scale, output_csv):
+    """
+    Write a CSV with the base sample repeated `scale` times.
+
+    Patient and claim ids are suffixed per copy so the scaled data keeps the
+    same claims-per-patient shape instead of piling onto the same keys.
+    Returns the number of rows written.
+    """
+    con = duckdb.connect()
+    try:
+        con.execute(f"""
+            COPY (
+                SELECT c.* REPLACE (
+                    CASE WHEN r.copy_id = 0 THEN c.DESYNPUF_ID
+                         ELSE c.DESYNPUF_ID || '_' || r.copy_id END AS DESYNPUF_ID,
+                    CASE WHEN r.copy_id = 0 THEN c.CLM_ID
+                         ELSE c.CLM_ID || '_' || r.copy_id END AS CLM_ID
+                )
+                FROM read_csv('{base_csv}', header = true, all_varchar = true) c,
+                     range({int(scale)}) r(copy_id)
+            ) TO '{output_csv}' (FORMAT CSV, HEADER);
+        """)
+        return con.execute(
+            f"SELECT COUNT(*) FROM read_csv('{output_csv}', header = true, all_varchar = true)"
+        ).fetchone()[0]
+    finally:
+        con.close()
+
+
+def timed(stage, rows, func, *args):
+    """Run one benchmark stage and return its timing record."""
+    logger.info(f"Running stage '{stage}'...")
+    start = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - start
+    logger.info(f"Stage '{stage}' finished in {seconds:.2f}s.")
+    return {
+        "seconds": round(seconds, 4),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+    }
+
+
+def bench_copy_load(csv_path):
+    """COPY the scaled CSV into a scratch PostgreSQL table."""
+    conn = connect_to_db()
+    if conn is None:
+        raise ConnectionError("Could not connect to PostgreSQL for the COPY benchmark.")
+    try:
+        with conn.cursor() as cur:
+            create_claims_table(cur)
+            cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+            cur.execute(f"CREATE TABLE {BENCH_TABLE} (LIKE raw_claims);")
+        conn.commit()
+        copy_csv_to_db(conn, csv_path, BENCH_TABLE)
+    finally:
+        conn.close()
+
+
+def bench_minio_import(con, object_name):
+    """Import the benchmark Parquet object from MinIO into DuckDB."""
+    con.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    import_minio_to_duckdb(con, config.MINIO_DEFAULT_BUCKET, object_name, BENCH_TABLE)
+
+
+def bench_dbt_marts(project_dir):
+    """Build the dbt models against the scratch PostgreSQL table."""
+    subprocess.run(
+        [
+            "dbt", "run",
+            "--project-dir", project_dir,
+            "--target", config.BENCH_DBT_TARGET,
+            "--vars", json.dumps({"claims_source_table": BENCH_TABLE}),
+        ],
+        check=True,
+    )
+
+
+def run_scale(base_csv, scale, work_dir="."):
+    """Run every stage at one scale factor and return the run record."""
+    scaled_csv = os.path.join(work_dir, f"bench_claims_{scale}x.csv")
+    object_name = f"bench/raw_claims_{scale}x.parquet"
+
+    rows = build_scaled_csv(base_csv, scale, scaled_csv)
+    logger.info(f"Benchmarking {rows} rows at {scale}x scale.")
+
+    stages = {"copy_load": timed("copy_load", rows, bench_copy_load, scaled_csv)}
+
+    con = setup_duckdb_minio_connection()
+    try:
+        stages["parquet_export"] = timed(
+            "parquet_export", rows, export_csv_to_minio, con, scaled_csv, object_name
+        )
+        stages["minio_import"] = timed("minio_import", rows, bench_minio_import, con, object_name)
+        con.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    finally:
+        con.close()
+
+    project_dir = config.BENCH_DBT_PROJECT_DIR
+    if project_dir and shutil.which("dbt"):
+        stages["dbt_marts"] = timed("dbt_marts", rows, bench_dbt_marts, project_dir)
+    else:
+        logger.info("Skipping 'dbt_marts': set BENCH_DBT_PROJECT_DIR and install dbt to run it.")
+
+    os.remove(scaled_csv)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "rows": rows,
+        "stages": stages,
+    }
+
+
+def load_history(history_file):
+    """Load previous benchmark runs, or an empty list if there are none."""
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, "r") as file:
+        return json.load(file)
+
+
+def save_history(history_file, history):
+    """Write the benchmark history back to disk."""
+    with open(history_file, "w") as file:
+        json.dump(history, file, indent=2)
+
+
+def find_regressions(history, run, threshold, window=BASELINE_WINDOW):
+    """
+    Compare a run against the median of recent runs on the same host and scale.
+
+    Returns a list of (stage, seconds, baseline_seconds) for every stage that
+    is slower than the baseline by more than `threshold` (a fraction).
+    """
+    previous = [
+        past for past in history
+        if past["scale"] == run["scale"] and past["host"] == run["host"]
+    ][-window:]
+
+    regressions = []
+    for stage, result in run["stages"].items():
+        timings = [past["stages"][stage]["seconds"] for past in previous if stage in past["stages"]]
+        if not timings:
+            continue
+        baseline = statistics.median(timings)
+        if result["seconds"] > baseline * (1 + threshold):
+            regressions.append((stage, result["seconds"], baseline))
+    return regressions
+
+
+def main():
+    base_csv = ensure_base_csv(config.CLAIMS_CSV_FILE)
+    history = load_history(config.BENCH_HISTORY_FILE)
+    regressed = False
+
+    for scale in parse_scales(config.BENCH_SCALES):
+        run = run_scale(base_csv, scale)
+
+        for stage, seconds, baseline in find_regressions(
+            history, run, config.BENCH_REGRESSION_THRESHOLD
+        ):
+            regressed = True
+            logger.warning(
+                f"Regression at {scale}x in '{stage}': {seconds:.2f}s vs baseline {baseline:.2f}s."
+            )
+
+        history.append(run)
+        save_history(config.BENCH_HISTORY_FILE, history)
+
+    logger.info(f"Benchmark results appended to {config.BENCH_HISTORY_FILE}.")
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 import os
 
+import performance
+
 
 # PostgreSQL Configuration
 DB_NAME = os.getenv("DB_NAME", "postgres")
@@ -18,6 +20,35 @@ MINIO_DEFAULT_BUCKET = os.getenv("MINIO_DEFAULT_BUCKET", "postgres-data")
 # DuckDB Configuration
 DUCKDB_PATH = os.getenv("DUCKDB_PATH", "/apps/my_database.duckdb")
 
+# Performance Configuration (PERF_PROFILE is "auto" or a preset in performance.PRESETS)
+# Each derived knob below can still be overridden by its own environment variable.
+PERF_PROFILE = os.getenv("PERF_PROFILE", "auto")
+_perf = performance.get_settings(
+    PERF_PROFILE,
+    work_dir=os.path.dirname(DUCKDB_PATH) if os.path.isdir(os.path.dirname(DUCKDB_PATH)) else ".",
+)
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", _perf["workers"]))
+DOWNLOAD_CHUNK_BYTES = int(os.getenv("DOWNLOAD_CHUNK_BYTES", _perf["download_chunk_bytes"]))
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", _perf["duckdb_threads"]))
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", _perf["duckdb_memory_limit"])
+DUCKDB_MAX_TEMP_SIZE = os.getenv("DUCKDB_MAX_TEMP_SIZE", _perf["duckdb_max_temp_size"])
+
+# Incremental Sync Configuration (PostgreSQL xmin or a monotonic column name)
+SYNC_WATERMARK_COLUMN = os.getenv("SYNC_WATERMARK_COLUMN", "xmin")
+
+# Checkpoint Configuration (lets interrupted loads and uploads resume)
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "/apps/pipeline_checkpoints.sqlite")
+COPY_CHUNK_ROWS = int(os.getenv("COPY_CHUNK_ROWS", _perf["copy_chunk_rows"]))
+EXPORT_PART_ROWS = int(os.getenv("EXPORT_PART_ROWS", 1_000_000))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", 3))
+
+# Streaming Read Configuration (rows per batch for stream_postgres_query / stream_duckdb_query)
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", 50_000))
+
+# Query Plan Capture Configuration (opt-in: set QUERY_PLAN_DIR to save plans per run)
+QUERY_PLAN_DIR = os.getenv("QUERY_PLAN_DIR", "")
+QUERY_PLAN_SLOWDOWN = float(os.getenv("QUERY_PLAN_SLOWDOWN", "1.5"))
+
 # Claims Data Configuration
 CLAIMS_URL = os.getenv(
     "CLAIMS_URL",
@@ -28,3 +59,26 @@ CLAIMS_CSV_FILE = os.getenv("CLAIMS_CSV_FILE", "claims.csv")
 CLAIMS_ORIGINAL_CSV = os.getenv(
     "CLAIMS_ORIGINAL_CSV", "DE1_0_2008_to_2010_Carrier_Claims_Sample_2A.csv"
 )
+
+# Synthetic Claims Configuration (CLAIMS_SOURCE=synthetic skips the download)
+CLAIMS_SOURCE = os.getenv("CLAIMS_SOURCE", "download")
+SYNTHETIC_CLAIMS_FILE = os.getenv("SYNTHETIC_CLAIMS_FILE", CLAIMS_CSV_FILE)
+SYNTHETIC_CLAIMS_ROWS = int(os.getenv("SYNTHETIC_CLAIMS_ROWS", 1_000_000))
+SYNTHETIC_CLAIMS_FORMAT = os.getenv("SYNTHETIC_CLAIMS_FORMAT", "csv")
+SYNTHETIC_CLAIMS_CHUNK_SIZE = int(
+    os.getenv("SYNTHETIC_CLAIMS_CHUNK_SIZE", _perf["synthetic_chunk_size"])
+)
+SYNTHETIC_CLAIMS_SEED = int(os.getenv("SYNTHETIC_CLAIMS_SEED", 0))
+
+# Data Quality Configuration (DQ_SOURCE is "postgres" or "duckdb")
+DQ_SOURCE = os.getenv("DQ_SOURCE", "postgres")
+DQ_CACHE_FILE = os.getenv("DQ_CACHE_FILE", "/apps/dq_profile_cache.json")
+DQ_MAX_PATTERN_VIOLATION_RATIO = float(os.getenv("DQ_MAX_PATTERN_VIOLATION_RATIO", "0.001"))
+DQ_MIN_ROWS = int(os.getenv("DQ_MIN_ROWS", 1))
+
+# Benchmark Configuration
+BENCH_SCALES = os.getenv("BENCH_SCALES", "1,10,100")
+BENCH_HISTORY_FILE = os.getenv("BENCH_HISTORY_FILE", "benchmark_history.json")
+BENCH_REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.2"))
+BENCH_DBT_PROJECT_DIR = os.getenv("BENCH_DBT_PROJECT_DIR", "")
+BENCH_DBT_TARGET = os.getenv("BENCH_DBT_TARGET", "bench")
@@ -0,0 +1,199 @@
+import fnmatch
+import json
+import os
+import sys
+
+import config
+from db.duckdb import setup_duckdb_postgres_connection
+from db.validation import validate_identifier
+from instrumentation import current_span, traced
+from logging_config import setup_logging
+from metrics import pipeline_run
+
+logger = setup_logging(__name__)
+
+# (column glob, full-match regex or None, max null ratio), first match wins.
+COLUMN_RULES = [
+    ("DESYNPUF_ID", r"[0-9A-F]{16}", 0.0),
+    ("CLM_ID", r"[0-9]+", 0.0),
+    ("CLM_FROM_DT", r"(19|20)[0-9]{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])", 0.0),
+    ("CLM_THRU_DT", r"(19|20)[0-9]{2}(0[1-9]|1[0-2])(0[1-9]|[12][0-9]|3[01])", 1.0),
+    ("*ICD9_DGNS_CD_*", r"[0-9EV][0-9]{2,4}|OTHER", 1.0),
+    ("HCPCS_CD_*", r"[0-9A-Z]{5}", 1.0),
+    ("PRF_PHYSN_NPI_*", r"[0-9]+", 1.0),
+    ("TAX_NUM_*", r"[0-9]+", 1.0),
+    ("LINE_*_AMT_*", r"-?[0-9]+(\.[0-9]+)?", 1.0),
+    ("LINE_PRCSG_IND_CD_*", r"[A-Z0-9!@#$%&*()+<>]{1,2}", 1.0),
+]
+
+METRICS = ("non_null", "distinct", "min", "max", "pattern_violations")
+
+
+def rule_for(column):
+    """Return (pattern, max_null_ratio) for a column; names are matched case-insensitively."""
+    for glob, pattern, max_null_ratio in COLUMN_RULES:
+        if fnmatch.fnmatchcase(column.upper(), glob):
+            return pattern, max_null_ratio
+    return None, 1.0
+
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build_profile_query(relation, columns):
+    """
+    Build one aggregate query that profiles every column in a single scan.
+
+    Returns the SQL and the (column, metric) pair for each output position
+    after the leading row count.
+    """
+    expressions = ["count(*)"]
+    outputs = []
+    for column in columns:
+        quoted = _quote_identifier(column)
+        pattern, _ = rule_for(column)
+        expressions += [
+            f"count({quoted})",
+            f"approx_count_distinct({quoted})",
+            f"min({quoted})::VARCHAR",
+            f"max({quoted})::VARCHAR",
+            (
+                f"coalesce(count_if(NOT regexp_full_match({quoted}::VARCHAR, '{pattern}')), 0)"
+                if pattern else "0"
+            ),
+        ]
+        outputs += [(column, metric) for metric in METRICS]
+    sql = f"SELECT {', '.join(expressions)} FROM {relation}"
+    return sql, outputs
+
+
+@traced()
+def profile_relation(con, relation):
+    """Compute null ratios, distinct estimates, min/max and pattern violations per column."""
+    columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()]
+    sql, outputs = build_profile_query(relation, columns)
+    values = con.execute(sql).fetchone()
+
+    rows = values[0]
+    profile = {"rows": rows, "columns": {column: {} for column in columns}}
+    for (column, metric), value in zip(outputs, values[1:]):
+        profile["columns"][column][metric] = value
+    for stats in profile["columns"].values():
+        stats["null_ratio"] = 1 - stats.pop("non_null") / rows if rows else 0.0
+
+    current_span().set(rows=rows, columns=len(columns))
+    return profile
+
+
+def table_version(con, table_name, source="postgres", pg_alias="pg"):
+    """
+    Return a string that changes whenever the table's contents change, or None.
+
+    For PostgreSQL this combines the relation's file node, size and write
+    counters; for DuckDB it is the watermark left by postgres_to_duckdb.
+    """
+    validate_identifier(table_name, "table name")
+    if source == "postgres":
+        sql = (
+            f"SELECT pg_relation_filenode('public.{table_name}')::text || ':' || "
+            f"pg_relation_size('public.{table_name}')::text || ':' || "
+            "(n_tup_ins + n_tup_upd + n_tup_del)::text AS version "
+            f"FROM pg_stat_user_tables WHERE relname = '{table_name}'"
+        )
+        quoted_sql = sql.replace("'", "''")
+        row = con.execute(
+            f"SELECT version FROM postgres_query('{pg_alias}', '{quoted_sql}')"
+        ).fetchone()
+        return row[0] if row else None
+
+    has_watermarks = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'sync_watermarks'"
+    ).fetchone()[0]
+    if not has_watermarks:
+        return None
+    row = con.execute(
+        "SELECT watermark || ':' || synced_at FROM sync_watermarks WHERE table_name = ?",
+        [table_name],
+    ).fetchone()
+    return row[0] if row else None
+
+
+def load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_cache(path, cache):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(cache, file, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def get_profile(con, table_name, source="postgres", cache_file=None, pg_alias="pg"):
+    """Profile a table, reusing the cached profile if the table version is unchanged."""
+    validate_identifier(table_name, "table name")
+    relation = f"{pg_alias}.public.{table_name}" if source == "postgres" else table_name
+    cache_key = f"{source}:{table_name}"
+
+    version = table_version(con, table_name, source, pg_alias)
+    cache = load_cache(cache_file) if cache_file else {}
+    cached = cache.get(cache_key)
+    if version is not None and cached and cached["version"] == version:
+        logger.info(f"Using cached profile of {relation} (version {version}).")
+        return cached["profile"]
+
+    profile = profile_relation(con, relation)
+    if cache_file and version is not None:
+        cache[cache_key] = {"version": version, "profile": profile}
+        save_cache(cache_file, cache)
+    return profile
+
+
+def check_thresholds(profile, max_violation_ratio=0.0, min_rows=1):
+    """Return a list of human-readable threshold failures (empty when the data passes)."""
+    rows = profile["rows"]
+    if rows < min_rows:
+        return [f"table has {rows} rows, expected at least {min_rows}"]
+
+    failures = []
+    for column, stats in profile["columns"].items():
+        _, max_null_ratio = rule_for(column)
+        if stats["null_ratio"] > max_null_ratio:
+            failures.append(
+                f"{column}: null ratio {stats['null_ratio']:.4f} exceeds {max_null_ratio}"
+            )
+        violation_ratio = stats["pattern_violations"] / rows
+        if violation_ratio > max_violation_ratio:
+            failures.append(
+                f"{column}: {stats['pattern_violations']} values ({violation_ratio:.4%}) "
+                "do not match the expected pattern"
+            )
+    return failures
+
+
+@pipeline_run("profile_claims")
+def main():
+    con = setup_duckdb_postgres_connection()
+    profile = get_profile(
+        con, "raw_claims", source=config.DQ_SOURCE, cache_file=config.DQ_CACHE_FILE
+    )
+    con.close()
+
+    failures = check_thresholds(
+        profile,
+        max_violation_ratio=config.DQ_MAX_PATTERN_VIOLATION_RATIO,
+        min_rows=config.DQ_MIN_ROWS,
+    )
+    logger.info(f"Profiled {len(profile['columns'])} columns over {profile['rows']} rows.")
+    for failure in failures:
+        logger.error(f"Data quality check failed - {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
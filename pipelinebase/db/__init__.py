@@ -1,12 +1,18 @@
-from db.postgres import connect_to_db, copy_csv_to_db
-from db.duckdb import setup_duckdb_minio_connection
+from db.postgres import connect_to_db, copy_csv_to_db, copy_csv_to_db_resumable
+from db.checkpoints import CheckpointStore, open_local_checkpoints, postgres_checkpoints
+from db.duckdb import setup_duckdb_minio_connection, setup_duckdb_postgres_connection
 from db.minio import get_minio_client, create_bucket_if_not_exists
 from db.validation import validate_identifier, validate_s3_path
 
 __all__ = [
     "connect_to_db",
     "copy_csv_to_db",
+    "copy_csv_to_db_resumable",
+    "CheckpointStore",
+    "open_local_checkpoints",
+    "postgres_checkpoints",
     "setup_duckdb_minio_connection",
+    "setup_duckdb_postgres_connection",
     "get_minio_client",
     "create_bucket_if_not_exists",
     "validate_identifier",
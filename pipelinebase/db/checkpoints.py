@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sqlite3
+
+import config
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+CHECKPOINT_TABLE = "pipeline_checkpoints"
+
+
+class CheckpointStore:
+    """
+    Record which units of a job (chunks, partitions, uploaded objects) are done.
+
+    Works on any DB-API connection. Use open_local_checkpoints() for a SQLite
+    file next to the pipeline, or postgres_checkpoints() to keep checkpoints in
+    the same database (and transaction) as the data being loaded.
+
+    The store can be used as a context manager; leaving it closes the connection.
+    """
+
+    def __init__(self, conn, placeholder="?"):
+        self.conn = conn
+        self.placeholder = placeholder
+        with self._cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                    job TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    detail TEXT,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (job, unit)
+                );
+            """)
+        self.conn.commit()
+
+    def _cursor(self):
+        cursor = self.conn.cursor()
+        # sqlite3 cursors are not context managers; psycopg2 cursors are.
+        if hasattr(cursor, "__enter__"):
+            return cursor
+        return _ClosingCursor(cursor)
+
+    def completed(self, job):
+        """Return {unit: detail} for every completed unit of a job."""
+        with self._cursor() as cur:
+            cur.execute(
+                f"SELECT unit, detail FROM {CHECKPOINT_TABLE} WHERE job = {self.placeholder}",
+                (job,),
+            )
+            return dict(cur.fetchall())
+
+    def mark_done(self, job, unit, detail=None, commit=True):
+        """
+        Record a unit as completed.
+
+        Pass commit=False to leave the commit to the caller, so the checkpoint
+        lands in the same transaction as the work it describes.
+        """
+        p = self.placeholder
+        with self._cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {CHECKPOINT_TABLE} WHERE job = {p} AND unit = {p}", (job, unit)
+            )
+            cur.execute(
+                f"INSERT INTO {CHECKPOINT_TABLE} (job, unit, detail) VALUES ({p}, {p}, {p})",
+                (job, unit, None if detail is None else str(detail)),
+            )
+        if commit:
+            self.conn.commit()
+
+    def reset(self, job):
+        """Forget every checkpoint of a job so it runs from the start."""
+        with self._cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {CHECKPOINT_TABLE} WHERE job = {self.placeholder}", (job,)
+            )
+        self.conn.commit()
+
+    def close(self):
+        """Close the underlying connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ClosingCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self.cursor
+
+    def __exit__(self, *exc_info):
+        self.cursor.close()
+
+
+def open_local_checkpoints(path=None):
+    """Open the SQLite checkpoint store at path (defaults to config.CHECKPOINT_PATH)."""
+    path = path or config.CHECKPOINT_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return CheckpointStore(sqlite3.connect(path), placeholder="?")
+
+
+def postgres_checkpoints(conn):
+    """Keep checkpoints in PostgreSQL alongside the loaded data."""
+    return CheckpointStore(conn, placeholder="%s")
+
+
+def file_job_key(prefix, path, chunk_bytes=1024 * 1024):
+    """
+    Build a job key tied to the contents of a specific input file.
+
+    The key combines the file size with a hash of the whole file, read in
+    chunk_bytes pieces, so a different file gets a new key and stale
+    checkpoints are never applied to it, while re-exporting the same data (a
+    new mtime, e.g. after psql \\COPY and docker cp) keeps the key and resumes.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_bytes):
+            digest.update(chunk)
+    return f"{prefix}:{os.path.basename(path)}:{os.path.getsize(path)}:{digest.hexdigest()[:16]}"
@@ -1,14 +1,29 @@
 import duckdb
 
 import config
+from db.streaming import iter_batches
+from db.validation import validate_identifier
+from instrumentation import traced
 from logging_config import setup_logging
 
 logger = setup_logging(__name__)
 
 
+def duckdb_settings():
+    """DuckDB connection settings derived from the active performance profile."""
+    settings = {
+        "threads": config.DUCKDB_THREADS,
+        "memory_limit": config.DUCKDB_MEMORY_LIMIT,
+    }
+    if config.DUCKDB_MAX_TEMP_SIZE:
+        settings["max_temp_directory_size"] = config.DUCKDB_MAX_TEMP_SIZE
+    return settings
+
+
+@traced()
 def setup_duckdb_minio_connection():
     """Configure DuckDB connection to MinIO and use persistent database."""
-    con = duckdb.connect(config.DUCKDB_PATH)
+    con = duckdb.connect(config.DUCKDB_PATH, config=duckdb_settings())
     con.execute("INSTALL httpfs;")
     con.execute("LOAD httpfs;")
     con.execute(f"""
@@ -20,3 +35,38 @@ def setup_duckdb_minio_connection():
     """)
     logger.debug("DuckDB MinIO connection established")
     return con
+
+
+@traced()
+def setup_duckdb_postgres_connection(alias="pg"):
+    """Open the persistent DuckDB database with PostgreSQL attached read-only."""
+    validate_identifier(alias, "attach alias")
+
+    con = duckdb.connect(config.DUCKDB_PATH, config=duckdb_settings())
+    con.execute("INSTALL postgres;")
+    con.execute("LOAD postgres;")
+    con.execute(f"""
+        ATTACH 'dbname={config.DB_NAME} user={config.DB_USER} password={config.DB_PASSWORD} host={config.DB_HOST} port={config.DB_PORT}'
+        AS {alias} (TYPE POSTGRES, READ_ONLY);
+    """)
+    logger.debug(f"DuckDB PostgreSQL connection attached as '{alias}'")
+    return con
+
+
+def stream_duckdb_query(
+    con, sql, params=None, batch_rows=None, output="pandas", progress=None, cancel=None
+):
+    """
+    Stream a query's result in batches of at most batch_rows rows.
+
+    DuckDB produces the result incrementally as batches are read, so only one
+    batch is in memory at a time. Yields pandas DataFrames, or
+    pyarrow.RecordBatches with output="arrow". progress and cancel behave as
+    in db.streaming.iter_batches; con.interrupt() stops a running query.
+    """
+    batch_rows = batch_rows or config.STREAM_BATCH_ROWS
+    reader = con.execute(sql, params).fetch_record_batch(batch_rows)
+    try:
+        yield from iter_batches(reader, output, progress, cancel, label="DuckDB query")
+    finally:
+        reader.close()
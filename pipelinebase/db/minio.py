@@ -1,11 +1,13 @@
 from minio import Minio
 
 import config
+from instrumentation import traced
 from logging_config import setup_logging
 
 logger = setup_logging(__name__)
 
 
+@traced()
 def get_minio_client():
     """Get a configured MinIO client instance."""
     return Minio(
@@ -16,6 +18,7 @@ def get_minio_client():
     )
 
 
+@traced()
 def create_bucket_if_not_exists(bucket_name):
     """Create a MinIO bucket if it doesn't already exist."""
     client = get_minio_client()
@@ -24,3 +27,18 @@ def create_bucket_if_not_exists(bucket_name):
         logger.info(f"Created bucket: {bucket_name}")
     else:
         logger.debug(f"Bucket already exists: {bucket_name}")
+
+
+@traced()
+def remove_objects(bucket_name, prefix, keep=()):
+    """Remove objects under prefix whose names are not in keep; returns how many."""
+    client = get_minio_client()
+    stale = [
+        obj.object_name
+        for obj in client.list_objects(bucket_name, prefix=prefix, recursive=True)
+        if obj.object_name not in keep
+    ]
+    for object_name in stale:
+        client.remove_object(bucket_name, object_name)
+        logger.debug(f"Removed s3://{bucket_name}/{object_name}")
+    return len(stale)
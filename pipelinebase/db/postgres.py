@@ -1,12 +1,55 @@
+import io
+import itertools
+import os
+import uuid
+
 import psycopg2
+import pyarrow as pa
 
 import config
+from db.checkpoints import postgres_checkpoints
+from db.streaming import iter_batches, rows_to_batch
 from db.validation import validate_identifier
+from instrumentation import current_span, traced
 from logging_config import setup_logging
 
 logger = setup_logging(__name__)
 
+# Arrow types for PostgreSQL type OIDs (cursor.description type_code)
+POSTGRES_ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    25: pa.string(),
+    700: pa.float32(),
+    701: pa.float64(),
+    1042: pa.string(),
+    1043: pa.string(),
+    1082: pa.date32(),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+    2950: pa.string(),
+}
+NUMERIC_OID = 1700
+
+
+def _arrow_type(column):
+    """
+    Arrow type for a cursor.description column.
 
+    numeric(p, s) becomes decimal128(38, s). Unconstrained numerics and
+    types without a mapping are streamed as text, so every batch has the
+    same schema whatever values it happens to hold.
+    """
+    if column.type_code in POSTGRES_ARROW_TYPES:
+        return POSTGRES_ARROW_TYPES[column.type_code]
+    if column.type_code == NUMERIC_OID and column.scale is not None and (column.precision or 0) <= 38:
+        return pa.decimal128(38, column.scale)
+    return None
+
+
+@traced()
 def connect_to_db():
     """Connect to PostgreSQL database using configuration settings."""
     try:
@@ -23,6 +66,7 @@ def connect_to_db():
         return None
 
 
+@traced()
 def copy_csv_to_db(conn, csv_file, table_name):
     """Copy CSV file data into a PostgreSQL table."""
     validate_identifier(table_name, "table name")
@@ -31,4 +75,113 @@ def copy_csv_to_db(conn, csv_file, table_name):
         with open(csv_file, "r") as file:
             cur.copy_expert(f"COPY {table_name} FROM STDIN WITH CSV HEADER", file)
         conn.commit()
+        current_span().set(table=table_name, rows=cur.rowcount, bytes=os.path.getsize(csv_file))
         logger.info(f"Copied data from {csv_file} into the {table_name} table.")
+
+
+@traced()
+def copy_csv_to_db_resumable(conn, csv_file, table_name, job, chunk_rows=None):
+    """
+    Copy CSV file data into a PostgreSQL table in checkpointed chunks.
+
+    Each chunk is committed together with its checkpoint row, so a rerun with
+    the same job key resumes at the byte offset where the last committed chunk
+    ended instead of starting over. Expects one record per line.
+
+    Returns the number of rows copied by this run.
+    """
+    validate_identifier(table_name, "table name")
+    chunk_rows = chunk_rows or config.COPY_CHUNK_ROWS
+
+    checkpoints = postgres_checkpoints(conn)
+    done = checkpoints.completed(job)
+    copied = 0
+
+    with conn.cursor() as cur, open(csv_file, "rb") as file:
+        if done:
+            last_chunk = max(done)
+            chunk_index = int(last_chunk.split("-")[1]) + 1
+            file.seek(int(done[last_chunk]))
+            logger.info(f"Resuming {csv_file} at chunk {chunk_index} ({len(done)} already loaded).")
+        else:
+            chunk_index = 0
+            file.readline()  # header
+
+        while True:
+            lines = list(itertools.islice(file, chunk_rows))
+            if not lines:
+                break
+            try:
+                cur.copy_expert(f"COPY {table_name} FROM STDIN WITH CSV", io.BytesIO(b"".join(lines)))
+                copied += cur.rowcount
+                checkpoints.mark_done(job, f"chunk-{chunk_index:06d}", file.tell(), commit=False)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            logger.debug(f"Committed chunk {chunk_index} of {csv_file} ({copied} rows this run).")
+            chunk_index += 1
+
+    current_span().set(table=table_name, rows=copied, bytes=os.path.getsize(csv_file))
+    logger.info(f"Copied {copied} rows from {csv_file} into the {table_name} table.")
+    return copied
+
+
+def _with_text(row, indexes):
+    row = list(row)
+    for i in indexes:
+        if row[i] is not None:
+            row[i] = str(row[i])
+    return row
+
+
+def _fetch_batches(conn, sql, params, batch_rows):
+    """
+    Yield Arrow batches from a named (server-side) cursor, closing it when done.
+
+    Column types come from the cursor description (see _arrow_type), so a
+    column that is all NULL in one batch has the same type in every batch.
+    """
+    cur = conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+    cur.itersize = batch_rows
+    try:
+        cur.execute(sql, params)
+        types = None
+        while True:
+            rows = cur.fetchmany(batch_rows)
+            if not rows:
+                return
+            # A named cursor's description is only available after the first fetch
+            if types is None:
+                columns = [column.name for column in cur.description]
+                types = [_arrow_type(column) for column in cur.description]
+                as_text = [i for i, type_ in enumerate(types) if type_ is None]
+                types = [type_ or pa.string() for type_ in types]
+            if as_text:
+                rows = [_with_text(row, as_text) for row in rows]
+            yield rows_to_batch(rows, columns, types)
+    finally:
+        cur.close()
+        conn.rollback()
+
+
+def stream_postgres_query(
+    conn, sql, params=None, batch_rows=None, output="pandas", progress=None, cancel=None
+):
+    """
+    Stream a query's result in batches of at most batch_rows rows.
+
+    Rows are read through a named server-side cursor, so PostgreSQL holds the
+    result and only one batch is in client memory at a time. Yields pandas
+    DataFrames, or pyarrow.RecordBatches with output="arrow". progress and
+    cancel behave as in db.streaming.iter_batches; to interrupt a fetch that
+    is already running, call conn.cancel() from another thread. The cursor's
+    transaction is rolled back when the stream ends, so use a connection
+    without uncommitted work.
+    """
+    batch_rows = batch_rows or config.STREAM_BATCH_ROWS
+    batches = _fetch_batches(conn, sql, params, batch_rows)
+    try:
+        yield from iter_batches(batches, output, progress, cancel, label="PostgreSQL query")
+    finally:
+        batches.close()
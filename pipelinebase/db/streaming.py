@@ -0,0 +1,46 @@
+import pyarrow as pa
+
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+OUTPUTS = ("pandas", "arrow")
+
+
+def iter_batches(batches, output="pandas", progress=None, cancel=None, label="query"):
+    """
+    Yield Arrow record batches as DataFrames or pyarrow.RecordBatches.
+
+    progress(rows, batches) is called after each batch with the running
+    totals. If the cancel event (e.g. a threading.Event) is set, iteration
+    stops before the next batch is fetched. Only one batch is held at a time.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {OUTPUTS}, got '{output}'")
+
+    batches = iter(batches)
+    rows = count = 0
+    while cancel is None or not cancel.is_set():
+        batch = next(batches, None)
+        if batch is None:
+            logger.debug(f"Streamed {rows} rows of {label} in {count} batches.")
+            return
+        rows += batch.num_rows
+        count += 1
+        if progress:
+            progress(rows, count)
+        yield batch.to_pandas() if output == "pandas" else batch
+    logger.info(f"Cancelled streaming {label} after {rows} rows in {count} batches.")
+
+
+def rows_to_batch(rows, columns, types=None):
+    """
+    Build an Arrow record batch from DB-API row tuples.
+
+    types gives each column's Arrow type; columns without one (or all of
+    them, when types is None) are inferred from this batch's values.
+    """
+    types = types or [None] * len(columns)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=type_) for values, type_ in zip(zip(*rows), types)], names=columns
+    )
@@ -1,27 +1,120 @@
+import math
+import os
+import time
+
+import duckdb
+
 import config
+from db.checkpoints import file_job_key, open_local_checkpoints
 from db.duckdb import setup_duckdb_minio_connection
-from db.minio import create_bucket_if_not_exists
+from db.minio import create_bucket_if_not_exists, remove_objects
+from db.validation import validate_s3_path
+from instrumentation import current_span, traced
 from logging_config import setup_logging
+from metrics import RETRIES, pipeline_run
+from query_plans import capture_duckdb_plan
 
 logger = setup_logging(__name__)
 
 
-def export_csv_to_minio(con):
+@traced()
+def export_csv_to_minio(con, csv_path="/apps/raw_claims.csv", object_name="raw_claims.parquet"):
     """Export CSV data to MinIO as Parquet using DuckDB."""
     bucket_name = config.MINIO_DEFAULT_BUCKET
+    validate_s3_path(bucket_name, object_name)
     create_bucket_if_not_exists(bucket_name)
 
-    con.execute(f"""
-        COPY (
-            SELECT * FROM read_csv_auto('/apps/raw_claims.csv')
-        ) TO 's3://{bucket_name}/raw_claims.parquet' (FORMAT PARQUET);
-    """)
+    with capture_duckdb_plan(con, "export_csv"):
+        rows = con.execute(f"""
+            COPY (
+                SELECT * FROM read_csv_auto('{csv_path}')
+            ) TO 's3://{bucket_name}/{object_name}' (FORMAT PARQUET);
+        """).fetchone()[0]
+    current_span().set(rows=rows, bytes=os.path.getsize(csv_path))
     logger.info("CSV successfully converted and uploaded to MinIO.")
 
 
+def _upload_with_retries(con, sql, max_retries):
+    """Run an upload statement, retrying transient S3 errors with backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return con.execute(sql).fetchone()[0]
+        except duckdb.IOException as e:
+            if attempt == max_retries:
+                raise
+            RETRIES.inc(stage="export_part")
+            delay = 2 ** attempt
+            logger.warning(f"Upload failed ({e}); retrying in {delay}s.")
+            time.sleep(delay)
+
+
+@traced()
+def export_csv_to_minio_parts(
+    con, checkpoints, csv_path="/apps/raw_claims.csv", prefix="raw_claims", part_rows=None
+):
+    """
+    Export CSV data to MinIO as numbered Parquet parts under prefix/.
+
+    Every uploaded part is recorded in the checkpoint store, so a rerun on the
+    same CSV only uploads the parts that are missing, and a rerun after a
+    finished export returns without reading the CSV. Once all parts are
+    uploaded, other part-* objects under prefix/ (left by an earlier, larger
+    export) are removed so readers globbing prefix/*.parquet see only this CSV.
+
+    Returns the number of parts uploaded by this run.
+    """
+    part_rows = part_rows or config.EXPORT_PART_ROWS
+    bucket_name = config.MINIO_DEFAULT_BUCKET
+    validate_s3_path(bucket_name, prefix)
+
+    job = file_job_key(f"duckdb_to_minio:{prefix}:{part_rows}", csv_path)
+    done = checkpoints.completed(job)
+    if "complete" in done:
+        logger.info(f"s3://{bucket_name}/{prefix}/ is already up to date with {csv_path}.")
+        return 0
+
+    create_bucket_if_not_exists(bucket_name)
+
+    with capture_duckdb_plan(con, "export_source"):
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE export_source AS
+            SELECT * FROM read_csv_auto('{csv_path}');
+        """)
+    total_rows = con.execute("SELECT COUNT(*) FROM export_source").fetchone()[0]
+    num_parts = max(1, math.ceil(total_rows / part_rows))
+
+    part_names = [f"{prefix}/part-{part:05d}.parquet" for part in range(num_parts)]
+    uploaded = 0
+    for part, object_name in enumerate(part_names):
+        if object_name in done:
+            continue
+        with capture_duckdb_plan(con, f"export_part_{part:05d}"):
+            rows = _upload_with_retries(con, f"""
+                COPY (
+                    SELECT * FROM export_source
+                    WHERE rowid >= {part * part_rows} AND rowid < {(part + 1) * part_rows}
+                ) TO 's3://{bucket_name}/{object_name}' (FORMAT PARQUET);
+            """, config.UPLOAD_MAX_RETRIES)
+        checkpoints.mark_done(job, object_name, rows)
+        uploaded += 1
+        logger.debug(f"Uploaded {object_name} ({rows} rows).")
+
+    con.execute("DROP TABLE export_source;")
+    stale = remove_objects(bucket_name, f"{prefix}/part-", keep=set(part_names))
+    checkpoints.mark_done(job, "complete", num_parts)
+    current_span().set(rows=total_rows, bytes=os.path.getsize(csv_path), parts=uploaded)
+    logger.info(
+        f"Uploaded {uploaded} of {num_parts} parts to s3://{bucket_name}/{prefix}/ "
+        f"({num_parts - uploaded} already present, {stale} stale parts removed)."
+    )
+    return uploaded
+
+
+@pipeline_run("duckdb_to_minio")
 def main():
     con = setup_duckdb_minio_connection()
-    export_csv_to_minio(con)
+    with open_local_checkpoints() as checkpoints:
+        export_csv_to_minio_parts(con, checkpoints)
     con.close()
 
 
@@ -1,28 +1,41 @@
 import config
 from db.duckdb import setup_duckdb_minio_connection
 from db.validation import validate_identifier, validate_s3_path
+from instrumentation import current_span, traced
 from logging_config import setup_logging
+from metrics import pipeline_run
+from query_plans import capture_duckdb_plan
 
 logger = setup_logging(__name__)
 
 
+@traced()
 def import_minio_to_duckdb(con, bucket_name, parquet_file, duckdb_table):
-    """Import Parquet data from MinIO into a DuckDB table."""
+    """
+    Import Parquet data from MinIO into a DuckDB table.
+
+    A parquet_file ending in "/" reads every Parquet part under that prefix.
+    """
     validate_s3_path(bucket_name, parquet_file)
     validate_identifier(duckdb_table, "table name")
 
     minio_url = f"s3://{bucket_name}/{parquet_file}"
-    con.execute(f"""
-        CREATE TABLE IF NOT EXISTS {duckdb_table} AS
-        SELECT * FROM read_parquet('{minio_url}');
-    """)
+    if parquet_file.endswith("/"):
+        minio_url += "*.parquet"
+    with capture_duckdb_plan(con, f"import_{duckdb_table}"):
+        result = con.execute(f"""
+            CREATE TABLE IF NOT EXISTS {duckdb_table} AS
+            SELECT * FROM read_parquet('{minio_url}');
+        """).fetchone()
+    current_span().set(table=duckdb_table, rows=result[0] if result else 0)
     logger.info(f"Successfully imported '{minio_url}' into DuckDB table '{duckdb_table}'.")
 
 
+@pipeline_run("minio_to_duckdb")
 def main():
     con = setup_duckdb_minio_connection()
     bucket_name = config.MINIO_DEFAULT_BUCKET
-    parquet_file = "raw_claims.parquet"
+    parquet_file = "raw_claims/"
     duckdb_table = "raw_claims"
 
     import_minio_to_duckdb(con, bucket_name, parquet_file, duckdb_table)
@@ -0,0 +1,233 @@
+import config
+from db.duckdb import setup_duckdb_postgres_connection
+from db.postgres import connect_to_db
+from db.validation import validate_identifier
+from instrumentation import current_span, traced
+from logging_config import setup_logging
+from metrics import pipeline_run
+from query_plans import capture_duckdb_plan, capture_postgres_plan, plans_enabled
+
+logger = setup_logging(__name__)
+
+WATERMARK_TABLE = "sync_watermarks"
+BATCH_TABLE = "sync_batch"
+
+# PostgreSQL's xmin is a 32-bit transaction id; the snapshot xmin is 64-bit.
+XID_MODULUS = 2**32
+
+
+def _quote_literal(value):
+    """Quote a value as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _watermark_expression(watermark_column):
+    """Return the PostgreSQL expression used to compare against the watermark."""
+    if watermark_column == "xmin":
+        return "xmin::text::bigint"
+    return validate_identifier(watermark_column, "watermark column")
+
+
+def _watermark_key(value):
+    """Compare numeric watermarks numerically and everything else as text."""
+    try:
+        return (0, int(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+
+def _postgres_query(pg_alias, sql):
+    """Run a query on the attached PostgreSQL database and return the relation SQL."""
+    return f"postgres_query({_quote_literal(pg_alias)}, {_quote_literal(sql)})"
+
+
+def ensure_watermark_table(con):
+    """Create the watermark bookkeeping table if it doesn't exist."""
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            table_name VARCHAR PRIMARY KEY,
+            watermark_column VARCHAR,
+            watermark VARCHAR,
+            rows_synced BIGINT,
+            synced_at TIMESTAMP
+        );
+    """)
+
+
+def get_watermark(con, table_name, watermark_column):
+    """
+    Return the stored high-water mark for a table, or None if it has never synced.
+
+    A mark recorded against a different watermark column is ignored, which
+    forces a full sync when the tracking strategy changes.
+    """
+    ensure_watermark_table(con)
+    row = con.execute(
+        f"SELECT watermark_column, watermark FROM {WATERMARK_TABLE} WHERE table_name = ?",
+        [table_name],
+    ).fetchone()
+    if row is None or row[0] != watermark_column:
+        return None
+    return row[1]
+
+
+def set_watermark(con, table_name, watermark_column, watermark, rows_synced):
+    """Record the high-water mark reached by the latest sync."""
+    ensure_watermark_table(con)
+    con.execute(
+        f"INSERT OR REPLACE INTO {WATERMARK_TABLE} VALUES (?, ?, ?, ?, current_timestamp)",
+        [table_name, watermark_column, str(watermark), rows_synced],
+    )
+
+
+@traced()
+def get_high_watermark(con, pg_alias, source_table, watermark_column):
+    """
+    Return the upper bound for the next batch, or None if the source is empty.
+
+    For xmin this is just below the oldest transaction still in flight, so rows
+    written by transactions that commit later are never skipped.
+    """
+    validate_identifier(source_table, "table name")
+
+    if watermark_column == "xmin":
+        sql = (
+            "SELECT ((pg_snapshot_xmin(pg_current_snapshot())::text::bigint - 1) "
+            f"% {XID_MODULUS})::text AS high"
+        )
+    else:
+        column = _watermark_expression(watermark_column)
+        sql = f"SELECT max({column})::text AS high FROM public.{source_table}"
+
+    row = con.execute(f"SELECT high FROM {_postgres_query(pg_alias, sql)}").fetchone()
+    return row[0] if row else None
+
+
+@traced()
+def stage_batch(con, pg_alias, source_table, watermark_column, low, high):
+    """Pull rows above the low mark and up to the high mark into a temp table."""
+    validate_identifier(source_table, "table name")
+    column = _watermark_expression(watermark_column)
+
+    predicate = f"{column} <= {_quote_literal(high)}"
+    if low is not None:
+        predicate = f"{column} > {_quote_literal(low)} AND {predicate}"
+
+    sql = f"SELECT * FROM public.{source_table} WHERE {predicate}"
+    with capture_duckdb_plan(con, "stage_batch"):
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {BATCH_TABLE} AS
+            SELECT * FROM {_postgres_query(pg_alias, sql)};
+        """)
+    if plans_enabled():
+        conn = connect_to_db()
+        try:
+            capture_postgres_plan(conn, sql, "stage_batch")
+        finally:
+            conn.close()
+    rows = con.execute(f"SELECT COUNT(*) FROM {BATCH_TABLE}").fetchone()[0]
+    current_span().set(rows=rows)
+    return rows
+
+
+@traced()
+def merge_batch(con, target_table, key_column):
+    """Upsert the staged batch into the target table by key."""
+    validate_identifier(target_table, "table name")
+    validate_identifier(key_column, "key column")
+
+    exists = con.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = ? AND NOT temporary",
+        [target_table],
+    ).fetchone()[0]
+
+    if not exists:
+        with capture_duckdb_plan(con, "merge_batch_create"):
+            con.execute(f"CREATE TABLE {target_table} AS SELECT * FROM {BATCH_TABLE};")
+        return
+
+    with capture_duckdb_plan(con, "merge_batch_delete"):
+        con.execute(f"""
+            DELETE FROM {target_table}
+            WHERE {key_column} IN (SELECT {key_column} FROM {BATCH_TABLE});
+        """)
+    with capture_duckdb_plan(con, "merge_batch_insert"):
+        con.execute(f"INSERT INTO {target_table} BY NAME SELECT * FROM {BATCH_TABLE};")
+
+
+@traced()
+def sync_postgres_to_duckdb(
+    con,
+    source_table,
+    target_table,
+    key_column,
+    watermark_column="xmin",
+    pg_alias="pg",
+    full_refresh=False,
+):
+    """
+    Incrementally copy new or changed rows from PostgreSQL into DuckDB.
+
+    Rows are selected by comparing watermark_column (PostgreSQL's xmin by
+    default, or a monotonically increasing column such as a batch id or load
+    timestamp) against the mark stored from the previous run. The batch and
+    the new mark are committed in one DuckDB transaction.
+
+    Returns the number of rows merged.
+    """
+    validate_identifier(target_table, "table name")
+
+    if full_refresh:
+        con.execute(f"DROP TABLE IF EXISTS {target_table};")
+        ensure_watermark_table(con)
+        con.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE table_name = ?", [target_table])
+
+    low = get_watermark(con, target_table, watermark_column)
+    high = get_high_watermark(con, pg_alias, source_table, watermark_column)
+
+    if high is None:
+        logger.info(f"Source table '{source_table}' is empty; nothing to sync.")
+        return 0
+
+    if low is not None and _watermark_key(high) <= _watermark_key(low):
+        if watermark_column == "xmin" and _watermark_key(high) < _watermark_key(low):
+            logger.warning(
+                "PostgreSQL transaction ids wrapped around; rerun with full_refresh=True."
+            )
+        logger.info(f"'{target_table}' is up to date at watermark {low}.")
+        return 0
+
+    con.execute("BEGIN TRANSACTION;")
+    try:
+        rows = stage_batch(con, pg_alias, source_table, watermark_column, low, high)
+        if rows:
+            merge_batch(con, target_table, key_column)
+        set_watermark(con, target_table, watermark_column, high, rows)
+        con.execute("COMMIT;")
+    except Exception:
+        con.execute("ROLLBACK;")
+        raise
+
+    current_span().set(table=target_table, rows=rows)
+    logger.info(
+        f"Synced {rows} rows from '{source_table}' into '{target_table}' "
+        f"({watermark_column} {low} -> {high})."
+    )
+    return rows
+
+
+@pipeline_run("postgres_to_duckdb")
+def main():
+    con = setup_duckdb_postgres_connection()
+    sync_postgres_to_duckdb(
+        con,
+        source_table="raw_claims",
+        target_table="raw_claims",
+        key_column="CLM_ID",
+        watermark_column=config.SYNC_WATERMARK_COLUMN,
+    )
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
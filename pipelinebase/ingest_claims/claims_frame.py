@@ -0,0 +1,140 @@
+import fnmatch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import config
+from db.duckdb import stream_duckdb_query
+from db.postgres import stream_postgres_query
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+# (column glob, compact type), first match wins. Every raw_claims column is TEXT.
+#   code:  repeated codes and ids, dictionary-encoded (pandas categorical)
+#   cents: dollar amounts as nullable integer cents
+#   date:  YYYYMMDD text as a date
+#   text:  everything else, as Arrow-backed strings instead of Python objects
+COLUMN_TYPES = [
+    ("DESYNPUF_ID", "code"),
+    ("CLM_FROM_DT", "date"),
+    ("CLM_THRU_DT", "date"),
+    ("*ICD9_DGNS_CD_*", "code"),
+    ("HCPCS_CD_*", "code"),
+    ("PRF_PHYSN_NPI_*", "code"),
+    ("TAX_NUM_*", "code"),
+    ("LINE_PRCSG_IND_CD_*", "code"),
+    ("LINE_*_AMT_*", "cents"),
+]
+
+# Amounts stay well below $21M, so cents fit in 32 bits.
+CENTS_TYPE = pa.int32()
+
+# Values that don't match these (after trimming spaces) become NULL instead of
+# failing the load. jupyterbase/notebook_query.py applies the same rules in SQL.
+DATE_PATTERN = r"^\d{8}$"
+AMOUNT_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def compact_type(column):
+    """Return the compact type for a claims column; names are matched case-insensitively."""
+    for glob, kind in COLUMN_TYPES:
+        if fnmatch.fnmatchcase(column.upper(), glob):
+            return kind
+    return "text"
+
+
+def _only_matching(values, pattern):
+    return pc.if_else(pc.match_substring_regex(values, pattern), values, pa.scalar(None, pa.string()))
+
+
+def _compact_column(values, kind):
+    # A batch whose column is all NULL arrives untyped; empty strings are missing values
+    values = values.cast(pa.string())
+    values = pc.if_else(pc.equal(values, ""), pa.scalar(None, pa.string()), values)
+    if kind == "code":
+        return pc.dictionary_encode(values)
+    if kind == "cents":
+        dollars = pc.cast(_only_matching(pc.utf8_trim(values, " "), AMOUNT_PATTERN), pa.float64())
+        # Round halves away from zero like DuckDB; out-of-range amounts become NULL
+        cents = pc.round(pc.multiply(dollars, 100), round_mode="half_towards_infinity")
+        in_range = pc.and_(
+            pc.greater_equal(cents, float(-2**31)), pc.less_equal(cents, float(2**31 - 1))
+        )
+        return pc.cast(pc.if_else(in_range, cents, pa.scalar(None, pa.float64())), CENTS_TYPE)
+    if kind == "date":
+        text = _only_matching(pc.utf8_trim(values, " "), DATE_PATTERN)
+        timestamps = pc.strptime(text, format="%Y%m%d", unit="s", error_is_null=True)
+        # strptime rolls impossible days over (20080230 -> March 1); treat them as bad values
+        valid = pc.equal(pc.strftime(timestamps, format="%Y%m%d"), text)
+        return pc.cast(pc.if_else(valid, timestamps, pa.scalar(None, timestamps.type)), pa.date32())
+    return values
+
+
+def compact_claims_batch(batch):
+    """Convert a batch of raw (all-text) claims columns to their compact Arrow types."""
+    return pa.RecordBatch.from_arrays(
+        [_compact_column(batch.column(name), compact_type(name)) for name in batch.schema.names],
+        names=batch.schema.names,
+    )
+
+
+def to_compact_frame(table):
+    """
+    Convert a compacted Arrow table to pandas.
+
+    Dictionary columns become categoricals, cents nullable Int32, dates
+    datetime64 and text columns pyarrow-backed strings.
+    """
+    frame = table.to_pandas(
+        date_as_object=False,
+        types_mapper={CENTS_TYPE: pd.Int32Dtype(), pa.string(): pd.StringDtype("pyarrow")}.get,
+    )
+    for column in frame.select_dtypes("category").columns:
+        # Arrow dictionaries use int32 indices; let pandas pick the smallest codes
+        frame[column] = pd.Categorical(frame[column])
+    return frame
+
+
+def frame_memory(frame):
+    """Bytes used by a DataFrame, including the Python objects it points to."""
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def load_compact_claims(
+    con, sql="SELECT * FROM raw_claims", source="postgres", batch_rows=None, report=True
+):
+    """
+    Load claims into a memory-compact DataFrame.
+
+    The query is streamed (see db.streaming) and each batch is compacted
+    before the next is read, so the all-text result is never held in full.
+    source is "postgres" (con is a psycopg2 connection) or "duckdb".
+
+    With report=True the memory the same rows would take as a plain
+    object-dtype DataFrame is measured batch by batch and logged next to the
+    compact size; both are also stored in frame.attrs["memory"].
+    """
+    if source not in ("postgres", "duckdb"):
+        raise ValueError(f"source must be 'postgres' or 'duckdb', got '{source}'")
+    stream = stream_postgres_query if source == "postgres" else stream_duckdb_query
+
+    raw_bytes = 0
+    batches = []
+    for batch in stream(con, sql, batch_rows=batch_rows or config.STREAM_BATCH_ROWS, output="arrow"):
+        if report:
+            raw_bytes += frame_memory(batch.to_pandas())
+        batches.append(compact_claims_batch(batch))
+    if not batches:
+        return pd.DataFrame()
+
+    frame = to_compact_frame(pa.Table.from_batches(batches))
+    if report:
+        compact_bytes = frame_memory(frame)
+        frame.attrs["memory"] = {"raw_bytes": raw_bytes, "compact_bytes": compact_bytes}
+        logger.info(
+            f"Loaded {len(frame)} claims: {raw_bytes / 1024**2:.1f} MiB as text, "
+            f"{compact_bytes / 1024**2:.1f} MiB compact ({raw_bytes / max(compact_bytes, 1):.1f}x smaller)."
+        )
+    return frame
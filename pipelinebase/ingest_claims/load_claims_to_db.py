@@ -3,9 +3,12 @@ import requests
 import zipfile
 
 import config
-from db.postgres import connect_to_db, copy_csv_to_db
-from ingest_claims.schema import create_claims_table
+from db.checkpoints import file_job_key, open_local_checkpoints, postgres_checkpoints
+from db.postgres import connect_to_db, copy_csv_to_db_resumable
+from ingest_claims.schema import claims_table_exists, create_claims_table
+from ingest_claims.synthetic_claims import write_synthetic_claims
 from logging_config import setup_logging
+from metrics import pipeline_run
 
 logger = setup_logging(__name__)
 
@@ -15,7 +18,7 @@ def download_file(url, zip_file_name):
     response = requests.get(url, stream=True)
     if response.status_code == 200:
         with open(zip_file_name, "wb") as file:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(chunk_size=config.DOWNLOAD_CHUNK_BYTES):
                 file.write(chunk)
         logger.info(f"{zip_file_name} downloaded successfully.")
     else:
@@ -50,29 +53,79 @@ def cleanup_files(*files):
             logger.debug(f"Removed {file}.")
 
 
+def csv_job_key(csv_file):
+    """
+    Checkpoint key for preparing csv_file from the configured claims source.
+
+    Synthetic claims also key on the generator settings, so switching source
+    or changing the row count, chunk size or seed produces a fresh CSV.
+    """
+    if config.CLAIMS_SOURCE == "synthetic":
+        source = (
+            f"synthetic:{config.SYNTHETIC_CLAIMS_ROWS}:"
+            f"{config.SYNTHETIC_CLAIMS_CHUNK_SIZE}:{config.SYNTHETIC_CLAIMS_SEED}"
+        )
+    else:
+        source = f"download:{config.CLAIMS_URL}"
+    return f"prepare_csv:{csv_file}:{source}"
+
+
+def csv_is_ready(checkpoints, csv_file):
+    """True if a previous run produced csv_file from the current source and it is unchanged."""
+    done = checkpoints.completed(csv_job_key(csv_file))
+    ready = os.path.exists(csv_file) and done.get("csv") == str(os.path.getsize(csv_file))
+    if not ready and os.path.exists(csv_file):
+        logger.info(f"{csv_file} was not produced from the current claims source; rebuilding it.")
+    return ready
+
+
+@pipeline_run("load_claims_to_db")
 def main():
     db = None
+    checkpoints = open_local_checkpoints()
 
     try:
-        # Download the file
-        download_file(config.CLAIMS_URL, config.CLAIMS_ZIP_FILE)
-
-        # Extract Zip File
-        extract_zip_file(config.CLAIMS_ZIP_FILE)
-        rename_csv_file(config.CLAIMS_ORIGINAL_CSV, config.CLAIMS_CSV_FILE)
-        cleanup_files(config.CLAIMS_ZIP_FILE)
+        if csv_is_ready(checkpoints, config.CLAIMS_CSV_FILE):
+            logger.info(f"Reusing {config.CLAIMS_CSV_FILE} from a previous run.")
+        elif config.CLAIMS_SOURCE == "synthetic":
+            # Generate claims locally instead of downloading the CMS sample
+            write_synthetic_claims(
+                config.CLAIMS_CSV_FILE,
+                config.SYNTHETIC_CLAIMS_ROWS,
+                chunk_size=config.SYNTHETIC_CLAIMS_CHUNK_SIZE,
+                seed=config.SYNTHETIC_CLAIMS_SEED,
+            )
+        else:
+            # Download the file
+            download_file(config.CLAIMS_URL, config.CLAIMS_ZIP_FILE)
+
+            # Extract Zip File
+            extract_zip_file(config.CLAIMS_ZIP_FILE)
+            rename_csv_file(config.CLAIMS_ORIGINAL_CSV, config.CLAIMS_CSV_FILE)
+            cleanup_files(config.CLAIMS_ZIP_FILE)
+
+        checkpoints.mark_done(
+            csv_job_key(config.CLAIMS_CSV_FILE),
+            "csv",
+            os.path.getsize(config.CLAIMS_CSV_FILE),
+        )
 
         # Connect to the Database
         logger.info("Connecting to the database...")
         db = connect_to_db()
 
+        job = file_job_key("load_claims", config.CLAIMS_CSV_FILE)
         with db.cursor() as cur:
+            table_created = not claims_table_exists(cur)
             create_claims_table(cur)
-            db.commit()
+        if table_created:
+            # Copy checkpoints describe rows in the old table; start over
+            postgres_checkpoints(db).reset(job)
+        db.commit()
 
-        # Copy the dataframe to the database
+        # Copy the CSV to the database, resuming after the last committed chunk
         logger.info("Copying data to the database...")
-        copy_csv_to_db(db, config.CLAIMS_CSV_FILE, "raw_claims")
+        copy_csv_to_db_resumable(db, config.CLAIMS_CSV_FILE, "raw_claims", job)
 
         logger.info("Data ingestion completed successfully.")
 
@@ -80,8 +133,10 @@ def main():
         logger.error(f"An error occurred: {e}")
         if db:
             db.rollback()
+        raise
     finally:
         logger.debug("Not removing the CSV file.")
+        checkpoints.close()
 
         if db:
             logger.info("Closing the database connection.")
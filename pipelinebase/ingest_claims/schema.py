@@ -1,6 +1,6 @@
-def create_claims_table(cur):
-    """Create the raw_claims table if it doesn't exist."""
-    ddl_statement = """
+import re
+
+CLAIMS_DDL = """
         CREATE TABLE IF NOT EXISTS raw_claims (
             DESYNPUF_ID TEXT,
             CLM_ID TEXT,
@@ -146,4 +146,17 @@ def create_claims_table(cur):
             LINE_ICD9_DGNS_CD_13 TEXT
             );
         """
-    cur.execute(ddl_statement)
+
+# Column names in table order, parsed from the DDL so the two never drift.
+CLAIMS_COLUMNS = re.findall(r"^\s+(\w+) TEXT", CLAIMS_DDL, re.MULTILINE)
+
+
+def claims_table_exists(cur):
+    """True if the raw_claims table already exists."""
+    cur.execute("SELECT to_regclass('raw_claims') IS NOT NULL;")
+    return cur.fetchone()[0]
+
+
+def create_claims_table(cur):
+    """Create the raw_claims table if it doesn't exist."""
+    cur.execute(CLAIMS_DDL)
@@ -0,0 +1,261 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+import config
+from ingest_claims.schema import CLAIMS_COLUMNS
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+LINE_ITEMS = 13
+DIAGNOSIS_CODES = 8
+CLAIMS_PER_PATIENT = 48
+FIRST_CLAIM_ID = 542_192_281_063_886
+FIRST_SERVICE_DATE = np.datetime64("2008-01-01")
+SERVICE_DAYS = 3 * 365
+MAX_STAY_DAYS = 60
+
+# The public use files round line amounts to $10, so amounts are drawn as
+# multiples of AMOUNT_STEP up to MAX_AMOUNT_STEPS steps.
+AMOUNT_STEP = 10
+MAX_AMOUNT_STEPS = 500
+
+# Most frequent codes in the CMS carrier claims sample, followed by a
+# generated long tail so distinct counts look like the real data.
+COMMON_ICD9_CODES = [
+    "4019", "25000", "2724", "V5869", "4011", "42731", "2720", "4280",
+    "V5861", "41401", "7242", "496", "5990", "78079", "71590", "2449",
+    "7295", "V7231", "27800", "311",
+]
+COMMON_HCPCS_CODES = [
+    "99213", "99214", "99212", "80053", "85025", "36415", "80061", "99232",
+    "99215", "93000", "99231", "71020", "G0008", "97110", "J1100", "88305",
+    "97140", "99233", "99283", "99284",
+]
+PROCESSING_INDICATORS = ["A", "R", "I", "C"]
+PROCESSING_WEIGHTS = np.array([0.92, 0.05, 0.02, 0.01])
+
+# Share of claims that carry each diagnosis code, and line item count weights.
+DIAGNOSIS_FILL = np.array([1.0, 0.72, 0.51, 0.36, 0.24, 0.15, 0.09, 0.05])
+LINE_COUNT_WEIGHTS = 0.55 ** np.arange(LINE_ITEMS)
+
+
+def _sampling_table(weights):
+    """
+    Build a lookup table that maps uniform integers to category indices.
+
+    Drawing becomes a single gather instead of a binary search per value.
+    The table has at least four slots per category so rare categories
+    still appear.
+    """
+    bits = max(16, int(np.ceil(np.log2(len(weights)))) + 2)
+    cdf = np.cumsum(weights, dtype=np.float64)
+    slots = (np.arange(2**bits) + 0.5) / 2**bits * cdf[-1]
+    return np.minimum(np.searchsorted(cdf, slots), len(weights) - 1).astype(np.int32)
+
+
+def _zipf_weights(size, exponent=1.1):
+    """Return Zipf-like rank-frequency weights."""
+    return 1.0 / np.arange(1, size + 1) ** exponent
+
+
+def _draw(rng, table, size):
+    """Draw category indices using a table from _sampling_table."""
+    return table[rng.integers(0, len(table), size, dtype=np.uint32)]
+
+
+def _vocabulary(common, tail_size, make_code, rng):
+    """Build a code vocabulary with the common codes at the head of the ranking."""
+    tail = sorted({make_code(value) for value in rng.integers(0, 10**6, tail_size * 2)})
+    tail = [code for code in tail if code not in common][:tail_size]
+    return pa.array(common + tail, pa.string())
+
+
+class ClaimsVocabulary:
+    """Patients, providers, codes and formatted values shared by every chunk."""
+
+    def __init__(self, num_patients, seed=0):
+        rng = np.random.default_rng([seed, 0])
+
+        self.patient_ids = pa.array(
+            [f"{value:016X}" for value in rng.integers(0, 2**63, num_patients)], pa.string()
+        )
+        # Heavy-tailed claims-per-patient: a few patients account for many claims.
+        self.patient_table = _sampling_table(rng.lognormal(0.0, 1.0, num_patients))
+
+        self.icd9 = _vocabulary(
+            COMMON_ICD9_CODES, 9_000, lambda v: f"{v % 1000:03d}{v // 1000 % 100}", rng
+        )
+        self.icd9_table = _sampling_table(_zipf_weights(len(self.icd9)))
+        self.hcpcs = _vocabulary(COMMON_HCPCS_CODES, 6_000, lambda v: f"{v % 100_000:05d}", rng)
+        self.hcpcs_table = _sampling_table(_zipf_weights(len(self.hcpcs), exponent=1.3))
+
+        num_providers = max(num_patients // 10, 100)
+        self.npis = pa.array(
+            [str(value) for value in rng.integers(10**9, 2 * 10**9, num_providers)], pa.string()
+        )
+        self.npi_table = _sampling_table(_zipf_weights(num_providers, exponent=0.8))
+        # Providers bill under a smaller set of tax ids (group practices).
+        self.tax_ids = pa.array(
+            [f"{value:09d}" for value in rng.integers(0, 10**9, max(num_providers // 4, 1))],
+            pa.string(),
+        )
+
+        self.indicators = pa.array(PROCESSING_INDICATORS, pa.string())
+        self.indicator_table = _sampling_table(PROCESSING_WEIGHTS)
+        self.line_count_table = _sampling_table(LINE_COUNT_WEIGHTS)
+
+        days = np.arange(SERVICE_DAYS + MAX_STAY_DAYS)
+        self.dates = pc.strftime(pa.array(FIRST_SERVICE_DATE + days), format="%Y%m%d")
+        self.amounts = pa.array(
+            [f"{step * AMOUNT_STEP}.00" for step in range(MAX_AMOUNT_STEPS + 1)], pa.string()
+        )
+
+
+def _take(values, indices, present=None):
+    """Materialize values for indices, nulling rows where present is False."""
+    mask = None if present is None else ~present
+    return values.take(pa.array(indices, mask=mask))
+
+
+def generate_claims_batch(vocab, start, num_rows, seed=0):
+    """
+    Generate one chunk of synthetic carrier claims as a pyarrow RecordBatch.
+
+    Rows are fully determined by (seed, start), so chunks can be generated
+    independently and in any order. Every column is a string, matching the
+    TEXT columns of raw_claims.
+    """
+    rng = np.random.default_rng([seed, 1, start])
+    shape = (LINE_ITEMS, num_rows)
+    columns = {}
+
+    columns["DESYNPUF_ID"] = _take(vocab.patient_ids, _draw(rng, vocab.patient_table, num_rows))
+    columns["CLM_ID"] = pc.cast(
+        pa.array(FIRST_CLAIM_ID + start + np.arange(num_rows, dtype=np.int64)), pa.string()
+    )
+
+    from_days = rng.integers(0, SERVICE_DAYS, num_rows)
+    stay_days = np.where(
+        rng.random(num_rows) < 0.9, 0, np.minimum(rng.geometric(0.3, num_rows), MAX_STAY_DAYS - 1)
+    )
+    columns["CLM_FROM_DT"] = _take(vocab.dates, from_days)
+    columns["CLM_THRU_DT"] = _take(vocab.dates, from_days + stay_days)
+
+    diagnoses = _draw(rng, vocab.icd9_table, (DIAGNOSIS_CODES, num_rows))
+    diagnosis_present = rng.random((DIAGNOSIS_CODES, num_rows)) < DIAGNOSIS_FILL[:, None]
+    for i in range(DIAGNOSIS_CODES):
+        columns[f"ICD9_DGNS_CD_{i + 1}"] = _take(vocab.icd9, diagnoses[i], diagnosis_present[i])
+
+    # Line items are filled left to right; most claims have one or two.
+    line_counts = 1 + _draw(rng, vocab.line_count_table, num_rows)
+    present = np.arange(LINE_ITEMS)[:, None] < line_counts[None, :]
+
+    providers = _draw(rng, vocab.npi_table, shape)
+    # Later lines usually repeat the rendering provider of the first line.
+    providers = np.where(rng.random(shape) < 0.8, providers[0], providers)
+    tax_ids = providers % len(vocab.tax_ids)
+    procedures = _draw(rng, vocab.hcpcs_table, shape)
+    line_diagnoses = np.where(rng.random(shape) < 0.7, diagnoses[0], diagnoses[1])
+    indicators = _draw(rng, vocab.indicator_table, shape)
+
+    # Amounts in $10 steps: allowed = payment + coinsurance + deductible + primary payer.
+    allowed = np.clip(rng.lognormal(1.6, 0.9, shape).astype(np.int64), 1, MAX_AMOUNT_STEPS)
+    deductible = np.where(rng.random(shape) < 0.08, allowed // 2, 0)
+    primary_payer = np.where(rng.random(shape) < 0.03, allowed // 3, 0)
+    coinsurance = (allowed - deductible - primary_payer) // 5
+    payment = allowed - deductible - primary_payer - coinsurance
+
+    line_columns = [
+        ("PRF_PHYSN_NPI", vocab.npis, providers),
+        ("TAX_NUM", vocab.tax_ids, tax_ids),
+        ("HCPCS_CD", vocab.hcpcs, procedures),
+        ("LINE_NCH_PMT_AMT", vocab.amounts, payment),
+        ("LINE_BENE_PTB_DDCTBL_AMT", vocab.amounts, deductible),
+        ("LINE_BENE_PRMRY_PYR_PD_AMT", vocab.amounts, primary_payer),
+        ("LINE_COINSRNC_AMT", vocab.amounts, coinsurance),
+        ("LINE_ALOWD_CHRG_AMT", vocab.amounts, allowed),
+        ("LINE_PRCSG_IND_CD", vocab.indicators, indicators),
+        ("LINE_ICD9_DGNS_CD", vocab.icd9, line_diagnoses),
+    ]
+    for prefix, values, indices in line_columns:
+        for i in range(LINE_ITEMS):
+            columns[f"{prefix}_{i + 1}"] = _take(values, indices[i], present[i])
+
+    return pa.RecordBatch.from_arrays(
+        [columns[name] for name in CLAIMS_COLUMNS], names=CLAIMS_COLUMNS
+    )
+
+
+def generate_claims(num_rows, chunk_size=500_000, seed=0, num_patients=None, workers=None):
+    """
+    Yield synthetic claims in RecordBatches of at most chunk_size rows.
+
+    Chunks are generated on a thread pool (NumPy and Arrow release the GIL)
+    with at most two chunks per worker in flight, and are yielded in order.
+    """
+    if num_patients is None:
+        num_patients = max(num_rows // CLAIMS_PER_PATIENT, 1)
+    if workers is None:
+        workers = config.PIPELINE_WORKERS
+    vocab = ClaimsVocabulary(num_patients, seed)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start in range(0, num_rows, chunk_size):
+            pending.append(executor.submit(
+                generate_claims_batch, vocab, start, min(chunk_size, num_rows - start), seed
+            ))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_synthetic_claims(
+    output_path, num_rows, file_format="csv", chunk_size=500_000, seed=0, workers=None
+):
+    """
+    Stream synthetic claims to a CSV or Parquet file, one chunk at a time.
+
+    Memory use is bounded by chunk_size and workers regardless of num_rows.
+    Returns the number of rows written.
+    """
+    schema = pa.schema([(name, pa.string()) for name in CLAIMS_COLUMNS])
+
+    if file_format == "csv":
+        writer = pa_csv.CSVWriter(output_path, schema)
+    elif file_format == "parquet":
+        writer = pq.ParquetWriter(output_path, schema, compression="zstd")
+    else:
+        raise ValueError(f"Unsupported file format: '{file_format}'. Use 'csv' or 'parquet'.")
+
+    written = 0
+    with writer:
+        for batch in generate_claims(num_rows, chunk_size, seed, workers=workers):
+            writer.write_batch(batch)
+            written += batch.num_rows
+            logger.debug(f"Wrote {written}/{num_rows} synthetic claims.")
+
+    logger.info(f"Wrote {written} synthetic claims to {output_path}.")
+    return written
+
+
+def main():
+    write_synthetic_claims(
+        config.SYNTHETIC_CLAIMS_FILE,
+        config.SYNTHETIC_CLAIMS_ROWS,
+        file_format=config.SYNTHETIC_CLAIMS_FORMAT,
+        chunk_size=config.SYNTHETIC_CLAIMS_CHUNK_SIZE,
+        seed=config.SYNTHETIC_CLAIMS_SEED,
+    )
+
+
+if __name__ == "__main__":
+    main()
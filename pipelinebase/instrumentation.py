@@ -0,0 +1,204 @@
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_sink = None
+_sink_lock = threading.Lock()
+_configured = False
+_observers = []
+
+
+class Span:
+    """A timed unit of work with optional row and byte counts."""
+
+    __slots__ = ("name", "attrs", "parent", "depth", "start_ns", "duration_ns")
+
+    def __init__(self, name, attrs, parent):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.start_ns = time.time_ns()
+        self.duration_ns = None
+
+    def set(self, **attrs):
+        """Attach attributes such as rows=... or bytes=... to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def path(self):
+        """Slash-separated names from the root span down to this one."""
+        return f"{self.parent.path}/{self.name}" if self.parent else self.name
+
+
+class _NullSpan:
+    """Stand-in used when tracing is off, so instrumented code pays almost nothing."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _TraceSink:
+    """Append-only writer for finished spans in JSON lines or Chrome trace format."""
+
+    def __init__(self, path, trace_format):
+        if trace_format not in ("jsonl", "chrome"):
+            raise ValueError(
+                f"Unsupported trace format: '{trace_format}'. Use 'jsonl' or 'chrome'."
+            )
+        self.trace_format = trace_format
+        self.file = open(path, "a", buffering=1)
+        # Chrome's trace viewer accepts an array with no closing bracket,
+        # so events can be streamed as they finish.
+        if trace_format == "chrome" and self.file.tell() == 0:
+            self.file.write("[\n")
+
+    def write(self, span):
+        if self.trace_format == "chrome":
+            event = {
+                "name": span.name,
+                "ph": "X",
+                "ts": span.start_ns // 1000,
+                "dur": span.duration_ns // 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": span.attrs,
+            }
+            line = json.dumps(event, default=str) + ",\n"
+        else:
+            record = {
+                "name": span.name,
+                "path": span.path,
+                "depth": span.depth,
+                "start": span.start_ns / 1e9,
+                "duration_s": span.duration_ns / 1e9,
+                "pid": os.getpid(),
+                **span.attrs,
+            }
+            line = json.dumps(record, default=str) + "\n"
+
+        with _sink_lock:
+            self.file.write(line)
+
+    def close(self):
+        self.file.close()
+
+
+def configure_tracing(path=None, trace_format=None):
+    """
+    Enable span output to a file.
+
+    Args:
+        path: Trace file (defaults to the TRACE_FILE env var; tracing stays off if unset)
+        trace_format: "jsonl" or "chrome" (defaults to TRACE_FORMAT env var, then "jsonl")
+    """
+    global _sink, _configured
+
+    path = path or os.getenv("TRACE_FILE")
+    trace_format = (trace_format or os.getenv("TRACE_FORMAT", "jsonl")).lower()
+
+    sink = _TraceSink(path, trace_format) if path else None
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = sink
+        _configured = True
+
+
+def _get_sink():
+    if not _configured:
+        configure_tracing()
+    return _sink
+
+
+def add_span_observer(callback):
+    """Call callback(span) for every finished span, even when no trace file is set."""
+    if callback not in _observers:
+        _observers.append(callback)
+
+
+def remove_span_observer(callback):
+    if callback in _observers:
+        _observers.remove(callback)
+
+
+@atexit.register
+def _close_sink():
+    if _sink is not None:
+        _sink.close()
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time a block of work as a span nested under the current span.
+
+    Usage:
+        with span("copy_csv_to_db", table=table_name) as s:
+            ...
+            s.set(rows=row_count, bytes=byte_count)
+
+    Finished spans are written to the trace file, passed to span observers
+    and logged at DEBUG level.
+    """
+    sink = _get_sink()
+    if sink is None and not _observers and not logger.isEnabledFor(logging.DEBUG):
+        yield _NULL_SPAN
+        return
+
+    current = Span(name, attrs, _current_span.get())
+    token = _current_span.set(current)
+    start = time.perf_counter_ns()
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.duration_ns = time.perf_counter_ns() - start
+        _current_span.reset(token)
+        if sink is not None:
+            sink.write(current)
+        for observer in _observers:
+            observer(current)
+        logger.debug(
+            f"{current.path} took {current.duration_ns / 1e9:.3f}s"
+            + "".join(f" {key}={value}" for key, value in current.attrs.items())
+        )
+
+
+def traced(name=None):
+    """Decorator that wraps every call of a function in a span."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_span():
+    """Return the innermost active span, or a no-op span if tracing is off."""
+    return _current_span.get() or _NULL_SPAN
@@ -1,15 +1,149 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
+import time
 
+_listener = None
+_queue_handler = None
+_listener_lock = threading.Lock()
 
-def setup_logging(name=None, level=None):
+
+def _build_formatter():
+    return logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class DebugSampler(logging.Filter):
+    """
+    Thin out DEBUG records; INFO and above always pass.
+
+    Args:
+        sample_rate: Fraction of DEBUG records to keep (1.0 keeps all)
+        max_per_second: Upper bound on DEBUG records kept per second (None for no limit)
+        clock: Returns the current time in seconds (defaults to time.monotonic)
+    """
+
+    def __init__(self, sample_rate=1.0, max_per_second=None, clock=time.monotonic):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self.clock = clock
+        self._window = 0
+        self._count = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        if self.max_per_second is not None:
+            window = int(self.clock())
+            if window != self._window:
+                self._window = window
+                self._count = 0
+            if self._count >= self.max_per_second:
+                return False
+            self._count += 1
+        return True
+
+
+def _get_queue_handler():
+    """
+    Return the process-wide queue handler, starting its listener on first use.
+
+    A single background thread drains the bounded queue to stdout, so callers
+    never block on the stream; records are dropped when the queue is full.
+    """
+    global _listener, _queue_handler
+
+    with _listener_lock:
+        if _listener is None:
+            stream_handler = _stream_handler()
+
+            log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+            max_per_second = os.getenv("LOG_DEBUG_MAX_PER_SECOND")
+            _queue_handler = DroppingQueueHandler(log_queue)
+            _queue_handler.addFilter(DebugSampler(
+                sample_rate=float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0)),
+                max_per_second=int(max_per_second) if max_per_second else None,
+            ))
+
+            _listener = logging.handlers.QueueListener(
+                log_queue, stream_handler, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(stop_queued_logging)
+
+        return _queue_handler
+
+
+def _stream_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_build_formatter())
+    return handler
+
+
+def stop_queued_logging():
+    """
+    Flush queued records and stop the background listener.
+
+    Loggers that used the queue switch back to writing to stdout inline, so
+    records logged afterwards (e.g. from other atexit hooks) are not lost.
+    """
+    global _listener, _queue_handler
+
+    with _listener_lock:
+        if _listener is None:
+            return
+        loggers = [logging.getLogger()] + [
+            logger for logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(logger, logging.Logger)
+        ]
+        for logger in loggers:
+            if _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+                logger.addHandler(_stream_handler())
+        _listener.stop()
+        _listener = None
+        if _queue_handler.dropped:
+            sys.stderr.write(
+                f"logging: dropped {_queue_handler.dropped} records (log queue full)\n"
+            )
+        _queue_handler = None
+
+
+def setup_logging(name=None, level=None, queued=None):
     """
     Configure and return a logger instance.
 
     Args:
         name: Logger name (defaults to root logger if None)
         level: Log level (defaults to INFO, can be overridden by LOG_LEVEL env var)
+        queued: Hand records to a background thread through a bounded queue
+            instead of writing to stdout inline (defaults to the LOG_QUEUE env var)
 
     Returns:
         Configured logger instance
@@ -18,16 +152,16 @@ def setup_logging(name=None, level=None):
         level_name = os.getenv("LOG_LEVEL", "INFO").upper()
         level = getattr(logging, level_name, logging.INFO)
 
+    if queued is None:
+        queued = os.getenv("LOG_QUEUE", "false").lower() == "true"
+
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        if queued:
+            logger.addHandler(_get_queue_handler())
+        else:
+            logger.addHandler(_stream_handler())
 
     logger.setLevel(level)
     return logger
@@ -0,0 +1,252 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import add_span_observer, span
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for a named metric with a fixed set of label names."""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, e.g. rows loaded."""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, e.g. a last-success timestamp."""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, e.g. stage latency."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_sample(self, key, value):
+        counts, total = value
+        lines = [
+            f"{self.name}_bucket"
+            f"{_format_labels(self.labelnames, key, [('le', _format_value(bound))])} {count}"
+            for bound, count in zip(self.buckets, counts)
+        ]
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    """A set of metrics rendered together in Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write metrics atomically, e.g. for node_exporter's textfile collector."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+
+ROWS = REGISTRY.register(Counter(
+    "pipeline_rows_total", "Rows processed by pipeline stages.", ["stage"]
+))
+BYTES = REGISTRY.register(Counter(
+    "pipeline_bytes_total", "Bytes processed by pipeline stages.", ["stage"]
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "pipeline_stage_duration_seconds", "Pipeline stage latency in seconds.", ["stage", "status"]
+))
+RETRIES = REGISTRY.register(Counter(
+    "pipeline_retries_total", "Retried units of work.", ["stage"]
+))
+RUNS = REGISTRY.register(Counter(
+    "pipeline_runs_total", "Pipeline runs by outcome.", ["pipeline", "status"]
+))
+LAST_SUCCESS = REGISTRY.register(Gauge(
+    "pipeline_last_success_timestamp_seconds",
+    "Unix time of the last successful run.",
+    ["pipeline"],
+))
+
+
+def record_span(finished):
+    """Span observer that turns every finished span into stage metrics."""
+    stage = finished.name
+    status = "error" if "error" in finished.attrs else "ok"
+    STAGE_SECONDS.observe(finished.duration_ns / 1e9, stage=stage, status=status)
+    if isinstance(finished.attrs.get("rows"), int) and finished.attrs["rows"] >= 0:
+        ROWS.inc(finished.attrs["rows"], stage=stage)
+    if isinstance(finished.attrs.get("bytes"), int):
+        BYTES.inc(finished.attrs["bytes"], stage=stage)
+
+
+add_span_observer(record_span)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+_server = None
+
+
+def start_http_server(port, host="0.0.0.0"):
+    """Serve /metrics on a daemon thread; returns the server (one per process)."""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        logger.info(f"Serving Prometheus metrics on {host}:{port}")
+    return _server
+
+
+def export_metrics():
+    """Write the metrics file if METRICS_FILE is set."""
+    path = os.getenv("METRICS_FILE")
+    if path:
+        REGISTRY.write_textfile(path)
+        logger.debug(f"Wrote metrics to {path}")
+
+
+def pipeline_run(name):
+    """
+    Decorator for pipeline entry points.
+
+    Runs the function in a span, counts the run by outcome, records the
+    last-success time and exports metrics when it finishes. Starts the HTTP
+    endpoint first when METRICS_PORT is set.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            port = os.getenv("METRICS_PORT")
+            if port:
+                start_http_server(int(port))
+            try:
+                with span(name):
+                    result = func(*args, **kwargs)
+            except BaseException:
+                RUNS.inc(pipeline=name, status="error")
+                raise
+            else:
+                RUNS.inc(pipeline=name, status="success")
+                LAST_SUCCESS.set(time.time(), pipeline=name)
+                return result
+            finally:
+                export_metrics()
+
+        return wrapper
+
+    return decorator
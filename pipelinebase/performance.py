@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+
+GIB = 1024**3
+MIB = 1024**2
+
+# Named hardware envelopes; PERF_PROFILE=auto uses the detected machine instead.
+PRESETS = {
+    "laptop": {"cores": 4, "memory_bytes": 8 * GIB},
+    "server": {"cores": 64, "memory_bytes": 256 * GIB},
+    "ci": {"cores": 2, "memory_bytes": 4 * GIB},
+}
+
+# Rough in-memory size of one claims row while it is being loaded or generated.
+CLAIMS_ROW_BYTES = 1500
+
+
+def _read_first_line(path):
+    try:
+        with open(path) as file:
+            return file.readline().strip()
+    except OSError:
+        return None
+
+
+def detect_cores():
+    """Usable CPU cores, honouring CPU affinity and a cgroup v2 CPU quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    cpu_max = _read_first_line("/sys/fs/cgroup/cpu.max")
+    if cpu_max and not cpu_max.startswith("max"):
+        quota, period = cpu_max.split()
+        cores = min(cores, max(1, int(quota) // int(period)))
+    return cores
+
+
+def detect_memory_bytes():
+    """Usable memory in bytes, honouring a cgroup v2 memory limit."""
+    memory = None
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        pass
+
+    limit = _read_first_line("/sys/fs/cgroup/memory.max")
+    if limit and limit.isdigit():
+        memory = min(memory, int(limit)) if memory else int(limit)
+    return memory or 4 * GIB
+
+
+def detect_hardware(work_dir="."):
+    """Return the cores, memory and free disk space available to the pipelines."""
+    return {
+        "cores": detect_cores(),
+        "memory_bytes": detect_memory_bytes(),
+        "disk_free_bytes": shutil.disk_usage(work_dir).free,
+    }
+
+
+def clamp(value, low, high):
+    return max(low, min(high, int(value)))
+
+
+def derive_settings(hardware):
+    """
+    Derive pipeline tuning knobs from a hardware envelope.
+
+    Chunk sizes are sized so the chunks in flight use a bounded share of
+    memory, and DuckDB gets most of the memory and all of the cores.
+    """
+    cores = hardware["cores"]
+    memory = hardware["memory_bytes"]
+    disk_free = hardware.get("disk_free_bytes")
+
+    return {
+        "workers": cores,
+        "download_chunk_bytes": 1 * MIB if memory >= 4 * GIB else 256 * 1024,
+        # One COPY chunk is buffered at a time; keep it under ~1/64 of memory.
+        "copy_chunk_rows": clamp(memory / 64 / CLAIMS_ROW_BYTES, 50_000, 2_000_000),
+        # Up to 2 chunks per worker are in flight; keep them under ~1/4 of memory.
+        "synthetic_chunk_size": clamp(
+            memory / 4 / (2 * cores) / CLAIMS_ROW_BYTES, 50_000, 1_000_000
+        ),
+        "duckdb_threads": cores,
+        "duckdb_memory_limit": f"{int(memory * 0.6) // MIB}MB",
+        "duckdb_max_temp_size": f"{int(disk_free * 0.5) // MIB}MB" if disk_free else "",
+    }
+
+
+def resolve_hardware(profile=None, work_dir="."):
+    """
+    Return the hardware envelope for a profile name.
+
+    "auto" (the default, from PERF_PROFILE) detects the machine; a preset name
+    uses its envelope. PERF_CORES and PERF_MEMORY_GB override either.
+    """
+    profile = (profile or os.getenv("PERF_PROFILE", "auto")).lower()
+    hardware = detect_hardware(work_dir)
+    if profile != "auto":
+        if profile not in PRESETS:
+            raise ValueError(
+                f"Unknown performance profile: '{profile}'. "
+                f"Use 'auto' or one of {sorted(PRESETS)}."
+            )
+        hardware.update(PRESETS[profile])
+
+    if os.getenv("PERF_CORES"):
+        hardware["cores"] = int(os.getenv("PERF_CORES"))
+    if os.getenv("PERF_MEMORY_GB"):
+        hardware["memory_bytes"] = int(float(os.getenv("PERF_MEMORY_GB")) * GIB)
+    return hardware
+
+
+def get_settings(profile=None, work_dir="."):
+    """Derived settings for the active profile (see config.py for per-knob overrides)."""
+    return derive_settings(resolve_hardware(profile, work_dir))
+
+
+if __name__ == "__main__":
+    hardware = resolve_hardware()
+    print(json.dumps({"hardware": hardware, "settings": derive_settings(hardware)}, indent=2))
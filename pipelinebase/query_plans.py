@@ -0,0 +1,216 @@
+import difflib
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import duckdb
+
+import config
+from logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+RUN_FILE = "run.json"
+
+_run_dir = None
+
+
+def plans_enabled():
+    """Plans are only captured when QUERY_PLAN_DIR is set."""
+    return bool(config.QUERY_PLAN_DIR)
+
+
+def run_dir():
+    """Return this process's plan directory, creating it and its run.json on first use."""
+    global _run_dir
+    if _run_dir is None:
+        started = datetime.now(timezone.utc)
+        run_id = f"{started:%Y%m%dT%H%M%S}-{os.getpid()}"
+        _run_dir = os.path.join(config.QUERY_PLAN_DIR, run_id)
+        os.makedirs(_run_dir, exist_ok=True)
+        with open(os.path.join(_run_dir, RUN_FILE), "w") as file:
+            json.dump({
+                "run_id": run_id,
+                "started_at": started.isoformat(),
+                "argv": sys.argv,
+                "duckdb_version": duckdb.__version__,
+                "perf_profile": config.PERF_PROFILE,
+            }, file, indent=2)
+    return _run_dir
+
+
+@contextmanager
+def capture_duckdb_plan(con, label):
+    """
+    Save the DuckDB profile (EXPLAIN ANALYZE as JSON) of the statement run in the block.
+
+    DuckDB keeps only the latest statement's profile, so wrap one statement.
+    Does nothing unless QUERY_PLAN_DIR is set.
+    """
+    if not plans_enabled():
+        yield
+        return
+
+    path = os.path.join(run_dir(), f"{label}.duckdb.json")
+    con.execute("SET enable_profiling = 'json';")
+    con.execute(f"SET profiling_output = '{path}';")
+    try:
+        yield
+    finally:
+        con.execute("PRAGMA disable_profiling;")
+    logger.debug(f"Saved DuckDB plan for '{label}' to {path}.")
+
+
+def capture_postgres_plan(conn, sql, label):
+    """
+    Save EXPLAIN (ANALYZE, BUFFERS) of a read-only PostgreSQL query.
+
+    The query runs once more inside a transaction that is rolled back.
+    Does nothing unless QUERY_PLAN_DIR is set.
+    """
+    if not plans_enabled():
+        return None
+
+    path = os.path.join(run_dir(), f"{label}.postgres.json")
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+            plan = cur.fetchone()[0]
+    finally:
+        conn.rollback()
+    with open(path, "w") as file:
+        json.dump(plan, file, indent=2)
+    logger.debug(f"Saved PostgreSQL plan for '{label}' to {path}.")
+    return path
+
+
+def flatten_plan(plan):
+    """
+    Return [(depth, operator, rows, seconds)] for a DuckDB profile or a PostgreSQL plan.
+
+    Operators are listed depth-first, so two plans with the same shape line up.
+    """
+    operators = []
+
+    def walk_duckdb(node, depth):
+        operators.append((
+            depth,
+            node["operator_type"],
+            node.get("operator_cardinality", 0),
+            node.get("operator_timing", 0.0),
+        ))
+        for child in node.get("children", []):
+            walk_duckdb(child, depth + 1)
+
+    def walk_postgres(node, depth):
+        loops = node.get("Actual Loops", 1)
+        operators.append((
+            depth,
+            node["Node Type"],
+            node.get("Actual Rows", 0) * loops,
+            node.get("Actual Total Time", 0.0) * loops / 1000,
+        ))
+        for child in node.get("Plans", []):
+            walk_postgres(child, depth + 1)
+
+    if isinstance(plan, list):
+        walk_postgres(plan[0]["Plan"], 0)
+    else:
+        for child in plan.get("children", []):
+            walk_duckdb(child, 0)
+    return operators
+
+
+def diff_plans(base, new, slowdown=1.5, min_seconds=0.01):
+    """
+    Compare two plans operator by operator.
+
+    Returns (lines, regressed): a readable diff and whether the plan changed
+    shape or an operator got more than `slowdown` times slower (operators
+    under min_seconds are ignored).
+    """
+    base_ops, new_ops = flatten_plan(base), flatten_plan(new)
+    matcher = difflib.SequenceMatcher(
+        a=[op[:2] for op in base_ops], b=[op[:2] for op in new_ops], autojunk=False
+    )
+
+    lines = []
+    regressed = False
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for (depth, name, rows, seconds), (_, _, new_rows, new_seconds) in zip(
+                base_ops[i1:i2], new_ops[j1:j2]
+            ):
+                slower = new_seconds >= min_seconds and new_seconds > seconds * slowdown
+                regressed = regressed or slower
+                lines.append(
+                    f"{'!' if slower else ' '} {'  ' * depth}{name}: "
+                    f"rows {rows} -> {new_rows}, {seconds:.3f}s -> {new_seconds:.3f}s"
+                )
+            continue
+        regressed = True
+        for depth, name, rows, seconds in base_ops[i1:i2]:
+            lines.append(f"- {'  ' * depth}{name}: rows {rows}, {seconds:.3f}s")
+        for depth, name, rows, seconds in new_ops[j1:j2]:
+            lines.append(f"+ {'  ' * depth}{name}: rows {rows}, {seconds:.3f}s")
+    return lines, regressed
+
+
+def list_runs(plan_dir=None):
+    """Return run ids under the plan directory, oldest first."""
+    plan_dir = plan_dir or config.QUERY_PLAN_DIR
+    if not plan_dir or not os.path.isdir(plan_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(plan_dir)
+        if os.path.exists(os.path.join(plan_dir, name, RUN_FILE))
+    )
+
+
+def load_plans(run_path):
+    """Return {plan file name: plan} for one run directory."""
+    plans = {}
+    for name in sorted(os.listdir(run_path)):
+        if name.endswith(".json") and name != RUN_FILE:
+            with open(os.path.join(run_path, name)) as file:
+                plans[name] = json.load(file)
+    return plans
+
+
+def diff_runs(base_run, new_run, plan_dir=None, slowdown=1.5):
+    """Diff every plan captured in both runs; returns True if any plan regressed."""
+    plan_dir = plan_dir or config.QUERY_PLAN_DIR
+    base_plans = load_plans(os.path.join(plan_dir, base_run))
+    new_plans = load_plans(os.path.join(plan_dir, new_run))
+
+    regressed = False
+    for name in sorted(base_plans.keys() & new_plans.keys()):
+        lines, plan_regressed = diff_plans(base_plans[name], new_plans[name], slowdown)
+        regressed = regressed or plan_regressed
+        status = "REGRESSED" if plan_regressed else "ok"
+        logger.info(f"{name} ({base_run} -> {new_run}): {status}\n" + "\n".join(lines))
+    for name in sorted(base_plans.keys() ^ new_plans.keys()):
+        logger.info(f"{name} was only captured in {base_run if name in base_plans else new_run}.")
+    return regressed
+
+
+def main(argv=None):
+    """Diff two runs (default: the latest two): python -m query_plans [BASE_RUN NEW_RUN]"""
+    argv = sys.argv[1:] if argv is None else argv
+    runs = list_runs()
+    if len(argv) == 2:
+        base_run, new_run = argv
+    elif len(runs) >= 2:
+        base_run, new_run = runs[-2:]
+    else:
+        logger.error(f"Need two captured runs in '{config.QUERY_PLAN_DIR}', found {len(runs)}.")
+        sys.exit(1)
+
+    if diff_runs(base_run, new_run, slowdown=config.QUERY_PLAN_SLOWDOWN):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
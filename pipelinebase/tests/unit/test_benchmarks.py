@@ -0,0 +1,41 @@
+from benchmarks.run_benchmarks import build_scaled_csv, find_regressions, parse_scales
+
+
+def make_run(seconds, scale=10, host="bench-host"):
+    """Build a minimal benchmark run record."""
+    return {
+        "scale": scale,
+        "host": host,
+        "stages": {"copy_load": {"seconds": seconds}},
+    }
+
+
+def test_parse_scales():
+    assert parse_scales("1, 10,100,") == [1, 10, 100]
+
+
+def test_build_scaled_csv_suffixes_ids(tmp_path):
+    """Test that scaled copies get distinct patient and claim ids."""
+    base = tmp_path / "base.csv"
+    base.write_text("DESYNPUF_ID,CLM_ID,LINE_NCH_PMT_AMT_1\nP1,C1,10.00\nP1,C2,20.00\n")
+    scaled = tmp_path / "scaled.csv"
+
+    rows = build_scaled_csv(base, 3, scaled)
+
+    lines = scaled.read_text().splitlines()
+    assert rows == 6
+    assert len(lines) == 7
+    assert len({line.split(",")[1] for line in lines[1:]}) == 6
+
+
+def test_find_regressions_against_median_baseline():
+    """Test that only stages slower than the baseline threshold are flagged."""
+    history = [make_run(10.0), make_run(11.0), make_run(9.0), make_run(100.0, scale=1)]
+
+    assert find_regressions(history, make_run(11.5), threshold=0.2) == []
+    assert find_regressions(history, make_run(13.0), threshold=0.2) == [("copy_load", 13.0, 10.0)]
+
+
+def test_find_regressions_ignores_other_hosts():
+    history = [make_run(1.0, host="laptop")]
+    assert find_regressions(history, make_run(50.0), threshold=0.2) == []
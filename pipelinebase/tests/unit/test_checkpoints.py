@@ -0,0 +1,151 @@
+import os
+
+import duckdb
+import pytest
+from unittest.mock import MagicMock
+
+from db.checkpoints import file_job_key, open_local_checkpoints
+from db.postgres import copy_csv_to_db_resumable
+from etl_pipelines.duckdb_to_minio import _upload_with_retries, export_csv_to_minio_parts
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_local_checkpoints(str(tmp_path / "state" / "checkpoints.sqlite"))
+    with store:
+        yield store
+
+
+class FakeCopyConnection:
+    """Stand-in psycopg2 connection that collects COPY payloads per commit."""
+
+    def __init__(self, fail_on_chunk=None):
+        self.committed = []
+        self.pending = []
+        self.fail_on_chunk = fail_on_chunk
+        self.cursor_mock = MagicMock()
+        self.cursor_mock.copy_expert.side_effect = self._copy
+        self.cursor_mock.__enter__.return_value = self.cursor_mock
+
+    def _copy(self, sql, file):
+        if len(self.committed) == self.fail_on_chunk:
+            raise RuntimeError("connection lost")
+        data = file.read().decode()
+        self.pending.append(data)
+        self.cursor_mock.rowcount = data.count("\n")
+
+    def cursor(self):
+        return self.cursor_mock
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+def test_store_tracks_units_per_job(store):
+    store.mark_done("job-a", "part-0", 10)
+    store.mark_done("job-a", "part-1", 20)
+    store.mark_done("job-b", "part-0")
+
+    assert store.completed("job-a") == {"part-0": "10", "part-1": "20"}
+
+    store.reset("job-a")
+    assert store.completed("job-a") == {}
+    assert store.completed("job-b") == {"part-0": None}
+
+
+def test_file_job_key_changes_with_file(tmp_path):
+    path = tmp_path / "claims.csv"
+    path.write_text("a\n1\n")
+    first = file_job_key("load", str(path))
+
+    path.write_text("a\n1\n2\n")
+    assert file_job_key("load", str(path)) != first
+
+
+def test_file_job_key_ignores_mtime(tmp_path):
+    path = tmp_path / "claims.csv"
+    path.write_text("a\n" + "1\n" * 1000)
+    first = file_job_key("load", str(path), chunk_bytes=64)
+
+    # A re-export of the same data only bumps the mtime
+    os.utime(path, (0, 0))
+    assert file_job_key("load", str(path), chunk_bytes=64) == first
+
+    # Same size, different tail
+    path.write_text("a\n" + "1\n" * 999 + "2\n")
+    assert file_job_key("load", str(path), chunk_bytes=64) != first
+
+
+def test_file_job_key_changes_when_only_the_middle_differs(tmp_path):
+    keys = []
+    for directory, middle in (("first", "1"), ("second", "2")):
+        path = tmp_path / directory / "claims.csv"
+        path.parent.mkdir()
+        path.write_text("a\n" + "1\n" * 500 + f"{middle}\n" + "1\n" * 500)
+        keys.append(file_job_key("load", str(path), chunk_bytes=64))
+
+    # Same name and size; only the middle of the file differs
+    assert keys[0] != keys[1]
+
+
+def test_export_parts_removes_stale_parts_and_skips_finished_runs(mocker, tmp_path, store):
+    csv_file = tmp_path / "claims.csv"
+    csv_file.write_text("id\n" + "".join(f"{i}\n" for i in range(5)))
+    module = "etl_pipelines.duckdb_to_minio"
+    mocker.patch(f"{module}.create_bucket_if_not_exists")
+    mocker.patch(f"{module}._upload_with_retries", return_value=2)
+    remove_objects = mocker.patch(f"{module}.remove_objects", return_value=1)
+    con = duckdb.connect()
+
+    assert export_csv_to_minio_parts(con, store, str(csv_file), part_rows=2) == 3
+    remove_objects.assert_called_once_with(
+        mocker.ANY,
+        "raw_claims/part-",
+        keep={f"raw_claims/part-{part:05d}.parquet" for part in range(3)},
+    )
+
+    # A finished export is not re-read
+    con.close()
+    assert export_csv_to_minio_parts(con, store, str(csv_file), part_rows=2) == 0
+    remove_objects.assert_called_once()
+
+
+def test_resumable_copy_resumes_after_failure(mocker, tmp_path, store):
+    csv_file = tmp_path / "claims.csv"
+    csv_file.write_text("id\n" + "".join(f"{i}\n" for i in range(5)))
+    mocker.patch("db.postgres.postgres_checkpoints", return_value=store)
+
+    conn = FakeCopyConnection(fail_on_chunk=1)
+    with pytest.raises(RuntimeError):
+        copy_csv_to_db_resumable(conn, str(csv_file), "raw_claims", "job", chunk_rows=2)
+    assert conn.committed == ["0\n1\n"]
+
+    conn.fail_on_chunk = None
+    copied = copy_csv_to_db_resumable(conn, str(csv_file), "raw_claims", "job", chunk_rows=2)
+
+    assert copied == 3
+    assert conn.committed == ["0\n1\n", "2\n3\n", "4\n"]
+    assert copy_csv_to_db_resumable(conn, str(csv_file), "raw_claims", "job", chunk_rows=2) == 0
+
+
+def test_upload_retries_transient_errors(mocker):
+    mocker.patch("etl_pipelines.duckdb_to_minio.time.sleep")
+    con = MagicMock()
+    con.execute.side_effect = [duckdb.IOException("503"), MagicMock(fetchone=lambda: (7,))]
+
+    assert _upload_with_retries(con, "COPY ...", max_retries=2) == 7
+    assert con.execute.call_count == 2
+
+
+def test_upload_gives_up_after_max_retries(mocker):
+    mocker.patch("etl_pipelines.duckdb_to_minio.time.sleep")
+    con = MagicMock()
+    con.execute.side_effect = duckdb.IOException("503")
+
+    with pytest.raises(duckdb.IOException):
+        _upload_with_retries(con, "COPY ...", max_retries=1)
+    assert con.execute.call_count == 2
@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from ingest_claims.claims_frame import compact_claims_batch, compact_type, load_compact_claims, to_compact_frame
+from ingest_claims.synthetic_claims import ClaimsVocabulary, generate_claims_batch
+
+
+def test_columns_map_to_compact_types():
+    assert compact_type("DESYNPUF_ID") == "code"
+    assert compact_type("CLM_ID") == "text"
+    assert compact_type("clm_from_dt") == "date"
+    assert compact_type("LINE_ICD9_DGNS_CD_13") == "code"
+    assert compact_type("LINE_ALOWD_CHRG_AMT_2") == "cents"
+
+
+def test_batch_converts_amounts_dates_and_codes():
+    batch = pa.RecordBatch.from_pydict({
+        "CLM_FROM_DT": ["20080105", "2008xx01", None],
+        "HCPCS_CD_1": ["99213", "99213", ""],
+        "LINE_NCH_PMT_AMT_1": ["50.00", "0.10", None],
+        "TAX_NUM_13": pa.nulls(3),
+    })
+
+    frame = to_compact_frame(pa.Table.from_batches([compact_claims_batch(batch)]))
+
+    assert frame["CLM_FROM_DT"].iloc[0] == pd.Timestamp("2008-01-05")
+    assert frame["CLM_FROM_DT"].isna().tolist() == [False, True, True]
+    assert list(frame["HCPCS_CD_1"].cat.categories) == ["99213"]
+    assert frame["HCPCS_CD_1"].isna().tolist() == [False, False, True]
+    assert frame["LINE_NCH_PMT_AMT_1"].dtype == "Int32"
+    assert frame["LINE_NCH_PMT_AMT_1"].tolist()[:2] == [5000, 10]
+    assert frame["TAX_NUM_13"].isna().all()
+
+
+def test_batch_nulls_bad_values_like_the_notebook_helper(monkeypatch):
+    """Test that the pipeline and notebook helpers compact the same dirty batch identically."""
+    notebook_dir = Path(__file__).resolve().parents[3] / "jupyterbase"
+    if not (notebook_dir / "notebook_query.py").exists():
+        pytest.skip("jupyterbase is not part of this checkout")
+    monkeypatch.syspath_prepend(str(notebook_dir))
+    notebook_query = pytest.importorskip("notebook_query")
+
+    batch = pa.RecordBatch.from_pydict({
+        "CLM_FROM_DT": ["20080105", " 20080105 ", "20080230", "2008015", "2008-01-05", "", None, "x"],
+        "HCPCS_CD_1": ["99213", "", None, "99213", "G0008", " ", "99213", "x"],
+        "LINE_NCH_PMT_AMT_1": ["50.00", "abc", "", " 12.5 ", "0.125", "-0.005", "99999999999", "nan"],
+        "LINE_COINSRNC_AMT_1": ["1e3", "$5", "1,000", "5.", ".5", "+3", "inf", None],
+        "TAX_NUM_13": pa.nulls(8),
+    })
+
+    frame = to_compact_frame(pa.Table.from_batches([compact_claims_batch(batch)]))
+    expected = notebook_query._compact_frame(
+        notebook_query.compact_claims_batch(duckdb.connect(), batch)
+    )
+
+    pd.testing.assert_frame_equal(frame, expected)
+    assert frame["LINE_NCH_PMT_AMT_1"].tolist() == [5000, pd.NA, pd.NA, 1250, 13, -1, pd.NA, pd.NA]
+    assert frame["CLM_FROM_DT"].notna().tolist() == [True, True] + [False] * 6
+
+
+def test_load_reports_a_large_reduction():
+    con = duckdb.connect()
+    con.register("claims", generate_claims_batch(ClaimsVocabulary(500, 0), 0, 5000, 0))
+
+    frame = load_compact_claims(con, "SELECT * FROM claims", source="duckdb", batch_rows=2000)
+
+    assert len(frame) == 5000
+    assert frame["DESYNPUF_ID"].nunique() <= 500
+    memory = frame.attrs["memory"]
+    assert memory["raw_bytes"] > 5 * memory["compact_bytes"]
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import instrumentation
+from instrumentation import (
+    add_span_observer,
+    configure_tracing,
+    current_span,
+    remove_span_observer,
+    span,
+    traced,
+)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """Fixture that enables tracing to a temp file and disables it afterwards."""
+    path = tmp_path / "trace.out"
+    yield path
+    configure_tracing(path=None)
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_nested_spans_write_jsonl(trace_file):
+    """Test that nested spans record their path, depth and attributes."""
+    configure_tracing(trace_file, "jsonl")
+
+    @traced()
+    def load():
+        current_span().set(rows=10, bytes=2048)
+
+    with span("pipeline", stage="load"):
+        load()
+
+    inner, outer = read_jsonl(trace_file)
+    assert inner["path"] == "pipeline/load"
+    assert inner["depth"] == 1
+    assert inner["rows"] == 10
+    assert inner["bytes"] == 2048
+    assert outer["name"] == "pipeline"
+    assert outer["stage"] == "load"
+    assert outer["duration_s"] >= inner["duration_s"]
+
+
+def test_chrome_trace_format(trace_file):
+    configure_tracing(trace_file, "chrome")
+
+    with span("export"):
+        pass
+
+    text = trace_file.read_text()
+    assert text.startswith("[\n")
+    event = json.loads(text.splitlines()[1].rstrip(","))
+    assert event["name"] == "export"
+    assert event["ph"] == "X"
+
+
+def test_span_records_errors(trace_file):
+    configure_tracing(trace_file, "jsonl")
+
+    with pytest.raises(RuntimeError):
+        with span("failing"):
+            raise RuntimeError("boom")
+
+    assert read_jsonl(trace_file)[0]["error"] == "RuntimeError"
+
+
+def test_span_is_noop_when_tracing_disabled(trace_file, monkeypatch):
+    """Test that spans cost nothing when no trace file or observer is configured."""
+    configure_tracing(path=None)
+    monkeypatch.setattr(instrumentation, "_observers", [])
+
+    with span("quiet") as s:
+        s.set(rows=1)
+        assert s is instrumentation._NULL_SPAN
+        assert current_span() is instrumentation._NULL_SPAN
+
+
+def test_span_observers_receive_finished_spans():
+    seen = []
+    add_span_observer(seen.append)
+    try:
+        with span("observed") as s:
+            s.set(rows=3)
+    finally:
+        remove_span_observer(seen.append)
+
+    assert [(finished.name, finished.attrs["rows"]) for finished in seen] == [("observed", 3)]
+
+
+def test_unknown_trace_format_raises(trace_file):
+    with pytest.raises(ValueError, match="Unsupported trace format"):
+        configure_tracing(trace_file, "xml")
@@ -9,7 +9,10 @@ from ingest_claims.load_claims_to_db import (
     extract_zip_file,
     rename_csv_file,
     cleanup_files,
+    csv_job_key,
+    main,
 )
+from metrics import RUNS
 
 
 @pytest.fixture
@@ -89,3 +92,64 @@ def test_cleanup_files(tmp_path):
 
     assert not file1.exists()
     assert not file2.exists()
+
+
+def test_main_failure_is_recorded_as_error_run(mocker):
+    """A failed load re-raises so pipeline_run counts it as an error."""
+    module = "ingest_claims.load_claims_to_db"
+    mocker.patch(f"{module}.open_local_checkpoints")
+    mocker.patch(f"{module}.csv_is_ready", return_value=True)
+    mocker.patch(f"{module}.os.path.getsize", return_value=100)
+    mocker.patch(f"{module}.claims_table_exists", return_value=True)
+    mocker.patch(f"{module}.create_claims_table")
+    mocker.patch(f"{module}.file_job_key", return_value="load_claims:test")
+    db = mocker.patch(f"{module}.connect_to_db").return_value
+    mocker.patch(
+        f"{module}.copy_csv_to_db_resumable", side_effect=RuntimeError("COPY failed")
+    )
+    error_runs = ("load_claims_to_db", "error")
+    success_runs = ("load_claims_to_db", "success")
+    errors_before = RUNS._values.get(error_runs, 0)
+    successes_before = RUNS._values.get(success_runs, 0)
+
+    with pytest.raises(RuntimeError, match="COPY failed"):
+        main()
+
+    db.rollback.assert_called_once()
+    db.close.assert_called_once()
+    assert RUNS._values.get(error_runs, 0) == errors_before + 1
+    assert RUNS._values.get(success_runs, 0) == successes_before
+
+
+def test_csv_job_key_tracks_claims_source(mocker):
+    """Switching source or synthetic settings gives the CSV a new checkpoint key."""
+    module = "ingest_claims.load_claims_to_db"
+    mocker.patch(f"{module}.config.CLAIMS_SOURCE", "download")
+    downloaded = csv_job_key("claims.csv")
+
+    mocker.patch(f"{module}.config.CLAIMS_SOURCE", "synthetic")
+    synthetic = csv_job_key("claims.csv")
+    mocker.patch(f"{module}.config.SYNTHETIC_CLAIMS_ROWS", 123)
+    fewer_rows = csv_job_key("claims.csv")
+    mocker.patch(f"{module}.config.SYNTHETIC_CLAIMS_SEED", 7)
+    other_seed = csv_job_key("claims.csv")
+
+    assert len({downloaded, synthetic, fewer_rows, other_seed}) == 4
+
+
+def test_main_resets_copy_checkpoints_for_new_table(mocker):
+    """A freshly created raw_claims table does not inherit old copy checkpoints."""
+    module = "ingest_claims.load_claims_to_db"
+    mocker.patch(f"{module}.open_local_checkpoints")
+    mocker.patch(f"{module}.csv_is_ready", return_value=True)
+    mocker.patch(f"{module}.os.path.getsize", return_value=100)
+    mocker.patch(f"{module}.claims_table_exists", return_value=False)
+    mocker.patch(f"{module}.create_claims_table")
+    mocker.patch(f"{module}.file_job_key", return_value="load_claims:test")
+    mocker.patch(f"{module}.connect_to_db")
+    mocker.patch(f"{module}.copy_csv_to_db_resumable")
+    store = mocker.patch(f"{module}.postgres_checkpoints").return_value
+
+    main()
+
+    store.reset.assert_called_once_with("load_claims:test")
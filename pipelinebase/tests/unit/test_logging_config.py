@@ -0,0 +1,61 @@
+import logging
+import queue
+
+from logging_config import DebugSampler, DroppingQueueHandler, setup_logging, stop_queued_logging
+
+
+def make_record(level):
+    return logging.LogRecord("test", level, __file__, 1, "message", None, None)
+
+
+def test_dropping_queue_handler_never_blocks():
+    """Test that records beyond the queue bound are counted and dropped."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+
+    for _ in range(5):
+        handler.handle(make_record(logging.INFO))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_debug_sampler_rate_limits_debug_only():
+    now = [100.2]
+    sampler = DebugSampler(max_per_second=3, clock=lambda: now[0])
+
+    kept_debug = sum(sampler.filter(make_record(logging.DEBUG)) for _ in range(10))
+    kept_info = sum(sampler.filter(make_record(logging.INFO)) for _ in range(10))
+
+    assert kept_debug == 3
+    assert kept_info == 10
+
+    now[0] = 101.0
+    assert sampler.filter(make_record(logging.DEBUG))
+
+
+def test_debug_sampler_sample_rate_zero_drops_debug():
+    sampler = DebugSampler(sample_rate=0.0)
+
+    assert not sampler.filter(make_record(logging.DEBUG))
+    assert sampler.filter(make_record(logging.WARNING))
+
+
+def test_setup_logging_queued_uses_queue_handler():
+    logger = setup_logging("test_queued_logger", queued=True)
+    try:
+        assert isinstance(logger.handlers[0], DroppingQueueHandler)
+        logger.info("queued message")
+    finally:
+        stop_queued_logging()
+        logger.handlers.clear()
+
+
+def test_stop_queued_logging_falls_back_to_direct_handling(capsys):
+    logger = setup_logging("test_stopped_queue_logger", queued=True)
+    try:
+        stop_queued_logging()
+        assert not any(isinstance(h, DroppingQueueHandler) for h in logger.handlers)
+        logger.info("after stop")
+        assert "after stop" in capsys.readouterr().out
+    finally:
+        logger.handlers.clear()
@@ -0,0 +1,74 @@
+import pytest
+
+from instrumentation import span
+from metrics import (
+    LAST_SUCCESS,
+    ROWS,
+    RUNS,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    pipeline_run,
+)
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    rows = registry.register(Counter("rows_total", "Rows loaded.", ["stage"]))
+    gauge = registry.register(Gauge("queue_depth", "Queued items."))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(1, 5)))
+
+    rows.inc(10, stage="copy")
+    rows.inc(5, stage="copy")
+    gauge.set(3)
+    latency.observe(0.5)
+    latency.observe(2.0)
+
+    text = registry.render()
+    assert "# TYPE rows_total counter" in text
+    assert 'rows_total{stage="copy"} 15' in text
+    assert "queue_depth 3" in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="5"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_sum 2.5" in text
+    assert "latency_seconds_count 2" in text
+
+
+def test_metric_rejects_wrong_labels():
+    counter = Counter("retries_total", "Retries.", ["stage"])
+    with pytest.raises(ValueError):
+        counter.inc(table="raw_claims")
+
+
+def test_spans_update_stage_metrics():
+    """Test that finished spans with rows feed the rows counter."""
+    with span("metrics_test_stage") as s:
+        s.set(rows=42)
+
+    assert ROWS._values[("metrics_test_stage",)] == 42
+
+
+def test_pipeline_run_records_outcome_and_writes_textfile(tmp_path, monkeypatch):
+    metrics_file = tmp_path / "pipeline.prom"
+    monkeypatch.setenv("METRICS_FILE", str(metrics_file))
+
+    @pipeline_run("metrics_test_pipeline")
+    def succeed():
+        return "done"
+
+    @pipeline_run("metrics_test_pipeline")
+    def fail():
+        raise RuntimeError("boom")
+
+    assert succeed() == "done"
+    with pytest.raises(RuntimeError):
+        fail()
+
+    assert RUNS._values[("metrics_test_pipeline", "success")] == 1
+    assert RUNS._values[("metrics_test_pipeline", "error")] == 1
+    assert ("metrics_test_pipeline",) in LAST_SUCCESS._values
+    assert 'pipeline_runs_total{pipeline="metrics_test_pipeline",status="error"} 1' in (
+        metrics_file.read_text()
+    )
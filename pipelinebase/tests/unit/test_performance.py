@@ -0,0 +1,48 @@
+import pytest
+
+import performance
+from performance import GIB, derive_settings, detect_cores, detect_memory_bytes, resolve_hardware
+
+
+def test_derive_settings_scales_with_hardware():
+    laptop = derive_settings({"cores": 4, "memory_bytes": 8 * GIB, "disk_free_bytes": 100 * GIB})
+    server = derive_settings({"cores": 64, "memory_bytes": 256 * GIB, "disk_free_bytes": 100 * GIB})
+
+    assert laptop["workers"] == 4 and server["workers"] == 64
+    assert laptop["copy_chunk_rows"] < server["copy_chunk_rows"] <= 2_000_000
+    assert laptop["duckdb_memory_limit"] == f"{int(8 * GIB * 0.6) // 1024**2}MB"
+    assert laptop["duckdb_max_temp_size"] == "51200MB"
+
+
+def test_derive_settings_clamps_small_machines():
+    settings = derive_settings({"cores": 1, "memory_bytes": 1 * GIB, "disk_free_bytes": None})
+
+    assert settings["copy_chunk_rows"] == 50_000
+    assert settings["download_chunk_bytes"] == 256 * 1024
+    assert settings["duckdb_max_temp_size"] == ""
+
+
+def test_presets_and_env_overrides(monkeypatch):
+    monkeypatch.delenv("PERF_CORES", raising=False)
+    monkeypatch.delenv("PERF_MEMORY_GB", raising=False)
+    assert resolve_hardware("server")["cores"] == 64
+
+    monkeypatch.setenv("PERF_CORES", "6")
+    monkeypatch.setenv("PERF_MEMORY_GB", "12")
+    hardware = resolve_hardware("laptop")
+    assert hardware["cores"] == 6
+    assert hardware["memory_bytes"] == 12 * GIB
+
+
+def test_unknown_preset_raises():
+    with pytest.raises(ValueError, match="Unknown performance profile"):
+        resolve_hardware("mainframe")
+
+
+def test_cgroup_limits_are_honoured(mocker):
+    limits = {"/sys/fs/cgroup/cpu.max": "200000 100000", "/sys/fs/cgroup/memory.max": str(2 * GIB)}
+    mocker.patch.object(performance, "_read_first_line", side_effect=limits.get)
+    mocker.patch.object(performance.os, "sched_getaffinity", return_value=set(range(16)))
+
+    assert detect_cores() == 2
+    assert detect_memory_bytes() <= 2 * GIB
@@ -0,0 +1,85 @@
+import duckdb
+import pytest
+
+from etl_pipelines.postgres_to_duckdb import (
+    BATCH_TABLE,
+    get_watermark,
+    merge_batch,
+    set_watermark,
+    sync_postgres_to_duckdb,
+)
+
+
+@pytest.fixture
+def con():
+    """Fixture for an in-memory DuckDB connection."""
+    con = duckdb.connect()
+    yield con
+    con.close()
+
+
+def stage(con, rows):
+    """Load rows into the batch table as if pulled from PostgreSQL."""
+    con.execute(f"CREATE OR REPLACE TEMP TABLE {BATCH_TABLE} (clm_id VARCHAR, amount INTEGER)")
+    con.executemany(f"INSERT INTO {BATCH_TABLE} VALUES (?, ?)", rows)
+    return len(rows)
+
+
+def test_watermark_roundtrip(con):
+    """Test that a stored watermark is returned for the same column only."""
+    assert get_watermark(con, "raw_claims", "xmin") is None
+
+    set_watermark(con, "raw_claims", "xmin", 42, 10)
+
+    assert get_watermark(con, "raw_claims", "xmin") == "42"
+    assert get_watermark(con, "raw_claims", "load_batch_id") is None
+
+
+def test_merge_batch_creates_then_upserts(con):
+    """Test that merge_batch creates the target and replaces rows by key."""
+    stage(con, [("a", 1), ("b", 2)])
+    merge_batch(con, "raw_claims", "CLM_ID")
+
+    stage(con, [("b", 20), ("c", 3)])
+    merge_batch(con, "raw_claims", "CLM_ID")
+
+    rows = con.execute("SELECT clm_id, amount FROM raw_claims ORDER BY clm_id").fetchall()
+    assert rows == [("a", 1), ("b", 20), ("c", 3)]
+
+
+def test_sync_skips_when_up_to_date(con, mocker):
+    """Test that no batch is pulled when the source has not advanced."""
+    set_watermark(con, "raw_claims", "xmin", 100, 5)
+    mocker.patch("etl_pipelines.postgres_to_duckdb.get_high_watermark", return_value="100")
+    stage_batch = mocker.patch("etl_pipelines.postgres_to_duckdb.stage_batch")
+
+    assert sync_postgres_to_duckdb(con, "raw_claims", "raw_claims", "CLM_ID") == 0
+    stage_batch.assert_not_called()
+
+
+def test_sync_pulls_above_watermark_and_advances(con, mocker):
+    """Test that only rows above the stored mark are requested and the mark advances."""
+    set_watermark(con, "raw_claims", "xmin", 100, 5)
+    mocker.patch("etl_pipelines.postgres_to_duckdb.get_high_watermark", return_value="150")
+    stage_batch = mocker.patch(
+        "etl_pipelines.postgres_to_duckdb.stage_batch",
+        side_effect=lambda con, *args: stage(con, [("a", 1)]),
+    )
+
+    assert sync_postgres_to_duckdb(con, "raw_claims", "raw_claims", "CLM_ID") == 1
+    stage_batch.assert_called_once_with(con, "pg", "raw_claims", "xmin", "100", "150")
+    assert get_watermark(con, "raw_claims", "xmin") == "150"
+
+
+def test_sync_rolls_back_on_failure(con, mocker):
+    """Test that a failed batch leaves the previous watermark in place."""
+    set_watermark(con, "raw_claims", "xmin", 100, 5)
+    mocker.patch("etl_pipelines.postgres_to_duckdb.get_high_watermark", return_value="150")
+    mocker.patch(
+        "etl_pipelines.postgres_to_duckdb.stage_batch", side_effect=RuntimeError("boom")
+    )
+
+    with pytest.raises(RuntimeError):
+        sync_postgres_to_duckdb(con, "raw_claims", "raw_claims", "CLM_ID")
+
+    assert get_watermark(con, "raw_claims", "xmin") == "100"
@@ -0,0 +1,73 @@
+import duckdb
+import pytest
+
+from data_quality.profile_claims import (
+    build_profile_query,
+    check_thresholds,
+    get_profile,
+    profile_relation,
+    rule_for,
+)
+from ingest_claims.synthetic_claims import ClaimsVocabulary, generate_claims_batch
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    batch = generate_claims_batch(ClaimsVocabulary(50, seed=1), 0, 200, seed=1)
+    con.register("claims_batch", batch)
+    con.execute("CREATE TABLE raw_claims AS SELECT * FROM claims_batch")
+    yield con
+    con.close()
+
+
+def test_rule_for_matches_case_insensitively():
+    assert rule_for("desynpuf_id") == (r"[0-9A-F]{16}", 0.0)
+    assert rule_for("LINE_ICD9_DGNS_CD_3")[0] == r"[0-9EV][0-9]{2,4}|OTHER"
+    assert rule_for("unknown_column") == (None, 1.0)
+
+
+def test_build_profile_query_is_a_single_select():
+    sql, outputs = build_profile_query("raw_claims", ["CLM_ID", "note"])
+
+    assert sql.count("FROM") == 1
+    assert len(outputs) == 10
+    assert outputs[0] == ("CLM_ID", "non_null")
+
+
+def test_synthetic_claims_pass_all_checks(con):
+    profile = profile_relation(con, "raw_claims")
+
+    assert profile["rows"] == 200
+    assert len(profile["columns"]) == 142
+    assert profile["columns"]["CLM_ID"]["null_ratio"] == 0.0
+    assert check_thresholds(profile) == []
+
+
+def test_thresholds_flag_nulls_and_pattern_violations(con):
+    con.execute("UPDATE raw_claims SET CLM_FROM_DT = NULL WHERE rowid < 10")
+    con.execute("UPDATE raw_claims SET HCPCS_CD_1 = 'bad' WHERE rowid < 5")
+
+    failures = check_thresholds(profile_relation(con, "raw_claims"))
+
+    assert any(failure.startswith("CLM_FROM_DT: null ratio") for failure in failures)
+    assert any(failure.startswith("HCPCS_CD_1: 5 values") for failure in failures)
+    assert check_thresholds({"rows": 0, "columns": {}}) == [
+        "table has 0 rows, expected at least 1"
+    ]
+
+
+def test_profile_is_cached_by_table_version(con, tmp_path, mocker):
+    cache_file = str(tmp_path / "cache.json")
+    con.execute("CREATE TABLE sync_watermarks (table_name VARCHAR, watermark VARCHAR, synced_at TIMESTAMP)")
+    con.execute("INSERT INTO sync_watermarks VALUES ('raw_claims', '100', '2024-01-01')")
+    spy = mocker.spy(__import__("data_quality.profile_claims").profile_claims, "profile_relation")
+
+    first = get_profile(con, "raw_claims", source="duckdb", cache_file=cache_file)
+    second = get_profile(con, "raw_claims", source="duckdb", cache_file=cache_file)
+    assert spy.call_count == 1
+    assert second["rows"] == first["rows"]
+
+    con.execute("UPDATE sync_watermarks SET watermark = '200'")
+    get_profile(con, "raw_claims", source="duckdb", cache_file=cache_file)
+    assert spy.call_count == 2
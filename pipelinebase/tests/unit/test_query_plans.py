@@ -0,0 +1,105 @@
+import json
+from unittest.mock import MagicMock
+
+import duckdb
+import pytest
+
+import query_plans
+from query_plans import (
+    capture_duckdb_plan,
+    capture_postgres_plan,
+    diff_plans,
+    diff_runs,
+    flatten_plan,
+    list_runs,
+)
+
+POSTGRES_PLAN = [{
+    "Plan": {
+        "Node Type": "Seq Scan",
+        "Actual Rows": 50,
+        "Actual Loops": 2,
+        "Actual Total Time": 4.0,
+        "Plans": [],
+    },
+    "Execution Time": 8.5,
+}]
+
+
+@pytest.fixture
+def plan_dir(tmp_path, mocker):
+    mocker.patch("config.QUERY_PLAN_DIR", str(tmp_path))
+    mocker.patch.object(query_plans, "_run_dir", None)
+    return tmp_path
+
+
+def _profile(con, sql):
+    with capture_duckdb_plan(con, "q"):
+        con.execute(sql)
+    with open(query_plans.run_dir() + "/q.duckdb.json") as file:
+        return json.load(file)
+
+
+def test_capture_is_a_no_op_when_disabled(mocker, tmp_path):
+    mocker.patch("config.QUERY_PLAN_DIR", "")
+    con = MagicMock()
+
+    with capture_duckdb_plan(con, "q"):
+        pass
+
+    con.execute.assert_not_called()
+    assert capture_postgres_plan(MagicMock(), "SELECT 1", "q") is None
+
+
+def test_duckdb_plan_is_saved_with_run_metadata(plan_dir):
+    con = duckdb.connect()
+    plan = _profile(con, "CREATE TABLE t AS SELECT range % 7 AS k FROM range(1000) WHERE range > 5")
+    con.execute("SELECT 42")
+
+    operators = flatten_plan(plan)
+    assert operators[0][:2] == (0, "CREATE_TABLE_AS")
+    assert ("FILTER", 994) in [(name, rows) for _, name, rows, _ in operators]
+    assert list_runs() == [query_plans._run_dir.rsplit("/", 1)[1]]
+
+
+def test_postgres_plan_is_explained_and_rolled_back(plan_dir):
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = (POSTGRES_PLAN,)
+
+    path = capture_postgres_plan(conn, "SELECT * FROM public.raw_claims", "stage_batch")
+
+    cursor.execute.assert_called_once_with(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT * FROM public.raw_claims"
+    )
+    conn.rollback.assert_called_once()
+    assert path.endswith("stage_batch.postgres.json")
+    assert flatten_plan(POSTGRES_PLAN) == [(0, "Seq Scan", 100, 0.008)]
+
+
+def test_diff_flags_shape_changes_and_slowdowns(plan_dir):
+    con = duckdb.connect()
+    con.execute("CREATE TABLE src AS SELECT range AS id FROM range(1000)")
+    base = _profile(con, "SELECT count(*) FROM src WHERE id > 5")
+    changed = _profile(con, "SELECT id % 3, count(*) FROM src WHERE id > 5 GROUP BY 1")
+
+    assert diff_plans(base, base)[1] is False
+    lines, regressed = diff_plans(base, changed)
+    assert regressed
+    assert any(line.startswith("+") and "HASH_GROUP_BY" in line for line in lines)
+
+    slower = json.loads(json.dumps(base))
+    slower["children"][0]["operator_timing"] = 5.0
+    assert diff_plans(base, slower)[1] is True
+
+
+def test_diff_runs_compares_plans_captured_in_both(plan_dir):
+    for run, rows in (("run-a", 50), ("run-b", 60)):
+        (plan_dir / run).mkdir()
+        (plan_dir / run / "run.json").write_text("{}")
+        plan = json.loads(json.dumps(POSTGRES_PLAN))
+        plan[0]["Plan"]["Actual Rows"] = rows
+        (plan_dir / run / "stage_batch.postgres.json").write_text(json.dumps(plan))
+
+    assert list_runs() == ["run-a", "run-b"]
+    assert diff_runs("run-a", "run-b") is False
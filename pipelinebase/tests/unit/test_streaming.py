@@ -0,0 +1,109 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import duckdb
+import pyarrow as pa
+
+from db.duckdb import stream_duckdb_query
+from db.postgres import stream_postgres_query
+
+
+def test_duckdb_stream_yields_bounded_batches_with_progress():
+    con = duckdb.connect()
+    progress = []
+
+    batches = list(stream_duckdb_query(
+        con, "SELECT range AS id FROM range(?)", [2500], batch_rows=1000,
+        progress=lambda rows, count: progress.append((rows, count)),
+    ))
+
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    assert batches[2]["id"].iloc[-1] == 2499
+    assert progress == [(1000, 1), (2000, 2), (2500, 3)]
+
+
+def test_duckdb_stream_stops_when_cancelled():
+    con = duckdb.connect()
+    cancel = threading.Event()
+
+    seen = []
+    for batch in stream_duckdb_query(
+        con, "SELECT range AS id FROM range(10000)", batch_rows=1000, output="arrow", cancel=cancel
+    ):
+        assert isinstance(batch, pa.RecordBatch)
+        seen.append(batch.num_rows)
+        cancel.set()
+
+    assert seen == [1000]
+    assert con.execute("SELECT 42").fetchone() == (42,)
+
+
+def test_postgres_stream_uses_a_named_cursor_and_rolls_back():
+    conn = MagicMock()
+    cur = conn.cursor.return_value
+    cur.description = [MagicMock(), MagicMock()]
+    cur.description[0].name, cur.description[1].name = "claim_id", "amount"
+    cur.fetchmany.side_effect = [[("a", 1), ("b", 2)], [("c", 3)], []]
+    cancel = threading.Event()
+
+    batches = list(stream_postgres_query(
+        conn, "SELECT claim_id, amount FROM raw_claims", batch_rows=2, cancel=cancel
+    ))
+
+    assert conn.cursor.call_args.kwargs["name"].startswith("stream_")
+    cur.execute.assert_called_once_with("SELECT claim_id, amount FROM raw_claims", None)
+    assert [batch["claim_id"].tolist() for batch in batches] == [["a", "b"], ["c"]]
+    cur.close.assert_called_once()
+    conn.rollback.assert_called_once()
+
+
+def test_postgres_stream_closes_the_cursor_when_cancelled():
+    conn = MagicMock()
+    cur = conn.cursor.return_value
+    cur.description = [MagicMock()]
+    cur.description[0].name = "claim_id"
+    cur.fetchmany.return_value = [("a",), ("b",)]
+    cancel = threading.Event()
+
+    for _ in stream_postgres_query(conn, "SELECT claim_id FROM raw_claims", batch_rows=2, cancel=cancel):
+        cancel.set()
+
+    assert cur.fetchmany.call_count == 1
+    cur.close.assert_called_once()
+    conn.rollback.assert_called_once()
+
+
+def column(name, type_code, precision=None, scale=None):
+    description = MagicMock(type_code=type_code, precision=precision, scale=scale)
+    description.name = name  # MagicMock(name=...) names the mock instead
+    return description
+
+
+def test_postgres_stream_keeps_column_types_across_batches():
+    conn = MagicMock()
+    cur = conn.cursor.return_value
+    cur.description = [
+        column("hcpcs_cd_13", 25),
+        column("amount", 1700, precision=10, scale=2),
+        column("total", 1700),  # unconstrained numeric
+        column("stay", 1186),  # interval has no mapped type
+    ]
+    # Every column is all NULL in the first batch
+    cur.fetchmany.side_effect = [
+        [(None, None, None, None)],
+        [("99213", Decimal("1.5"), Decimal("1.5"), timedelta(days=1))],
+        [(None, Decimal("123.45"), Decimal("123.456789"), None)],
+        [],
+    ]
+
+    batches = list(stream_postgres_query(
+        conn, "SELECT hcpcs_cd_13, amount, total, stay FROM claims", batch_rows=1, output="arrow"
+    ))
+    table = pa.Table.from_batches(batches)
+
+    assert table.schema.types == [pa.string(), pa.decimal128(38, 2), pa.string(), pa.string()]
+    assert table.column("amount").to_pylist() == [None, Decimal("1.50"), Decimal("123.45")]
+    assert table.column("total").to_pylist() == [None, "1.5", "123.456789"]
+    assert table.num_rows == 3
@@ -0,0 +1,64 @@
+import duckdb
+import pyarrow as pa
+import pytest
+
+from ingest_claims.schema import CLAIMS_COLUMNS
+from ingest_claims.synthetic_claims import generate_claims, write_synthetic_claims
+
+
+@pytest.fixture(scope="module")
+def claims():
+    """Fixture for a small synthetic claims table."""
+    return pa.Table.from_batches(list(generate_claims(5_000, chunk_size=2_000, seed=7)))
+
+
+def test_columns_match_raw_claims(claims):
+    assert claims.column_names == CLAIMS_COLUMNS
+    assert claims.num_rows == 5_000
+
+
+def test_generation_is_deterministic(claims):
+    """Test that the same seed produces the same rows regardless of threading."""
+    again = pa.Table.from_batches(list(generate_claims(5_000, chunk_size=2_000, seed=7, workers=1)))
+    assert again.equals(claims)
+
+
+def test_claims_are_realistic(claims):
+    """Test claim ids are unique, patients repeat and line items fill left to right."""
+    con = duckdb.connect()
+    con.register("claims", claims)
+
+    distinct_claims, distinct_patients = con.execute(
+        "SELECT COUNT(DISTINCT CLM_ID), COUNT(DISTINCT DESYNPUF_ID) FROM claims"
+    ).fetchone()
+    assert distinct_claims == 5_000
+    assert distinct_patients < 5_000
+
+    gaps = con.execute(
+        "SELECT COUNT(*) FROM claims WHERE HCPCS_CD_2 IS NOT NULL AND HCPCS_CD_1 IS NULL"
+    ).fetchone()[0]
+    assert gaps == 0
+
+    mismatched = con.execute("""
+        SELECT COUNT(*) FROM claims
+        WHERE LINE_ALOWD_CHRG_AMT_1::DECIMAL(10, 2) <> LINE_NCH_PMT_AMT_1::DECIMAL(10, 2)
+            + LINE_COINSRNC_AMT_1::DECIMAL(10, 2)
+            + LINE_BENE_PTB_DDCTBL_AMT_1::DECIMAL(10, 2)
+            + LINE_BENE_PRMRY_PYR_PD_AMT_1::DECIMAL(10, 2)
+    """).fetchone()[0]
+    assert mismatched == 0
+
+
+@pytest.mark.parametrize("file_format,reader", [("csv", "read_csv"), ("parquet", "read_parquet")])
+def test_write_synthetic_claims(tmp_path, file_format, reader):
+    output = tmp_path / f"claims.{file_format}"
+
+    assert write_synthetic_claims(output, 1_500, file_format, chunk_size=1_000) == 1_500
+
+    count = duckdb.sql(f"SELECT COUNT(*) FROM {reader}('{output}')").fetchone()[0]
+    assert count == 1_500
+
+
+def test_write_synthetic_claims_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported file format"):
+        write_synthetic_claims(tmp_path / "claims.json", 10, "json")